@@ -1,43 +1,218 @@
 """
 WolfTrace Backend - Main API Server
 """
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context, g
 from flask_cors import CORS
 import os
 import io
+import atexit
 import json
 import zipfile
 from dotenv import load_dotenv
-from graph_engine import GraphEngine
+from startup import ServiceRegistry, resolve
 from plugin_manager import PluginManager
+from plugin_worker import StagedGraph
 from pathlib import Path
-from graph_analytics import GraphAnalytics
 from session_manager import SessionManager
 from query_builder import QueryBuilder
 from graph_comparison import GraphComparison
+from graph_pagination import GraphPaginator
+from graph_lod import GraphLOD
 from report_generator import ReportGenerator
 from bulk_operations import BulkOperations
 from graph_templates import GraphTemplates
 from history_manager import HistoryManager
+import serialization
+import compression
+from compression import CompressedResponseCache
+from contextlib import nullcontext
+try:
+    from flask_socketio import SocketIO
+    from realtime import DeltaBroadcaster, JobProgress
+except ImportError:  # Realtime updates are optional
+    SocketIO = None
+
+# Startup timings are measured from here
+services = ServiceRegistry()
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+# orjson-backed jsonify(), with MessagePack for clients that Accept it
+serialization.init_app(app)
+# gzip/br/zstd per Accept-Encoding
+compression.init_app(app)
+
+# Initialize components. Heavy ones (NetworkX, NumPy, Neo4j, persisted data,
+# plugin discovery) are only built on first use or by the warm-up below, so
+# importing the app stays fast and /api/health answers right away
+HOT_RELOAD = os.getenv('HOT_RELOAD', 'true').lower() == 'true'
+graph_persistence = None
+socketio = None
+delta_broadcaster = None
+
+def _create_graph_engine():
+    global graph_persistence, delta_broadcaster
+    from graph_engine import GraphEngine
+    engine = GraphEngine(
+        use_neo4j=os.getenv('USE_NEO4J', 'false').lower() == 'true',
+        columnar=os.getenv('COLUMNAR_GRAPH', 'false').lower() == 'true'
+    )
+    if os.getenv('GRAPH_STORE_DIR'):
+        # Multi-worker serving: all workers share the graph through a local-disk store
+        from shared_store import SharedGraphStore
+        engine.attach_store(SharedGraphStore(os.getenv('GRAPH_STORE_DIR')))
+    elif os.getenv('GRAPH_DATA_DIR') and not engine.use_neo4j:
+        # Durable single-process graph: snapshot + change log, reopened at startup
+        from graph_persistence import GraphPersistence
+        persistence = GraphPersistence(
+            os.getenv('GRAPH_DATA_DIR'),
+            checkpoint_every=int(os.getenv('GRAPH_CHECKPOINT_EVERY', 1000000)),
+            sync_interval=float(os.getenv('GRAPH_WAL_SYNC_MS', 5)) / 1000
+        )
+        print(f"Loaded persisted graph: {persistence.open(engine)}")
+        atexit.register(persistence.close)
+        graph_persistence = persistence
+    if socketio is not None:
+        # Push coalesced graph deltas to WebSocket clients from the first change on
+        delta_broadcaster = DeltaBroadcaster(
+            engine,
+            socketio,
+            interval=float(os.getenv('REALTIME_INTERVAL', 0.2)),
+            max_batch=int(os.getenv('REALTIME_MAX_BATCH', 5000))
+        )
+        delta_broadcaster.start()
+    return engine
+
+def _create_plugin_manager():
+    manager = PluginManager(
+        plugins_dir=str((Path(__file__).resolve().parent.parent / 'plugins').resolve()),
+        isolate=os.getenv('PLUGIN_ISOLATION', 'false').lower() == 'true',
+        timeout=float(os.getenv('PLUGIN_TIMEOUT')) if os.getenv('PLUGIN_TIMEOUT') else None,
+        memory_limit_mb=int(os.getenv('PLUGIN_MEMORY_MB')) if os.getenv('PLUGIN_MEMORY_MB') else None
+    )
+    # Pick up plugin changes without restarting (and losing the graph)
+    if HOT_RELOAD:
+        manager.watch()
+    return manager
+
+def _create_graph_templates():
+    templates = GraphTemplates()
+    if HOT_RELOAD:
+        templates.watch()
+    return templates
+
+def _create_analytics():
+    from graph_analytics import GraphAnalytics
+    return GraphAnalytics(graph_engine)
 
-# Initialize components
-graph_engine = GraphEngine()
-plugins_path = str((Path(__file__).resolve().parent.parent / 'plugins').resolve())
-plugin_manager = PluginManager(plugins_dir=plugins_path)
-analytics = GraphAnalytics(graph_engine)
-session_manager = SessionManager()
+def _create_graph_layout():
+    from graph_layout import GraphLayout
+    return GraphLayout(graph_engine)
+
+graph_engine = services.add('graph_engine', _create_graph_engine, required=True)
+plugin_manager = services.add('plugin_manager', _create_plugin_manager, required=True)
+analytics = services.add('analytics', _create_analytics)
+session_manager = services.add('session_manager', SessionManager)
+graph_layout = services.add('graph_layout', _create_graph_layout)
+graph_templates = services.add('graph_templates', _create_graph_templates)
 query_builder = QueryBuilder(graph_engine)
 graph_comparison = GraphComparison(graph_engine)
+graph_paginator = GraphPaginator(graph_engine)
+graph_lod = GraphLOD(graph_engine)
 report_generator = ReportGenerator(graph_engine, analytics)
 bulk_operations = BulkOperations(graph_engine)
-graph_templates = GraphTemplates()
 history_manager = HistoryManager()
 
+def _graph_version():
+    """Current graph version (after picking up writes from other workers)"""
+    if graph_engine.use_neo4j:
+        # The version only counts this process's writes, not the database's
+        return None
+    with graph_engine.read_locked():
+        return graph_engine.version
+
+# Serialized and compressed bodies of graph-derived GET endpoints, per graph version
+response_cache = CompressedResponseCache(
+    _graph_version,
+    max_bytes=int(os.getenv('RESPONSE_CACHE_MB', 64)) * 1024 * 1024
+)
+
+# Push graph deltas (see _create_graph_engine) and import progress to WebSocket clients
+if SocketIO is not None and os.getenv('REALTIME', 'true').lower() == 'true':
+    socketio = SocketIO(
+        app,
+        cors_allowed_origins='*',
+        # Needed to fan out events when running several workers
+        message_queue=os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    )
+
+def _job(job_type, source=None):
+    """Report a long-running job to WebSocket clients (no-op without realtime)"""
+    if socketio is None:
+        return nullcontext()
+    # Building the engine also starts the delta broadcaster
+    engine = resolve(graph_engine)
+    return JobProgress(socketio, engine, job_type, delta_broadcaster, source=source)
+
+def _import_with_plugin(collector, data, description):
+    """
+    Run a plugin against a staging graph, then apply its changes
+    
+    The plugin (possibly an isolated worker running for minutes) builds its
+    changes without the write lock; the lock is only held to apply them and
+    record the history entry, so readers see the graph before or after the
+    import, never halfway.
+    """
+    staged = StagedGraph()
+    with _job(collector, staged):
+        result = plugin_manager.process_data(collector, data, staged)
+        with graph_engine.write_locked():
+            staged.apply(graph_engine)
+            history_manager.save_state(graph_engine.get_full_graph(), description)
+    return result
+
+# Liveness/readiness probes, answered without building any component
+PROBE_PATHS = ('/api/health', '/api/ready')
+
+@app.before_request
+def _open_graph_session():
+    """Serve each request from one pooled Neo4j session (no-op in memory mode)"""
+    if request.path in PROBE_PATHS:
+        # Probes must answer while the graph is still being loaded
+        return
+    if graph_engine.use_neo4j:
+        g.graph_session = graph_engine.session_scope()
+        g.graph_session.__enter__()
+
+@app.teardown_request
+def _close_graph_session(exc):
+    graph_session = g.pop('graph_session', None)
+    if graph_session is not None:
+        graph_session.__exit__(None, None, None)
+
+@app.before_request
+def _note_log_position():
+    """Remember this thread's write-ahead log position, to tell whether the request logs changes"""
+    if graph_persistence is not None:
+        g.log_position = graph_persistence.appended()
+
+@app.after_request
+def _wait_for_durable_log(response):
+    """Acknowledge graph changes only once the write-ahead log has them on disk"""
+    if graph_persistence is None or 'log_position' not in g:
+        return response
+    appended = graph_persistence.appended()
+    if appended == g.log_position:
+        # The request changed nothing
+        return response
+    # Concurrent requests share one fsync (group commit)
+    if not graph_persistence.sync(timeout=30, sequence=appended):
+        response = jsonify({"error": "The changes were applied but could not be written to the write-ahead log"})
+        response.status_code = 503
+    return response
+
 @app.route('/api', methods=['GET'])
 def api_root():
     """API root - list all available endpoints"""
@@ -46,6 +221,7 @@ def api_root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/api/health",
+            "ready": "/api/ready",
             "graph": "/api/graph",
             "nodes": "/api/nodes",
             "edges": "/api/edges",
@@ -62,14 +238,24 @@ def api_root():
             "report": "/api/report",
             "bulk": "/api/bulk/*",
             "templates": "/api/templates",
-            "history": "/api/history/*"
+            "history": "/api/history/*",
+            "realtime": "/socket.io"
         }
     })
 
 @app.route('/api/health', methods=['GET'])
 def health():
+    """Liveness: the process is up and serving requests"""
     return jsonify({"status": "ok"})
 
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness: 200 once the graph (with persisted data) and plugins are loaded, 503 until then"""
+    # Probes drive the warm-up when it was not started at import
+    services.warm_up()
+    status = services.status()
+    return jsonify({"status": "ready" if status['ready'] else "starting", **status}), 200 if status['ready'] else 503
+
 @app.route('/api/nodes', methods=['GET'])
 def get_nodes():
     """Get all nodes in the graph"""
@@ -85,6 +271,7 @@ def get_edges():
     return jsonify(edges)
 
 @app.route('/api/graph', methods=['GET'])
+@response_cache.cached
 def get_graph():
     """Get full graph data"""
     graph_data = graph_engine.get_full_graph()
@@ -124,8 +311,7 @@ def import_data():
         return jsonify({"error": "Data required"}), 400
     
     try:
-        result = plugin_manager.process_data(collector, import_data, graph_engine)
-        history_manager.save_state(graph_engine.get_full_graph(), f"Import data via {collector}")
+        result = _import_with_plugin(collector, import_data, f"Import data via {collector}")
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
@@ -183,8 +369,7 @@ def import_zip():
         if merged is None:
             return jsonify({"error": "No valid JSON files found in archive"}), 400
 
-        result = plugin_manager.process_data(collector, merged, graph_engine)
-        history_manager.save_state(graph_engine.get_full_graph(), f"Import ZIP via {collector}")
+        result = _import_with_plugin(collector, merged, f"Import ZIP via {collector}")
         return jsonify(result)
     except zipfile.BadZipFile:
         return jsonify({"error": "Invalid ZIP file"}), 400
@@ -194,8 +379,9 @@ def import_zip():
 @app.route('/api/clear', methods=['POST'])
 def clear_graph():
     """Clear the graph"""
-    graph_engine.clear()
-    history_manager.save_state({'nodes': [], 'edges': []}, "Clear graph")
+    with graph_engine.write_locked():
+        graph_engine.clear()
+        history_manager.save_state({'nodes': [], 'edges': []}, "Clear graph")
     return jsonify({"status": "cleared"})
 
 @app.route('/api/search', methods=['GET'])
@@ -232,11 +418,22 @@ def search_nodes():
     return jsonify(results[:limit])
 
 @app.route('/api/analytics/stats', methods=['GET'])
+@response_cache.cached
 def get_analytics_stats():
     """Get graph statistics and metrics"""
     stats = analytics.get_statistics()
     return jsonify(stats)
 
+@app.route('/api/analytics/memory', methods=['GET'])
+@response_cache.cached
+def get_memory_usage():
+    """Estimated memory use of the in-memory graph per node and edge type"""
+    try:
+        usage = graph_engine.get_memory_usage()
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 501
+    return jsonify(usage)
+
 @app.route('/api/analytics/communities', methods=['GET'])
 def get_communities():
     """Find communities in the graph"""
@@ -262,7 +459,7 @@ def export_graph():
     format_type = request.args.get('format', 'json')
     
     if format_type == 'json':
-        graph_data = graph_engine.get_full_graph()
+        graph_data = graph_engine.snapshot().get_full_graph()
         return jsonify(graph_data)
     else:
         return jsonify({"error": f"Format '{format_type}' not supported"}), 400
@@ -307,25 +504,8 @@ def restore_session(session_id):
     try:
         session_data = session_manager.load_session(session_id)
         
-        # Clear current graph
-        graph_engine.clear()
-        
-        # Import session graph
-        graph = session_data.get('graph', {})
-        nodes = graph.get('nodes', [])
-        edges = graph.get('edges', [])
-        
-        # Rebuild graph
-        for node in nodes:
-            graph_engine.add_node(node['id'], node.get('type', 'Entity'), node)
-        
-        for edge in edges:
-            graph_engine.add_edge(
-                edge.get('source') or edge.get('source_id'),
-                edge.get('target') or edge.get('target_id'),
-                edge.get('type', 'RELATED_TO'),
-                edge
-            )
+        # Replace current graph with the session graph
+        _load_graph_state(session_data.get('graph', {}))
         
         return jsonify({"status": "restored", "session": session_data['name']})
     except FileNotFoundError:
@@ -335,79 +515,237 @@ def restore_session(session_id):
 def query_graph():
     """Advanced query with filters"""
     filters = request.json or {}
-    result = query_builder.build_query(filters)
+    try:
+        result = query_builder.build_query(filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify(result)
 
 @app.route('/api/query/stats', methods=['POST'])
 def query_stats():
     """Get statistics for a query"""
     filters = request.json or {}
-    stats = query_builder.get_statistics_for_query(filters)
+    try:
+        stats = query_builder.get_statistics_for_query(filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify(stats)
 
 @app.route('/api/graph/paginated', methods=['GET'])
 def get_paginated_graph():
-    """Get graph data with pagination"""
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 100))
-    node_type = request.args.get('type', None)
-    
-    all_nodes = graph_engine.get_nodes(node_type)
-    all_edges = graph_engine.get_edges()
+    """
+    Get graph data one page of nodes at a time, with the edges touching them.
+    Follow pagination.next_cursor for the next page; all pages of a scan come
+    from the graph version of its first page. The legacy page parameter starts
+    a scan at that page.
+    """
+    cursor = request.args.get('cursor')
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 100))
+        result = graph_paginator.get_page(
+            cursor=cursor,
+            limit=per_page,
+            node_type=request.args.get('type', None),
+            offset=(page - 1) * per_page
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Paginate nodes
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    paginated_nodes = all_nodes[start_idx:end_idx]
+    if result is None:
+        return jsonify({"error": "Cursor expired (graph version no longer available); restart the scan"}), 410
     
-    # Get edges for paginated nodes
-    node_ids = {node['id'] for node in paginated_nodes}
-    paginated_edges = [
-        edge for edge in all_edges
-        if edge.get('source') in node_ids or edge.get('target') in node_ids
-    ]
+    if not cursor and 'total' in result['pagination']:
+        result['pagination']['page'] = page
+        result['pagination']['total_pages'] = (result['pagination']['total'] + per_page - 1) // per_page
+    return jsonify(result)
+
+@app.route('/api/graph/lod', methods=['GET'])
+@response_cache.cached
+def get_graph_overview():
+    """Aggregated view of the graph: one super-node per group, with aggregated edges"""
+    try:
+        overview = graph_lod.get_overview(
+            group_by=request.args.get('group_by', 'type'),
+            max_groups=int(request.args.get('max_groups', 200)),
+            prefix=int(request.args.get('prefix', 24))
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 501
+    return jsonify(overview)
+
+@app.route('/api/graph/lod/expand', methods=['GET'])
+@response_cache.cached
+def expand_super_node():
+    """Expand a super-node from /api/graph/lod into (up to limit) member nodes"""
+    group = request.args.get('group')
+    if group is None:
+        return jsonify({"error": "group required"}), 400
+    try:
+        expanded = graph_lod.expand(
+            group_by=request.args.get('group_by', 'type'),
+            group=group,
+            limit=int(request.args.get('limit', 500)),
+            prefix=int(request.args.get('prefix', 24)),
+            max_groups=int(request.args.get('max_groups', 200))
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 501
+    if expanded is None:
+        return jsonify({"error": f"Group '{group}' not found"}), 404
+    return jsonify(expanded)
+
+@app.route('/api/graph/ego', methods=['GET'])
+def get_ego_network():
+    """k-hop neighbourhood of a node as an induced subgraph with attributes"""
+    node_id = request.args.get('node')
+    if not node_id:
+        return jsonify({"error": "Node ID required"}), 400
     
-    return jsonify({
-        'nodes': paginated_nodes,
-        'edges': paginated_edges,
-        'pagination': {
-            'page': page,
-            'per_page': per_page,
-            'total': len(all_nodes),
-            'total_pages': (len(all_nodes) + per_page - 1) // per_page
-        }
-    })
+    edge_types = request.args.get('edge_types')
+    max_nodes = request.args.get('max_nodes')
+    try:
+        ego = graph_engine.get_ego_network(
+            node_id,
+            depth=int(request.args.get('depth', 1)),
+            direction=request.args.get('direction', 'both'),
+            edge_types=[t for t in edge_types.split(',') if t] if edge_types else None,
+            max_nodes=int(max_nodes) if max_nodes else None
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if ego is None:
+        return jsonify({"error": "Node not found"}), 404
+    return jsonify(ego)
+
+@app.route('/api/graph/layout', methods=['GET'])
+@response_cache.cached
+def get_graph_layout():
+    """Ready-to-draw node coordinates for the current graph version"""
+    full = request.args.get('full', 'false').lower() == 'true'
+    try:
+        layout = graph_layout.get_layout(full=full)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 501
+    return jsonify(layout)
 
 # Graph Comparison endpoints
+def _comparison_graph(data: dict, name: str) -> dict:
+    """
+    Resolve one side of a comparison from the request body.
+    Either an inline graph ('graph1') or a saved session id ('session1');
+    sessions carry stored content hashes, enabling the fast diff path.
+    """
+    session_id = data.get(name.replace('graph', 'session'))
+    if session_id:
+        session_data = session_manager.load_session(session_id)
+        return {**session_data.get('graph', {}), 'hashes': session_data.get('hashes')}
+    return data.get(name, {})
+
 @app.route('/api/compare', methods=['POST'])
 def compare_graphs():
     """Compare two graphs"""
     data = request.json
-    graph1 = data.get('graph1', {})
-    graph2 = data.get('graph2', {})
+    try:
+        graph1 = _comparison_graph(data, 'graph1')
+        graph2 = _comparison_graph(data, 'graph2')
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
     
     if not graph1 or not graph2:
         return jsonify({"error": "Both graph1 and graph2 are required"}), 400
     
-    comparison = graph_comparison.compare_graphs(graph1, graph2)
+    include_values = data.get('values', True)
+    comparison = graph_comparison.compare_graphs(graph1, graph2, include_values=include_values)
+    
+    if data.get('paginate'):
+        # Return stats now; clients page through each category by cursor
+        comparison_id = graph_comparison.store_result(comparison)
+        return jsonify(graph_comparison.get_summary(comparison_id))
+    
     return jsonify(comparison)
 
+@app.route('/api/compare/<comparison_id>', methods=['GET'])
+def get_comparison_summary(comparison_id):
+    """Get stats and first cursors of a stored comparison"""
+    summary = graph_comparison.get_summary(comparison_id)
+    if summary is None:
+        return jsonify({"error": "Comparison not found"}), 404
+    return jsonify(summary)
+
+@app.route('/api/compare/<comparison_id>/<kind>/<change_type>', methods=['GET'])
+def get_comparison_page(comparison_id, kind, change_type):
+    """Page through one change category of a stored comparison"""
+    cursor = request.args.get('cursor')
+    
+    try:
+        limit = int(request.args.get('limit', 100))
+        page = graph_comparison.get_page(comparison_id, kind, change_type, cursor, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if page is None:
+        return jsonify({"error": "Comparison not found"}), 404
+    return jsonify(page)
+
 @app.route('/api/compare/diff-graph', methods=['POST'])
 def get_diff_graph():
     """Get visualization graph showing differences"""
     data = request.json
-    graph1 = data.get('graph1', {})
-    graph2 = data.get('graph2', {})
+    try:
+        graph1 = _comparison_graph(data, 'graph1')
+        graph2 = _comparison_graph(data, 'graph2')
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
     
     if not graph1 or not graph2:
         return jsonify({"error": "Both graph1 and graph2 are required"}), 400
     
+    try:
+        hops = int(data.get('hops', 0))
+        max_nodes = data.get('max_nodes')
+        max_nodes = int(max_nodes) if max_nodes is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "hops and max_nodes must be integers"}), 400
+    if hops < 0 or (max_nodes is not None and max_nodes < 1):
+        return jsonify({"error": "hops must be non-negative and max_nodes positive"}), 400
+    
     comparison = graph_comparison.compare_graphs(graph1, graph2)
-    diff_graph = graph_comparison.create_diff_graph(comparison)
-    return jsonify(diff_graph)
+    items = graph_comparison.iter_diff_graph(comparison, [graph2, graph1], hops, max_nodes)
+    
+    if data.get('stream'):
+        return Response(stream_with_context(_stream_graph_json(items)), mimetype='application/json')
+    
+    nodes = []
+    edges = []
+    for kind, item in items:
+        (nodes if kind == 'node' else edges).append(item)
+    return jsonify({'nodes': nodes, 'edges': edges})
+
+def _stream_graph_json(items):
+    """Encode ('node'|'edge', item) pairs (nodes first) as a {nodes, edges} JSON document"""
+    yield '{"nodes":['
+    section = 'node'
+    first = True
+    for kind, item in items:
+        if kind != section:
+            yield '],"edges":['
+            section = kind
+            first = True
+        yield ('' if first else ',') + serialization.dumps(item)
+        first = False
+    if section == 'node':
+        yield '],"edges":['
+    yield ']}'
+
 
 # Report generation endpoints
 @app.route('/api/report', methods=['GET'])
+@response_cache.cached
 def generate_report():
     """Generate report data"""
     include_graph = request.args.get('include_graph', 'false').lower() == 'true'
@@ -433,8 +771,9 @@ def bulk_delete_nodes():
     if not node_ids:
         return jsonify({"error": "node_ids array is required"}), 400
     
-    result = bulk_operations.bulk_delete_nodes(node_ids)
-    history_manager.save_state(graph_engine.get_full_graph(), f"Bulk delete {len(node_ids)} nodes")
+    with graph_engine.write_locked():
+        result = bulk_operations.bulk_delete_nodes(node_ids)
+        history_manager.save_state(graph_engine.get_full_graph(), f"Bulk delete {len(node_ids)} nodes")
     return jsonify(result)
 
 @app.route('/api/bulk/edges/delete', methods=['POST'])
@@ -446,8 +785,9 @@ def bulk_delete_edges():
     if not edge_specs:
         return jsonify({"error": "edges array is required"}), 400
     
-    result = bulk_operations.bulk_delete_edges(edge_specs)
-    history_manager.save_state(graph_engine.get_full_graph(), f"Bulk delete {len(edge_specs)} edges")
+    with graph_engine.write_locked():
+        result = bulk_operations.bulk_delete_edges(edge_specs)
+        history_manager.save_state(graph_engine.get_full_graph(), f"Bulk delete {len(edge_specs)} edges")
     return jsonify(result)
 
 @app.route('/api/bulk/nodes/update', methods=['POST'])
@@ -459,8 +799,9 @@ def bulk_update_nodes():
     if not updates:
         return jsonify({"error": "updates array is required"}), 400
     
-    result = bulk_operations.bulk_update_nodes(updates)
-    history_manager.save_state(graph_engine.get_full_graph(), f"Bulk update {len(updates)} nodes")
+    with graph_engine.write_locked():
+        result = bulk_operations.bulk_update_nodes(updates)
+        history_manager.save_state(graph_engine.get_full_graph(), f"Bulk update {len(updates)} nodes")
     return jsonify(result)
 
 @app.route('/api/bulk/nodes/tag', methods=['POST'])
@@ -474,8 +815,9 @@ def bulk_tag_nodes():
     if not node_ids or not tags:
         return jsonify({"error": "node_ids and tags are required"}), 400
     
-    result = bulk_operations.bulk_tag_nodes(node_ids, tags, operation)
-    history_manager.save_state(graph_engine.get_full_graph(), f"Bulk tag {len(node_ids)} nodes")
+    with graph_engine.write_locked():
+        result = bulk_operations.bulk_tag_nodes(node_ids, tags, operation)
+        history_manager.save_state(graph_engine.get_full_graph(), f"Bulk tag {len(node_ids)} nodes")
     return jsonify(result)
 
 @app.route('/api/bulk/nodes/export', methods=['POST'])
@@ -518,29 +860,38 @@ def apply_template(template_id):
     data = request.json
     variables = data.get('variables', {})
     
-    result = graph_templates.create_from_template(template_id, graph_engine, variables)
+    staged = StagedGraph()
+    result = graph_templates.create_from_template(template_id, staged, variables)
     if 'error' in result:
         return jsonify(result), 400
     
-    history_manager.save_state(graph_engine.get_full_graph(), f"Applied template: {template_id}")
+    with graph_engine.write_locked():
+        staged.apply(graph_engine)
+        history_manager.save_state(graph_engine.get_full_graph(), f"Applied template: {template_id}")
     return jsonify(result)
 
 # History/Undo-Redo endpoints
+def _load_graph_state(graph_data):
+    """Replace the current graph with the given nodes and edges, atomically for readers"""
+    with graph_engine.write_locked():
+        graph_engine.clear()
+        for node in graph_data.get('nodes', []):
+            graph_engine.add_node(node['id'], node.get('type', 'Entity'), node)
+        for edge in graph_data.get('edges', []):
+            source = edge.get('source') or edge.get('source_id')
+            target = edge.get('target') or edge.get('target_id')
+            graph_engine.add_edge(source, target, edge.get('type', 'RELATED_TO'), edge)
+
 @app.route('/api/history/undo', methods=['POST'])
 def undo():
     """Undo last operation"""
-    previous_state = history_manager.undo()
-    if not previous_state:
-        return jsonify({"error": "Nothing to undo"}), 400
-    
-    # Restore graph state
-    graph_engine.clear()
-    for node in previous_state.get('nodes', []):
-        graph_engine.add_node(node['id'], node.get('type', 'Entity'), node)
-    for edge in previous_state.get('edges', []):
-        source = edge.get('source') or edge.get('source_id')
-        target = edge.get('target') or edge.get('target_id')
-        graph_engine.add_edge(source, target, edge.get('type', 'RELATED_TO'), edge)
+    with graph_engine.write_locked():
+        previous_state = history_manager.undo()
+        if not previous_state:
+            return jsonify({"error": "Nothing to undo"}), 400
+    
+        # Restore graph state
+        _load_graph_state(previous_state)
     
     return jsonify({
         'status': 'undone',
@@ -551,18 +902,13 @@ def undo():
 @app.route('/api/history/redo', methods=['POST'])
 def redo():
     """Redo last undone operation"""
-    next_state = history_manager.redo()
-    if not next_state:
-        return jsonify({"error": "Nothing to redo"}), 400
-    
-    # Restore graph state
-    graph_engine.clear()
-    for node in next_state.get('nodes', []):
-        graph_engine.add_node(node['id'], node.get('type', 'Entity'), node)
-    for edge in next_state.get('edges', []):
-        source = edge.get('source') or edge.get('source_id')
-        target = edge.get('target') or edge.get('target_id')
-        graph_engine.add_edge(source, target, edge.get('type', 'RELATED_TO'), edge)
+    with graph_engine.write_locked():
+        next_state = history_manager.redo()
+        if not next_state:
+            return jsonify({"error": "Nothing to redo"}), 400
+    
+        # Restore graph state
+        _load_graph_state(next_state)
     
     return jsonify({
         'status': 'redone',
@@ -641,6 +987,16 @@ def openapi_spec():
                     }
                 }
             },
+            "/api/ready": {
+                "get": {
+                    "summary": "Readiness Check",
+                    "description": "Check whether the graph and plugins are loaded, with startup timings",
+                    "responses": {
+                        "200": {"description": "API is ready to serve graph requests"},
+                        "503": {"description": "API is still starting"}
+                    }
+                }
+            },
             "/api/plugins": {
                 "get": {
                     "summary": "List Plugins",
@@ -817,7 +1173,18 @@ def redoc():
 
 # Save state after import operations
 
+services.mark_imported()
+# Build the graph and plugin registry in the background (set WARM_UP=false to
+# build everything on first use). The debug reloader's parent process only
+# watches files, so it skips this and never opens the persisted graph.
+if os.getenv('WARM_UP', 'true').lower() == 'true' and not (
+        __name__ == '__main__' and not os.getenv('WERKZEUG_RUN_MAIN')):
+    services.warm_up()
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
-    app.run(debug=True, host='0.0.0.0', port=port)
+    if socketio is not None:
+        socketio.run(app, debug=True, host='0.0.0.0', port=port, allow_unsafe_werkzeug=True)
+    else:
+        app.run(debug=True, host='0.0.0.0', port=port)
 
@@ -15,15 +15,22 @@ class BulkOperations:
         deleted_count = 0
         edges_removed = 0
         
-        for node_id in node_ids:
-            if node_id in self.graph_engine.graph:
-                # Count edges to be removed
-                edges_removed += (
-                    self.graph_engine.graph.out_degree(node_id) +
-                    self.graph_engine.graph.in_degree(node_id)
-                )
-                self.graph_engine.graph.remove_node(node_id)
-                deleted_count += 1
+        with self.graph_engine.write_locked():
+            graph = self.graph_engine.graph
+            for node_id in node_ids:
+                if node_id in graph:
+                    # Listeners (WebSocket clients, logs) learn about the edges removed with the node
+                    incident = set(graph.out_edges(node_id, keys=True))
+                    incident.update(graph.in_edges(node_id, keys=True))
+                    graph.remove_node(node_id)
+                    for source, target, edge_type in incident:
+                        self.graph_engine.notify_change(
+                            'edge', 'removed', {'source': source, 'target': target, 'type': edge_type}
+                        )
+                    self.graph_engine.notify_change('node', 'removed', {'id': node_id})
+                    edges_removed += len(incident)
+                    deleted_count += 1
+            self.graph_engine.mark_modified()
         
         return {
             'nodes_deleted': deleted_count,
@@ -42,24 +49,32 @@ class BulkOperations:
         
         deleted_count = 0
         
-        for edge_spec in edge_specs:
-            source = edge_spec.get('source')
-            target = edge_spec.get('target')
-            edge_type = edge_spec.get('type')
+        with self.graph_engine.write_locked():
+            for edge_spec in edge_specs:
+                source = edge_spec.get('source')
+                target = edge_spec.get('target')
+                edge_type = edge_spec.get('type')
             
-            if source and target:
-                if edge_type:
-                    # Remove specific edge type
-                    if self.graph_engine.graph.has_edge(source, target, edge_type):
-                        self.graph_engine.graph.remove_edge(source, target, edge_type)
-                        deleted_count += 1
-                else:
-                    # Remove all edges between source and target
-                    if self.graph_engine.graph.has_edge(source, target):
-                        edges_to_remove = list(self.graph_engine.graph.edges(source, target, keys=True))
-                        for edge in edges_to_remove:
-                            self.graph_engine.graph.remove_edge(*edge)
-                        deleted_count += len(edges_to_remove)
+                if source and target:
+                    if edge_type:
+                        # Remove specific edge type
+                        if self.graph_engine.graph.has_edge(source, target, edge_type):
+                            self.graph_engine.graph.remove_edge(source, target, edge_type)
+                            self.graph_engine.notify_change(
+                                'edge', 'removed', {'source': source, 'target': target, 'type': edge_type}
+                            )
+                            deleted_count += 1
+                    else:
+                        # Remove all edges between source and target
+                        if self.graph_engine.graph.has_edge(source, target):
+                            edges_to_remove = list(self.graph_engine.graph.edges(source, target, keys=True))
+                            for edge in edges_to_remove:
+                                self.graph_engine.graph.remove_edge(*edge)
+                                self.graph_engine.notify_change(
+                                    'edge', 'removed', {'source': edge[0], 'target': edge[1], 'type': edge[2]}
+                                )
+                            deleted_count += len(edges_to_remove)
+            self.graph_engine.mark_modified()
         
         return {
             'edges_deleted': deleted_count,
@@ -74,17 +89,22 @@ class BulkOperations:
         """
         updated_count = 0
         
-        for update in updates:
-            node_id = update.get('id')
-            properties = update.get('properties', {})
+        with self.graph_engine.write_locked():
+            for update in updates:
+                node_id = update.get('id')
+                properties = update.get('properties', {})
             
-            if node_id and properties:
-                if not self.graph_engine.use_neo4j:
-                    if node_id in self.graph_engine.graph:
-                        # Update node properties
-                        for key, value in properties.items():
-                            self.graph_engine.graph.nodes[node_id][key] = value
-                        updated_count += 1
+                if node_id and properties:
+                    if not self.graph_engine.use_neo4j:
+                        if node_id in self.graph_engine.graph:
+                            # Update node properties
+                            for key, value in properties.items():
+                                self.graph_engine.graph.nodes[node_id][key] = value
+                            self.graph_engine.notify_change(
+                                'node', 'updated', {'id': node_id, **self.graph_engine.graph.nodes[node_id]}
+                            )
+                            updated_count += 1
+            self.graph_engine.mark_modified()
         
         return {
             'nodes_updated': updated_count,
@@ -101,21 +121,24 @@ class BulkOperations:
         """
         tagged_count = 0
         
-        for node_id in node_ids:
-            if not self.graph_engine.use_neo4j:
-                if node_id in self.graph_engine.graph:
-                    node = self.graph_engine.graph.nodes[node_id]
-                    current_tags = node.get('tags', [])
+        with self.graph_engine.write_locked():
+            for node_id in node_ids:
+                if not self.graph_engine.use_neo4j:
+                    if node_id in self.graph_engine.graph:
+                        node = self.graph_engine.graph.nodes[node_id]
+                        current_tags = node.get('tags', [])
                     
-                    if operation == 'add':
-                        # Add tags (avoid duplicates)
-                        new_tags = list(set(current_tags + tags))
-                        node['tags'] = new_tags
-                    elif operation == 'remove':
-                        # Remove tags
-                        node['tags'] = [t for t in current_tags if t not in tags]
+                        if operation == 'add':
+                            # Add tags (avoid duplicates)
+                            new_tags = list(set(current_tags + tags))
+                            node['tags'] = new_tags
+                        elif operation == 'remove':
+                            # Remove tags
+                            node['tags'] = [t for t in current_tags if t not in tags]
+                        self.graph_engine.notify_change('node', 'updated', {'id': node_id, **node})
                     
-                    tagged_count += 1
+                        tagged_count += 1
+            self.graph_engine.mark_modified()
         
         return {
             'nodes_tagged': tagged_count,
@@ -125,11 +148,12 @@ class BulkOperations:
     def bulk_export_nodes(self, node_ids: List[str]) -> List[Dict]:
         """Export data for multiple nodes"""
         nodes = []
-        for node_id in node_ids:
-            node_data = self.graph_engine.get_nodes()
-            node = next((n for n in node_data if n['id'] == node_id), None)
-            if node:
-                nodes.append(node)
+        with self.graph_engine.read_locked():
+            for node_id in node_ids:
+                node_data = self.graph_engine.get_nodes()
+                node = next((n for n in node_data if n['id'] == node_id), None)
+                if node:
+                    nodes.append(node)
         return nodes
     
     def _bulk_delete_neo4j(self, node_ids: List[str]) -> Dict[str, Any]:
@@ -0,0 +1,694 @@
+"""
+Columnar Graph - Compact in-memory multigraph with integer node ids,
+interned strings, CSR adjacency and columnar property storage
+"""
+import sys
+from array import array
+from collections.abc import MutableMapping
+from itertools import compress
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import networkx as nx
+
+from graph_memory import deep_size, add_usage
+
+try:
+    import numpy as np
+except ImportError:  # Compaction falls back to pure Python
+    np = None
+
+# Edges added since the last compaction are kept in per-node append buffers;
+# the CSR arrays are rebuilt once the buffers hold this share of all edges.
+COMPACT_RATIO = 0.5
+COMPACT_MIN_PENDING = 4096
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class _Columns:
+    """
+    Properties of one kind of element (nodes or edges).
+    
+    Each property key has one list indexed by element number. Each element
+    stores only the id of its shape, the tuple of keys it has, which is shared
+    by every element with the same keys (so no per-element dict exists).
+    """
+    def __init__(self):
+        self.columns: Dict[str, List[Any]] = {}
+        self.shapes: List[Tuple[str, ...]] = [()]
+        self.shape_ids: Dict[Tuple[str, ...], int] = {(): 0}
+        self.shape = array('i')
+    
+    def append(self):
+        """Add an element without properties"""
+        self.shape.append(0)
+    
+    def _set_shape(self, i: int, keys: Tuple[str, ...]):
+        shape_id = self.shape_ids.get(keys)
+        if shape_id is None:
+            shape_id = len(self.shapes)
+            self.shapes.append(keys)
+            self.shape_ids[keys] = shape_id
+        self.shape[i] = shape_id
+    
+    def keys(self, i: int) -> Tuple[str, ...]:
+        return self.shapes[self.shape[i]]
+    
+    def get(self, i: int) -> Dict[str, Any]:
+        """Properties of element i as a new dict"""
+        columns = self.columns
+        return {key: columns[key][i] for key in self.shapes[self.shape[i]]}
+    
+    def value(self, i: int, key: str) -> Any:
+        if key not in self.shapes[self.shape[i]]:
+            raise KeyError(key)
+        return self.columns[key][i]
+    
+    def update(self, i: int, attrs: Dict[str, Any]):
+        """Set properties of element i (keys not given are kept)"""
+        keys = self.shapes[self.shape[i]]
+        added = []
+        for key, value in attrs.items():
+            key = _intern(key)
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = []
+            if len(column) <= i:
+                column.extend([None] * (i + 1 - len(column)))
+            column[i] = value
+            if key not in keys:
+                added.append(key)
+        if added:
+            self._set_shape(i, keys + tuple(added))
+    
+    def remove(self, i: int, key: str):
+        keys = self.shapes[self.shape[i]]
+        if key not in keys:
+            raise KeyError(key)
+        self.columns[key][i] = None
+        self._set_shape(i, tuple(k for k in keys if k != key))
+    
+    def reset(self, i: int):
+        """Drop all properties of element i"""
+        for key in self.shapes[self.shape[i]]:
+            self.columns[key][i] = None
+        self.shape[i] = 0
+    
+    def copy(self) -> '_Columns':
+        """Independent storage with the same elements (values are shared)"""
+        copied = _Columns()
+        copied.columns = {key: column[:] for key, column in self.columns.items()}
+        copied.shapes = self.shapes[:]
+        copied.shape_ids = dict(self.shape_ids)
+        copied.shape = self.shape[:]
+        return copied
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'shapes': self.shapes, 'shape': self.shape.tolist(), 'columns': self.columns}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> '_Columns':
+        columns = cls()
+        columns.shapes = [tuple(_intern(key) for key in keys) for keys in data['shapes']]
+        columns.shape_ids = {keys: i for i, keys in enumerate(columns.shapes)}
+        columns.shape = array('i', data['shape'])
+        columns.columns = {_intern(key): values for key, values in data['columns'].items()}
+        if 'type' in columns.columns:
+            columns.columns['type'] = [_intern(value) for value in columns.columns['type']]
+        return columns
+    
+    def select(self, keep: List[int]) -> '_Columns':
+        """New storage with only the given elements, renumbered in order"""
+        selected = _Columns()
+        selected.shapes = self.shapes
+        selected.shape_ids = self.shape_ids
+        selected.shape = array('i', (self.shape[i] for i in keep))
+        for key, column in self.columns.items():
+            values = [column[i] if i < len(column) else None for i in keep]
+            while values and values[-1] is None:
+                values.pop()
+            selected.columns[key] = values
+        return selected
+
+
+class NodeAttributes(MutableMapping):
+    """Live, mutable view of one node's properties (like graph.nodes[n] in NetworkX)"""
+    def __init__(self, columns: _Columns, index: int):
+        self._columns = columns
+        self._index = index
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._columns.value(self._index, key)
+    
+    def __setitem__(self, key: str, value: Any):
+        self._columns.update(self._index, {key: value})
+    
+    def __delitem__(self, key: str):
+        self._columns.remove(self._index, key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns.keys(self._index))
+    
+    def __len__(self) -> int:
+        return len(self._columns.keys(self._index))
+    
+    def __repr__(self) -> str:
+        return repr(self._columns.get(self._index))
+
+
+class NodeView:
+    """graph.nodes: iterable, callable with data=..., indexable by node id"""
+    def __init__(self, graph: 'ColumnarGraph'):
+        self._graph = graph
+    
+    def __call__(self, data: Any = False, default: Any = None) -> Iterator:
+        graph = self._graph
+        ids, props = graph._ids, graph._node_props
+        if data is False:
+            return iter(self)
+        if data is True:
+            return ((ids[i], props.get(i)) for i in graph._live_nodes())
+        return ((ids[i], props.get(i).get(data, default)) for i in graph._live_nodes())
+    
+    def __iter__(self) -> Iterator:
+        ids = self._graph._ids
+        return (ids[i] for i in self._graph._live_nodes())
+    
+    def __len__(self) -> int:
+        return self._graph.number_of_nodes()
+    
+    def __contains__(self, node_id: Any) -> bool:
+        return node_id in self._graph
+    
+    def __getitem__(self, node_id: Any) -> NodeAttributes:
+        return NodeAttributes(self._graph._node_props, self._graph._require(node_id))
+
+
+class ColumnarGraph:
+    """
+    Directed multigraph with the parts of the NetworkX MultiDiGraph API the
+    backend uses, at a fraction of NetworkX's memory.
+    
+    Nodes are numbered in insertion order; their ids, property keys and edge
+    keys are interned. Edges are parallel arrays (source, target, key id),
+    adjacency is a CSR index per direction plus per-node append buffers for
+    edges added since the last compaction, and properties are stored per
+    column with shared key tuples. Removed nodes and edges are tombstoned;
+    dead edges are dropped when the CSR index is rebuilt.
+    """
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        """Remove all nodes and edges"""
+        self._ids: List[Any] = []
+        self._index: Dict[Any, int] = {}
+        self._alive = bytearray()
+        self._node_count = 0
+        self._node_props = _Columns()
+        self._out_degree = array('q')
+        self._in_degree = array('q')
+        
+        self._src = array('q')
+        self._dst = array('q')
+        self._key = array('i')
+        self._keys: List[Any] = []
+        self._key_ids: Dict[Any, int] = {}
+        self._edge_alive = bytearray()
+        self._edge_count = 0
+        self._edge_props = _Columns()
+        
+        self._out_offsets = array('q', [0])
+        self._out_edges = array('q')
+        self._in_offsets = array('q', [0])
+        self._in_edges = array('q')
+        self._out_pending: Dict[int, array] = {}
+        self._in_pending: Dict[int, array] = {}
+        self._pending = 0
+    
+    # Node and edge lookup
+    
+    def _live_nodes(self) -> Iterator[int]:
+        return compress(range(len(self._ids)), self._alive)
+    
+    def _live_edges(self) -> Iterator[int]:
+        return compress(range(len(self._src)), self._edge_alive)
+    
+    def _lookup(self, node_id: Any) -> Optional[int]:
+        try:
+            i = self._index.get(node_id)
+        except TypeError:  # Unhashable
+            return None
+        return i if i is not None and self._alive[i] else None
+    
+    def _require(self, node_id: Any) -> int:
+        i = self._lookup(node_id)
+        if i is None:
+            raise KeyError(node_id)
+        return i
+    
+    def _adjacent(self, i: int, offsets: array, edges: array, pending: Dict[int, array]) -> List[int]:
+        alive = self._edge_alive
+        found = []
+        if i + 1 < len(offsets):
+            found = [e for e in edges[offsets[i]:offsets[i + 1]] if alive[e]]
+        buffered = pending.get(i)
+        if buffered is not None:
+            found.extend(e for e in buffered if alive[e])
+        return found
+    
+    def _out(self, i: int) -> List[int]:
+        """Live out-edge numbers of node i"""
+        return self._adjacent(i, self._out_offsets, self._out_edges, self._out_pending)
+    
+    def _in(self, i: int) -> List[int]:
+        """Live in-edge numbers of node i"""
+        return self._adjacent(i, self._in_offsets, self._in_edges, self._in_pending)
+    
+    def _find_edges(self, u: int, v: int) -> List[int]:
+        """Live edges u -> v, scanning the shorter of u's out- and v's in-list"""
+        if self._out_degree[u] <= self._in_degree[v]:
+            dst = self._dst
+            return [e for e in self._out(u) if dst[e] == v]
+        src = self._src
+        return [e for e in self._in(v) if src[e] == u]
+    
+    def _find_edge(self, u: int, v: int, key: Any) -> Optional[int]:
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            return None
+        for e in self._find_edges(u, v):
+            if self._key[e] == key_id:
+                return e
+        return None
+    
+    def _nbunch(self, nbunch: Any) -> List[int]:
+        """Node numbers for a single node or an iterable of nodes (NetworkX semantics)"""
+        i = self._lookup(nbunch)
+        if i is not None:
+            return [i]
+        return [i for i in map(self._lookup, nbunch) if i is not None]
+    
+    # Mutation
+    
+    def add_node(self, node_id: Any, **attr):
+        """Add a node, or update the properties of an existing one"""
+        i = self._index.get(node_id)
+        if i is None:
+            node_id = _intern(node_id)
+            i = len(self._ids)
+            self._ids.append(node_id)
+            self._index[node_id] = i
+            self._alive.append(1)
+            self._out_degree.append(0)
+            self._in_degree.append(0)
+            self._node_props.append()
+            self._node_count += 1
+        elif not self._alive[i]:
+            # A removed id gets its old slot back
+            self._alive[i] = 1
+            self._node_count += 1
+        if attr:
+            if type(attr.get('type')) is str:
+                attr['type'] = sys.intern(attr['type'])
+            self._node_props.update(i, attr)
+    
+    def add_edge(self, u: Any, v: Any, key: Any = None, **attr) -> Any:
+        """Add an edge, or update the properties of the edge with the same key"""
+        ui, vi = self._lookup(u), self._lookup(v)
+        if ui is None:
+            self.add_node(u)
+            ui = self._index[u]
+        if vi is None:
+            self.add_node(v)
+            vi = self._index[v]
+        if key is None:
+            used = {self._keys[self._key[e]] for e in self._find_edges(ui, vi)}
+            key = next(k for k in range(len(used) + 1) if k not in used)
+        
+        e = self._find_edge(ui, vi, key)
+        if e is None:
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key = _intern(key)
+                key_id = len(self._keys)
+                self._keys.append(key)
+                self._key_ids[key] = key_id
+            e = len(self._src)
+            self._src.append(ui)
+            self._dst.append(vi)
+            self._key.append(key_id)
+            self._edge_alive.append(1)
+            self._edge_props.append()
+            self._edge_count += 1
+            self._out_degree[ui] += 1
+            self._in_degree[vi] += 1
+            self._out_pending.setdefault(ui, array('q')).append(e)
+            self._in_pending.setdefault(vi, array('q')).append(e)
+            self._pending += 1
+        if attr:
+            if type(attr.get('type')) is str:
+                attr['type'] = sys.intern(attr['type'])
+            self._edge_props.update(e, attr)
+        
+        if self._pending > max(COMPACT_MIN_PENDING, COMPACT_RATIO * self._edge_count):
+            self.compact()
+        return key
+    
+    def _kill_edge(self, e: int):
+        if not self._edge_alive[e]:
+            return
+        self._edge_alive[e] = 0
+        self._edge_count -= 1
+        self._out_degree[self._src[e]] -= 1
+        self._in_degree[self._dst[e]] -= 1
+        self._edge_props.reset(e)
+    
+    def remove_edge(self, u: Any, v: Any, key: Any = None):
+        """Remove the edge u -> v with the given key (the newest one if key is None)"""
+        ui, vi = self._lookup(u), self._lookup(v)
+        e = None
+        if ui is not None and vi is not None:
+            if key is None:
+                edges = self._find_edges(ui, vi)
+                e = max(edges) if edges else None
+            else:
+                e = self._find_edge(ui, vi, key)
+        if e is None:
+            raise nx.NetworkXError(f"The edge {u}-{v} is not in the graph")
+        self._kill_edge(e)
+    
+    def remove_node(self, node_id: Any):
+        """Remove a node and its edges"""
+        i = self._lookup(node_id)
+        if i is None:
+            raise nx.NetworkXError(f"The node {node_id} is not in the graph.")
+        for e in self._out(i) + self._in(i):
+            self._kill_edge(e)
+        self._alive[i] = 0
+        self._node_count -= 1
+        self._node_props.reset(i)
+    
+    # Compaction
+    
+    def _build_csr(self, ends: array) -> Tuple[array, array]:
+        """Offsets and edge numbers of live edges grouped by their end node"""
+        n = len(self._ids)
+        if np is not None:
+            ends_np = np.frombuffer(ends, dtype=np.int64)
+            live = np.flatnonzero(np.frombuffer(self._edge_alive, dtype=np.uint8))
+            order = live[np.argsort(ends_np[live], kind='stable')]
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(ends_np[live], minlength=n), out=offsets[1:])
+            return array('q', offsets.tobytes()), array('q', order.astype(np.int64).tobytes())
+        
+        offsets = array('q', bytes(8 * (n + 1)))
+        for e in self._live_edges():
+            offsets[ends[e] + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        edges = array('q', bytes(8 * offsets[n]))
+        fill = offsets[:-1]
+        for e in self._live_edges():
+            node = ends[e]
+            edges[fill[node]] = e
+            fill[node] += 1
+        return offsets, edges
+    
+    def _drop_dead_edges(self):
+        keep = list(self._live_edges())
+        self._src = array('q', (self._src[e] for e in keep))
+        self._dst = array('q', (self._dst[e] for e in keep))
+        self._key = array('i', (self._key[e] for e in keep))
+        self._edge_alive = bytearray(b'\x01' * len(keep))
+        self._edge_props = self._edge_props.select(keep)
+    
+    def compact(self):
+        """Fold the append buffers into the CSR index (dropping dead edges if they dominate)"""
+        if len(self._src) - self._edge_count > self._edge_count:
+            self._drop_dead_edges()
+        self._out_offsets, self._out_edges = self._build_csr(self._src)
+        self._in_offsets, self._in_edges = self._build_csr(self._dst)
+        self._out_pending = {}
+        self._in_pending = {}
+        self._pending = 0
+    
+    # Queries (NetworkX-compatible)
+    
+    @property
+    def nodes(self) -> NodeView:
+        return NodeView(self)
+    
+    def __contains__(self, node_id: Any) -> bool:
+        return self._lookup(node_id) is not None
+    
+    def __iter__(self) -> Iterator:
+        return iter(self.nodes)
+    
+    def __len__(self) -> int:
+        return self._node_count
+    
+    def has_node(self, node_id: Any) -> bool:
+        return node_id in self
+    
+    def number_of_nodes(self) -> int:
+        return self._node_count
+    
+    def number_of_edges(self) -> int:
+        return self._edge_count
+    
+    def has_edge(self, u: Any, v: Any, key: Any = None) -> bool:
+        ui, vi = self._lookup(u), self._lookup(v)
+        if ui is None or vi is None:
+            return False
+        if key is None:
+            return bool(self._find_edges(ui, vi))
+        return self._find_edge(ui, vi, key) is not None
+    
+    def _edge_tuple(self, e: int, data: Any, keys: bool, default: Any) -> Tuple:
+        edge = (self._ids[self._src[e]], self._ids[self._dst[e]])
+        if keys:
+            edge += (self._keys[self._key[e]],)
+        if data is True:
+            edge += (self._edge_props.get(e),)
+        elif data is not False:
+            edge += (self._edge_props.get(e).get(data, default),)
+        return edge
+    
+    def edges(self, nbunch: Any = None, data: Any = False, keys: bool = False,
+              default: Any = None) -> Iterator[Tuple]:
+        """Edges as (u, v[, key][, data]) tuples, optionally only those leaving nbunch"""
+        if nbunch is None:
+            numbers = self._live_edges()
+        else:
+            numbers = (e for i in self._nbunch(nbunch) for e in self._out(i))
+        return (self._edge_tuple(e, data, keys, default) for e in numbers)
+    
+    out_edges = edges
+    
+    def in_edges(self, nbunch: Any = None, data: Any = False, keys: bool = False,
+                 default: Any = None) -> Iterator[Tuple]:
+        """Edges as (u, v[, key][, data]) tuples, optionally only those entering nbunch"""
+        if nbunch is None:
+            numbers = self._live_edges()
+        else:
+            numbers = (e for i in self._nbunch(nbunch) for e in self._in(i))
+        return (self._edge_tuple(e, data, keys, default) for e in numbers)
+    
+    def successors(self, node_id: Any) -> Iterator:
+        i = self._lookup(node_id)
+        if i is None:
+            raise nx.NetworkXError(f"The node {node_id} is not in the digraph.")
+        ids, dst = self._ids, self._dst
+        return iter(dict.fromkeys(ids[dst[e]] for e in self._out(i)))
+    
+    neighbors = successors
+    
+    def predecessors(self, node_id: Any) -> Iterator:
+        i = self._lookup(node_id)
+        if i is None:
+            raise nx.NetworkXError(f"The node {node_id} is not in the digraph.")
+        ids, src = self._ids, self._src
+        return iter(dict.fromkeys(ids[src[e]] for e in self._in(i)))
+    
+    def _degree(self, nbunch: Any, *counts: array):
+        i = self._lookup(nbunch)
+        if i is not None:
+            return sum(count[i] for count in counts)
+        nodes = self._live_nodes() if nbunch is None else self._nbunch(nbunch)
+        return ((self._ids[i], sum(count[i] for count in counts)) for i in nodes)
+    
+    def degree(self, nbunch: Any = None):
+        """Degree of one node, or (node, degree) pairs for several/all nodes"""
+        return self._degree(nbunch, self._out_degree, self._in_degree)
+    
+    def out_degree(self, nbunch: Any = None):
+        return self._degree(nbunch, self._out_degree)
+    
+    def in_degree(self, nbunch: Any = None):
+        return self._degree(nbunch, self._in_degree)
+    
+    def all_simple_paths(self, source: Any, target: Any, cutoff: Optional[int] = None) -> Iterator[List]:
+        """
+        Simple paths from source to target with at most `cutoff` edges, one per
+        parallel edge (as networkx.all_simple_paths does for multigraphs)
+        """
+        si, ti = self._lookup(source), self._lookup(target)
+        if si is None:
+            raise nx.NodeNotFound(f"source node {source} not in graph")
+        if ti is None:
+            raise nx.NodeNotFound(f"target node {target} not in graph")
+        if cutoff is None:
+            cutoff = self._node_count - 1
+        if cutoff < 1 or si == ti:
+            return
+        
+        dst = self._dst
+        visited = [si]
+        on_path = {si}
+        stack = [iter([dst[e] for e in self._out(si)])]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                on_path.discard(visited.pop())
+            elif len(visited) < cutoff:
+                if child in on_path:
+                    continue
+                if child == ti:
+                    yield [self._ids[i] for i in visited] + [target]
+                else:
+                    visited.append(child)
+                    on_path.add(child)
+                    stack.append(iter([dst[e] for e in self._out(child)]))
+            else:
+                # Last hop: count the remaining edges into the target
+                remaining = [child] + list(stack[-1])
+                for _ in range(remaining.count(ti)):
+                    yield [self._ids[i] for i in visited] + [target]
+                stack.pop()
+                on_path.discard(visited.pop())
+    
+    def memory_usage(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """
+        Estimated memory per node type and edge type
+        
+        Each element is charged its share of the fixed-width arrays, one slot
+        in each column it has, and the objects it references that no element
+        before it referenced (so shared strings are counted once).
+        
+        Returns:
+            {'node_types': {type: {count, bytes}}, 'edge_types': {...}}
+        """
+        def per_slot(slots: int, *parts) -> float:
+            return sum(sys.getsizeof(part) for part in parts) / max(slots, 1)
+        
+        seen = set()
+        usage = {'node_types': {}, 'edge_types': {}}
+        node_slot = per_slot(
+            len(self._ids), self._ids, self._index, self._alive, self._out_degree,
+            self._in_degree, self._out_offsets, self._in_offsets, self._node_props.shape
+        )
+        columns = self._node_props.columns
+        for i in self._live_nodes():
+            keys = self._node_props.keys(i)
+            size = node_slot + 8 * len(keys) + deep_size(self._ids[i], seen)
+            size += sum(deep_size(key, seen) + deep_size(columns[key][i], seen) for key in keys)
+            add_usage(usage['node_types'], columns['type'][i] if 'type' in keys else None, size)
+        
+        edge_slot = per_slot(
+            len(self._src), self._src, self._dst, self._key, self._edge_alive,
+            self._out_edges, self._in_edges, self._edge_props.shape
+        )
+        columns = self._edge_props.columns
+        for e in self._live_edges():
+            keys = self._edge_props.keys(e)
+            key = self._keys[self._key[e]]
+            size = edge_slot + 8 * len(keys) + deep_size(key, seen)
+            size += sum(deep_size(k, seen) + deep_size(columns[k][e], seen) for k in keys)
+            add_usage(usage['edge_types'], key, size)
+        return usage
+    
+    def copy(self) -> 'ColumnarGraph':
+        """
+        Independent copy of the graph (property values are shared, as with
+        NetworkX copy()); copies the arrays rather than rebuilding per element
+        """
+        copied = ColumnarGraph.__new__(ColumnarGraph)
+        copied._ids = self._ids[:]
+        copied._index = dict(self._index)
+        copied._alive = self._alive[:]
+        copied._node_count = self._node_count
+        copied._node_props = self._node_props.copy()
+        copied._out_degree = self._out_degree[:]
+        copied._in_degree = self._in_degree[:]
+        
+        copied._src = self._src[:]
+        copied._dst = self._dst[:]
+        copied._key = self._key[:]
+        copied._keys = self._keys[:]
+        copied._key_ids = dict(self._key_ids)
+        copied._edge_alive = self._edge_alive[:]
+        copied._edge_count = self._edge_count
+        copied._edge_props = self._edge_props.copy()
+        
+        copied._out_offsets = self._out_offsets[:]
+        copied._out_edges = self._out_edges[:]
+        copied._in_offsets = self._in_offsets[:]
+        copied._in_edges = self._in_edges[:]
+        copied._out_pending = {i: edges[:] for i, edges in self._out_pending.items()}
+        copied._in_pending = {i: edges[:] for i, edges in self._in_pending.items()}
+        copied._pending = self._pending
+        return copied
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The whole graph as plain lists and dicts (for JSON dumps; see from_dict)"""
+        return {
+            'ids': self._ids,
+            'alive': self._alive.hex(),
+            'out_degree': self._out_degree.tolist(),
+            'in_degree': self._in_degree.tolist(),
+            'nodes': self._node_props.to_dict(),
+            'src': self._src.tolist(),
+            'dst': self._dst.tolist(),
+            'key': self._key.tolist(),
+            'keys': self._keys,
+            'edge_alive': self._edge_alive.hex(),
+            'edges': self._edge_props.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ColumnarGraph':
+        """Rebuild a graph from to_dict() output, without adding it element by element"""
+        graph = cls()
+        graph._ids = [_intern(node_id) for node_id in data['ids']]
+        graph._index = {node_id: i for i, node_id in enumerate(graph._ids)}
+        graph._alive = bytearray.fromhex(data['alive'])
+        graph._node_count = graph._alive.count(1)
+        graph._node_props = _Columns.from_dict(data['nodes'])
+        graph._out_degree = array('q', data['out_degree'])
+        graph._in_degree = array('q', data['in_degree'])
+        
+        graph._src = array('q', data['src'])
+        graph._dst = array('q', data['dst'])
+        graph._key = array('i', data['key'])
+        graph._keys = [_intern(key) for key in data['keys']]
+        graph._key_ids = {key: i for i, key in enumerate(graph._keys)}
+        graph._edge_alive = bytearray.fromhex(data['edge_alive'])
+        graph._edge_count = graph._edge_alive.count(1)
+        graph._edge_props = _Columns.from_dict(data['edges'])
+        graph.compact()
+        return graph
+    
+    def to_networkx(self) -> nx.MultiDiGraph:
+        """Equivalent NetworkX graph (for algorithms and snapshots)"""
+        graph = nx.MultiDiGraph()
+        ids, keys = self._ids, self._keys
+        graph.add_nodes_from((ids[i], self._node_props.get(i)) for i in self._live_nodes())
+        graph.add_edges_from(
+            (ids[self._src[e]], ids[self._dst[e]], keys[self._key[e]], self._edge_props.get(e))
+            for e in self._live_edges()
+        )
+        return graph
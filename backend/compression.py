@@ -0,0 +1,235 @@
+"""
+Compression - Accept-Encoding negotiated response compression and a
+version-keyed cache of compressed responses
+"""
+import gzip
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app, request, make_response
+from werkzeug.http import parse_accept_header
+
+import serialization
+
+try:
+    import brotli
+except ImportError:  # br is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional
+    zstandard = None
+
+MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/msgpack', 'text/', 'application/javascript', 'image/svg+xml'
+)
+
+# Responses compressed per request use fast levels; cached ones are compressed
+# once per graph version, so they can afford a better ratio.
+LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+CACHED_LEVELS = {'zstd': 10, 'br': 9, 'gzip': 9}
+
+
+def _compress_gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compress_br(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+
+def _compress_zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# Server preference order
+CODECS: Dict[str, Callable[[bytes, int], bytes]] = {}
+if zstandard is not None:
+    CODECS['zstd'] = _compress_zstd
+if brotli is not None:
+    CODECS['br'] = _compress_br
+CODECS['gzip'] = _compress_gzip
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content coding for a request
+    
+    Args:
+        accept_encoding: Accept-Encoding header value
+    
+    Returns:
+        Best supported coding the client accepts, or None for identity
+    """
+    if not accept_encoding:
+        return None
+    accepted = parse_accept_header(accept_encoding)
+    best, best_quality = None, 0
+    for name in CODECS:
+        quality = accepted[name]
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(data: bytes, encoding: str, levels: Dict[str, int] = None) -> bytes:
+    """Compress data with the given content coding"""
+    return CODECS[encoding](data, (levels or LEVELS)[encoding])
+
+
+def _is_compressible(response) -> bool:
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    mimetype = response.mimetype or ''
+    return any(mimetype.startswith(t) for t in COMPRESSIBLE_TYPES)
+
+
+def init_app(app, min_size: int = MIN_SIZE):
+    """
+    Compress eligible responses according to the request's Accept-Encoding
+    
+    Args:
+        app: Flask app
+        min_size: Bodies smaller than this (bytes) are sent as-is
+    """
+    @app.after_request
+    def _compress_response(response):
+        if not _is_compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+class CompressedResponseCache:
+    """
+    Caches finished response bodies per graph version.
+    
+    A repeated request for the same URL, representation (JSON/MessagePack)
+    and graph version is answered from memory, skipping both the view's work
+    and serialization. Each content coding is compressed at most once per
+    entry. Entries for older versions are dropped as soon as a newer version
+    is cached, and the total size is capped with LRU eviction.
+    """
+    def __init__(self, version_fn: Callable[[], int], max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize response cache
+        
+        Args:
+            version_fn: Returns the current graph version, or None when there
+                is no version that covers every change (caching is skipped)
+            max_bytes: Upper bound on the total size of cached bodies
+        """
+        self.version_fn = version_fn
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _evict(self, key: Tuple):
+        entry = self._entries.pop(key)
+        self._size -= sum(len(body) for body in entry['bodies'].values())
+    
+    def _get_body(self, key: Tuple, entry: Dict, encoding: Optional[str]) -> bytes:
+        """Body in the requested coding, compressing the identity body on first use"""
+        name = encoding or 'identity'
+        body = entry['bodies'].get(name)
+        if body is None:
+            body = compress(entry['bodies']['identity'], encoding, CACHED_LEVELS)
+            with self._lock:
+                if name not in entry['bodies'] and self._entries.get(key) is entry:
+                    entry['bodies'][name] = body
+                    self._size += len(body)
+        return body
+    
+    def _build_response(self, key: Tuple, entry: Dict, encoding: Optional[str], state: str):
+        if len(entry['bodies']['identity']) < MIN_SIZE:
+            encoding = None
+        response = current_app.response_class(
+            self._get_body(key, entry, encoding), status=entry['status'], headers=entry['headers']
+        )
+        response.vary.add('Accept-Encoding')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['X-Cache'] = state
+        return response
+    
+    def cached(self, view):
+        """Decorator for GET views whose output only depends on the URL and graph version"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = self.version_fn()
+            if version is None:
+                return view(*args, **kwargs)
+            key = (request.full_path, serialization.wants_msgpack())
+            encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+            
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry['version'] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                else:
+                    entry = None
+                    self.misses += 1
+            if entry is not None:
+                return self._build_response(key, entry, encoding, 'HIT')
+            
+            response = make_response(view(*args, **kwargs))
+            # Only cache successful, complete responses, and only if the
+            # graph did not change while the view was running
+            if (response.status_code != 200 or response.is_streamed or
+                    self.version_fn() != version):
+                return response
+            
+            entry = {
+                'version': version,
+                'status': response.status_code,
+                'headers': [(k, v) for k, v in response.headers.items() if k.lower() != 'content-length'],
+                'bodies': {'identity': response.get_data()}
+            }
+            self._store(key, entry)
+            return self._build_response(key, entry, encoding, 'MISS')
+        return wrapper
+    
+    def _store(self, key: Tuple, entry: Dict):
+        size = len(entry['bodies']['identity'])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # Bodies for older versions can never be served again
+            for old_key in [k for k, e in self._entries.items() if e['version'] < entry['version']]:
+                self._evict(old_key)
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                self._evict(next(iter(self._entries)))
+    
+    def get_stats(self) -> Dict:
+        """Cache hit/miss counters and size"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
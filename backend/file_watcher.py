@@ -0,0 +1,90 @@
+"""
+File Watcher - Polls a directory tree for changes and reports them
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Set, Tuple
+
+
+class FileWatcher:
+    def __init__(self, root: str, on_change: Callable[[Set[Path], Set[Path]], None],
+                 patterns: Tuple[str, ...] = ('*',), interval: float = 2.0):
+        """
+        Initialize file watcher
+        
+        Polling keeps this working on bind mounts (e.g. docker-compose volumes)
+        where inotify events are not always delivered.
+        
+        Args:
+            root: Directory to watch (recursively)
+            on_change: Called with (changed_or_added, removed) sets of paths
+            patterns: Glob patterns of files to watch
+            interval: Seconds between scans
+        """
+        self.root = Path(root)
+        self.on_change = on_change
+        self.patterns = patterns
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._previous = self._scan()
+        self._reported = dict(self._previous)
+    
+    def _scan(self) -> Dict[Path, Tuple[float, int]]:
+        """Map each watched file to its (mtime, size)"""
+        snapshot = {}
+        if not self.root.exists():
+            return snapshot
+        for pattern in self.patterns:
+            for path in self.root.rglob(pattern):
+                if '__pycache__' in path.parts or not path.is_file():
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime, stat.st_size)
+        return snapshot
+    
+    def poll(self):
+        """
+        Scan once and report differences. A changed file is only reported once
+        it looks the same on two consecutive scans, so half-written files
+        (editors truncating then writing) are not picked up.
+        """
+        snapshot = self._scan()
+        changed = {
+            path for path, sig in snapshot.items()
+            if self._previous.get(path) == sig and self._reported.get(path) != sig
+        }
+        removed = set(self._reported) - set(snapshot)
+        self._previous = snapshot
+        for path in changed:
+            self._reported[path] = snapshot[path]
+        for path in removed:
+            del self._reported[path]
+        if changed or removed:
+            try:
+                self.on_change(changed, removed)
+            except Exception as e:
+                print(f"File watcher callback failed for {self.root}: {e}")
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+    
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"watch:{os.path.basename(str(self.root))}", daemon=True
+            )
+            self._thread.start()
+    
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
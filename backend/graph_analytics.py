@@ -9,12 +9,21 @@ class GraphAnalytics:
     def __init__(self, graph_engine):
         self.graph_engine = graph_engine
     
-    def get_statistics(self) -> Dict[str, Any]:
-        """Get comprehensive graph statistics"""
+    def get_statistics(self, snapshot=None) -> Dict[str, Any]:
+        """
+        Get comprehensive graph statistics
+        
+        Args:
+            snapshot: GraphSnapshot to compute on (defaults to the current version)
+        """
         if self.graph_engine.use_neo4j:
             return self._get_neo4j_stats()
         
-        graph = self.graph_engine.graph
+        # Runs on an immutable snapshot, so no lock is held while computing
+        return self._compute_statistics(snapshot or self.graph_engine.snapshot())
+    
+    def _compute_statistics(self, snapshot) -> Dict[str, Any]:
+        graph = snapshot.graph
         if len(graph.nodes) == 0:
             return {"error": "Graph is empty"}
         
@@ -32,8 +41,8 @@ class GraphAnalytics:
         
         # Graph metrics
         try:
-            # Convert to undirected for some metrics
-            undirected = graph.to_undirected()
+            # Undirected view for some metrics (shared per snapshot)
+            undirected = snapshot.undirected()
             
             # Centrality measures (sample top nodes for performance)
             if num_nodes > 0:
@@ -91,20 +100,22 @@ class GraphAnalytics:
                 "error": str(e)
             }
     
-    def find_communities(self, max_communities: int = 10) -> List[Dict[str, Any]]:
+    def find_communities(self, max_communities: int = 10, snapshot=None) -> List[Dict[str, Any]]:
         """Find communities in the graph using Louvain algorithm"""
         if self.graph_engine.use_neo4j:
             return []
         
+        return self._compute_communities(snapshot or self.graph_engine.snapshot(), max_communities)
+    
+    def _compute_communities(self, snapshot, max_communities: int) -> List[Dict[str, Any]]:
         try:
             import networkx.algorithms.community as nx_comm
             
-            graph = self.graph_engine.graph
-            if len(graph.nodes) == 0:
+            if len(snapshot.graph.nodes) == 0:
                 return []
             
-            # Convert to undirected
-            undirected = graph.to_undirected()
+            # Undirected copy, shared per snapshot
+            undirected = snapshot.undirected()
             
             # Use greedy modularity communities
             communities = nx_comm.greedy_modularity_communities(undirected)
@@ -123,26 +134,33 @@ class GraphAnalytics:
             return [{"error": str(e)}]
     
     def get_node_neighbors(self, node_id: str, depth: int = 1) -> Dict[str, Any]:
-        """Get neighbors of a node up to specified depth"""
-        if self.graph_engine.use_neo4j:
-            return {}
+        """
+        Get neighbors of a node up to specified depth
         
-        graph = self.graph_engine.graph
-        if node_id not in graph:
+        depth_1 lists successors then predecessors; with depth > 1, depth_2
+        holds every neighbour of a depth_1 node except the node itself (so it
+        can repeat depth_1 nodes). Deeper levels are not reported.
+        """
+        ego = self.graph_engine.get_ego_network(node_id, min(depth, 2))
+        if ego is None:
             return {"error": "Node not found"}
         
+        successors = [edge['target'] for edge in ego['edges'] if edge['source'] == node_id]
+        predecessors = [edge['source'] for edge in ego['edges'] if edge['target'] == node_id]
         neighbors = {
             "node": node_id,
-            "depth_1": list(graph.successors(node_id)) + list(graph.predecessors(node_id)),
+            "depth_1": list(dict.fromkeys(successors)) + list(dict.fromkeys(predecessors)),
             "total_neighbors": 0
         }
         
         if depth > 1:
-            # Get 2-hop neighbors
+            first = set(neighbors["depth_1"])
             depth_2 = set()
-            for neighbor in neighbors["depth_1"]:
-                depth_2.update(graph.successors(neighbor))
-                depth_2.update(graph.predecessors(neighbor))
+            for edge in ego['edges']:
+                if edge['source'] in first:
+                    depth_2.add(edge['target'])
+                if edge['target'] in first:
+                    depth_2.add(edge['source'])
             depth_2.discard(node_id)
             neighbors["depth_2"] = list(depth_2)
         
@@ -150,7 +168,42 @@ class GraphAnalytics:
         return neighbors
     
     def _get_neo4j_stats(self) -> Dict[str, Any]:
-        """Get statistics from Neo4j"""
-        # Placeholder for Neo4j implementation
-        return {"error": "Neo4j analytics not yet implemented"}
+        """Get statistics from Neo4j with aggregate queries (only counts cross the wire)"""
+        from graph_engine import cypher
+        
+        run = self.graph_engine.run_read
+        num_nodes = run(cypher('count_nodes'))[0]['count']
+        if num_nodes == 0:
+            return {"error": "Graph is empty"}
+        num_edges = run(cypher('count_edges'))[0]['count']
+        
+        type_distribution = {
+            record['type'] or 'Unknown': record['count']
+            for record in run(cypher('node_type_counts'))
+        }
+        edge_type_distribution = {
+            record['type']: record['count']
+            for record in run(cypher('edge_type_counts'))
+        }
+        # Same normalization as networkx degree_centrality
+        top_degree = run(cypher('top_degree'), limit=10)
+        scale = 1 / (num_nodes - 1) if num_nodes > 1 else 1
+        
+        return {
+            "basic": {
+                "nodes": num_nodes,
+                "edges": num_edges,
+                "average_degree": round(2 * num_edges / num_nodes, 2),
+                # Component and betweenness analysis need a graph projection (e.g. GDS)
+                "connected_components": None,
+                "largest_component_size": None
+            },
+            "node_types": type_distribution,
+            "edge_types": edge_type_distribution,
+            "top_nodes_by_degree": [
+                {"id": record['id'], "centrality": round(record['degree'] * scale, 4)}
+                for record in top_degree
+            ],
+            "top_nodes_by_betweenness": []
+        }
 
@@ -1,20 +1,49 @@
 """
 Graph Comparison - Compare two graphs and find differences
 """
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Set, Any, Tuple, Iterator, Callable, Optional
 from collections import defaultdict
+from pathlib import Path
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from graph_hashing import edge_key, is_valid_index
+
+CHANGE_TYPES = ('added', 'removed', 'changed')
+_COMPARISON_ID = re.compile(r'^[0-9a-f]{32}$')
 
 class GraphComparison:
-    def __init__(self, graph_engine):
+    def __init__(self, graph_engine, results_dir: str = 'data/comparisons', max_stored_results: int = 16):
+        """
+        Initialize graph comparison
+        
+        Args:
+            graph_engine: GraphEngine instance
+            results_dir: Directory holding comparison results kept for paging;
+                shared by all workers started from the same directory
+            max_stored_results: Comparison results kept for paging (oldest evicted first)
+        """
         self.graph_engine = graph_engine
+        self.results_dir = Path(results_dir)
+        self.max_stored_results = max_stored_results
+        self._lock = threading.Lock()
     
-    def compare_graphs(self, graph1: Dict, graph2: Dict) -> Dict[str, Any]:
+    def compare_graphs(self, graph1: Dict, graph2: Dict, include_values: bool = True) -> Dict[str, Any]:
         """
         Compare two graphs and return differences
         
+        When both graphs carry a stored hash index (see graph_hashing), buckets
+        with matching digests are skipped wholesale and only items whose content
+        hashes differ are deep-compared.
+        
         Args:
-            graph1: First graph (nodes and edges)
-            graph2: Second graph (nodes and edges)
+            graph1: First graph (nodes and edges, optionally 'hashes')
+            graph2: Second graph (nodes and edges, optionally 'hashes')
+            include_values: If False, changed items only list their changed
+                property keys instead of carrying full old/new copies
         
         Returns:
             Comparison result with added/removed/changed items
@@ -25,47 +54,24 @@ class GraphComparison:
         edges1 = self._normalize_edges(graph1.get('edges', []))
         edges2 = self._normalize_edges(graph2.get('edges', []))
         
-        # Find node differences
-        node_ids1 = set(nodes1.keys())
-        node_ids2 = set(nodes2.keys())
-        
-        added_nodes = [nodes2[nid] for nid in node_ids2 - node_ids1]
-        removed_nodes = [nodes1[nid] for nid in node_ids1 - node_ids2]
-        common_nodes = node_ids1 & node_ids2
-        
-        # Find changed nodes
-        changed_nodes = []
-        for nid in common_nodes:
-            node1 = nodes1[nid]
-            node2 = nodes2[nid]
-            if node1 != node2:
-                changed_nodes.append({
-                    'id': nid,
-                    'old': node1,
-                    'new': node2,
-                    'changes': self._get_property_changes(node1, node2)
-                })
-        
-        # Find edge differences
-        edge_ids1 = set(edges1.keys())
-        edge_ids2 = set(edges2.keys())
-        
-        added_edges = [edges2[eid] for eid in edge_ids2 - edge_ids1]
-        removed_edges = [edges1[eid] for eid in edge_ids1 - edge_ids2]
-        common_edges = edge_ids1 & edge_ids2
-        
-        # Find changed edges
-        changed_edges = []
-        for eid in common_edges:
-            edge1 = edges1[eid]
-            edge2 = edges2[eid]
-            if edge1 != edge2:
-                changed_edges.append({
-                    'id': eid,
-                    'old': edge1,
-                    'new': edge2,
-                    'changes': self._get_property_changes(edge1, edge2)
-                })
+        index1 = graph1.get('hashes')
+        index2 = graph2.get('hashes')
+        use_hashes = (
+            is_valid_index(index1, graph1) and
+            is_valid_index(index2, graph2) and
+            index1['num_buckets'] == index2['num_buckets']
+        )
+        
+        if use_hashes:
+            added_nodes, removed_nodes, changed_nodes, unchanged_nodes = self._diff_hashed(
+                nodes1, nodes2, index1['nodes'], index2['nodes'], include_values
+            )
+            added_edges, removed_edges, changed_edges, unchanged_edges = self._diff_hashed(
+                edges1, edges2, index1['edges'], index2['edges'], include_values
+            )
+        else:
+            added_nodes, removed_nodes, changed_nodes, unchanged_nodes = self._diff_direct(nodes1, nodes2, include_values)
+            added_edges, removed_edges, changed_edges, unchanged_edges = self._diff_direct(edges1, edges2, include_values)
         
         # Statistics
         stats = {
@@ -75,7 +81,7 @@ class GraphComparison:
                 'added': len(added_nodes),
                 'removed': len(removed_nodes),
                 'changed': len(changed_nodes),
-                'unchanged': len(common_nodes) - len(changed_nodes)
+                'unchanged': unchanged_nodes
             },
             'edges': {
                 'total_1': len(edges1),
@@ -83,8 +89,9 @@ class GraphComparison:
                 'added': len(added_edges),
                 'removed': len(removed_edges),
                 'changed': len(changed_edges),
-                'unchanged': len(common_edges) - len(changed_edges)
-            }
+                'unchanged': unchanged_edges
+            },
+            'hash_fast_path': use_hashes
         }
         
         return {
@@ -101,16 +108,72 @@ class GraphComparison:
             }
         }
     
+    def _diff_direct(self, items1: Dict[str, Dict], items2: Dict[str, Dict],
+                     include_values: bool = True) -> Tuple[List, List, List, int]:
+        """Diff two id-keyed item maps by deep equality"""
+        ids1 = set(items1.keys())
+        ids2 = set(items2.keys())
+        
+        added = [items2[item_id] for item_id in ids2 - ids1]
+        removed = [items1[item_id] for item_id in ids1 - ids2]
+        common = ids1 & ids2
+        
+        changed = []
+        for item_id in common:
+            old = items1[item_id]
+            new = items2[item_id]
+            if old != new:
+                changed.append(self._changed_entry(item_id, old, new, include_values))
+        
+        return added, removed, changed, len(common) - len(changed)
+    
+    def _diff_hashed(self, items1: Dict[str, Dict], items2: Dict[str, Dict],
+                     index1: Dict, index2: Dict, include_values: bool = True) -> Tuple[List, List, List, int]:
+        """Diff two id-keyed item maps bucket by bucket using stored hashes"""
+        added = []
+        removed = []
+        changed = []
+        unchanged = 0
+        
+        for bucket1, bucket2, digest1, digest2 in zip(
+            index1['buckets'], index2['buckets'], index1['digests'], index2['digests']
+        ):
+            if digest1 == digest2:
+                # Identical region - same ids with the same content
+                unchanged += len(bucket1)
+                continue
+            
+            for item_id, hash2 in bucket2.items():
+                hash1 = bucket1.get(item_id)
+                if hash1 is None:
+                    added.append(items2[item_id])
+                elif hash1 != hash2 and items1[item_id] != items2[item_id]:
+                    changed.append(self._changed_entry(item_id, items1[item_id], items2[item_id], include_values))
+                else:
+                    unchanged += 1
+            
+            for item_id in bucket1:
+                if item_id not in bucket2:
+                    removed.append(items1[item_id])
+        
+        return added, removed, changed, unchanged
+    
+    def _changed_entry(self, item_id: str, old: Dict, new: Dict, include_values: bool = True) -> Dict[str, Any]:
+        if not include_values:
+            return {
+                'id': item_id,
+                'changed_keys': self._get_changed_keys(old, new)
+            }
+        return {
+            'id': item_id,
+            'old': old,
+            'new': new,
+            'changes': self._get_property_changes(old, new)
+        }
+    
     def _normalize_edges(self, edges: List[Dict]) -> Dict[str, Dict]:
         """Normalize edges to a dictionary keyed by (source, target, type)"""
-        normalized = {}
-        for edge in edges:
-            source = edge.get('source') or edge.get('source_id', '')
-            target = edge.get('target') or edge.get('target_id', '')
-            edge_type = edge.get('type', 'RELATED_TO')
-            key = f"{source}::{target}::{edge_type}"
-            normalized[key] = edge
-        return normalized
+        return {edge_key(edge): edge for edge in edges}
     
     def _get_property_changes(self, old: Dict, new: Dict) -> Dict[str, Any]:
         """Get property changes between two objects"""
@@ -128,56 +191,317 @@ class GraphComparison:
         
         return changes
     
-    def create_diff_graph(self, comparison_result: Dict) -> Dict:
+    def _get_changed_keys(self, old: Dict, new: Dict) -> List[str]:
+        """Get the keys whose values differ between two objects"""
+        return sorted(
+            key for key in set(old.keys()) | set(new.keys())
+            if old.get(key) != new.get(key)
+        )
+    
+    def store_result(self, comparison_result: Dict) -> str:
+        """
+        Keep a comparison result for paging and return its id
+        
+        Each change category is written to disk as one JSON document per line,
+        so the result does not stay in memory and pages are read by seeking to
+        the cursor (a byte offset). The directory is renamed into place once
+        complete, so other workers never see a partial result.
+        """
+        comparison_id = uuid.uuid4().hex
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        staging = self.results_dir / f".{comparison_id}.tmp"
+        staging.mkdir()
+        counts = {}
+        for kind in ('nodes', 'edges'):
+            for change_type in CHANGE_TYPES:
+                items = comparison_result[kind][change_type]
+                with open(staging / f"{kind}.{change_type}.jsonl", 'w', encoding='utf-8') as f:
+                    for item in items:
+                        f.write(json.dumps(item, default=str))
+                        f.write('\n')
+                counts[f"{kind}.{change_type}"] = len(items)
+        with open(staging / 'summary.json', 'w', encoding='utf-8') as f:
+            json.dump({'stats': comparison_result['stats'], 'counts': counts}, f)
+        
+        with self._lock:
+            os.replace(staging, self.results_dir / comparison_id)
+            self._evict()
+        return comparison_id
+    
+    def _evict(self):
+        """Delete the oldest stored results beyond max_stored_results"""
+        stored = []
+        for path in self.results_dir.iterdir():
+            if _COMPARISON_ID.match(path.name):
+                try:
+                    stored.append((path.stat().st_mtime, path))
+                except FileNotFoundError:  # Evicted by another worker meanwhile
+                    continue
+        stored.sort()
+        for _, path in stored[:max(0, len(stored) - self.max_stored_results)]:
+            shutil.rmtree(path, ignore_errors=True)
+    
+    def _result_dir(self, comparison_id: str) -> Optional[Path]:
+        if not _COMPARISON_ID.match(comparison_id):
+            return None
+        path = self.results_dir / comparison_id
+        return path if path.is_dir() else None
+    
+    def _read_summary(self, comparison_id: str) -> Optional[Dict]:
+        path = self._result_dir(comparison_id)
+        if path is None:
+            return None
+        try:
+            with open(path / 'summary.json', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def get_summary(self, comparison_id: str) -> Dict[str, Any]:
+        """
+        Summary of a stored comparison with the first cursor of each change category
+        
+        Returns:
+            Stats plus cursors, or None if the comparison is unknown or evicted
+        """
+        summary = self._read_summary(comparison_id)
+        if summary is None:
+            return None
+        return {
+            'comparison_id': comparison_id,
+            'stats': summary['stats'],
+            'cursors': {
+                kind: {
+                    change_type: ('0' if summary['counts'][f"{kind}.{change_type}"] else None)
+                    for change_type in CHANGE_TYPES
+                }
+                for kind in ('nodes', 'edges')
+            }
+        }
+    
+    def get_page(self, comparison_id: str, kind: str, change_type: str,
+                 cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """
+        Get one page of a change category from a stored comparison
+        
+        Args:
+            comparison_id: Id returned by store_result
+            kind: 'nodes' or 'edges'
+            change_type: 'added', 'removed' or 'changed'
+            cursor: Cursor from a previous page (None for the first page)
+            limit: Maximum number of items to return
+        
+        Returns:
+            Items plus next_cursor (None when exhausted), or None if the comparison is unknown
+        """
+        if kind not in ('nodes', 'edges') or change_type not in CHANGE_TYPES:
+            raise ValueError(f"Unknown change category '{kind}/{change_type}'")
+        
+        try:
+            offset = int(cursor) if cursor else 0
+        except ValueError:
+            raise ValueError(f"Invalid cursor '{cursor}'")
+        if offset < 0 or limit < 1:
+            raise ValueError("Cursor and limit must be positive")
+        
+        summary = self._read_summary(comparison_id)
+        if summary is None:
+            return None
+        items = []
+        try:
+            with open(self.results_dir / comparison_id / f"{kind}.{change_type}.jsonl", 'rb') as f:
+                if offset:
+                    # A cursor always points just past a line break
+                    f.seek(offset - 1)
+                    if f.read(1) != b'\n':
+                        raise ValueError(f"Invalid cursor '{cursor}'")
+                for line in f:
+                    items.append(json.loads(line))
+                    if len(items) == limit:
+                        break
+                end = f.tell()
+                exhausted = not f.read(1)
+        except FileNotFoundError:  # Evicted while paging
+            return None
+        
+        return {
+            'comparison_id': comparison_id,
+            'kind': kind,
+            'change_type': change_type,
+            'items': items,
+            'total': summary['counts'][f"{kind}.{change_type}"],
+            'next_cursor': None if exhausted else str(end)
+        }
+    
+    def create_diff_graph(self, comparison_result: Dict, context_graphs: List[Dict] = None,
+                          hops: int = 0, max_nodes: Optional[int] = None) -> Dict:
         """Create a visualization graph showing differences"""
         nodes = []
         links = []
+        for kind, item in self.iter_diff_graph(comparison_result, context_graphs, hops, max_nodes):
+            (nodes if kind == 'node' else links).append(item)
+        
+        return {
+            'nodes': nodes,
+            'edges': links
+        }
+    
+    def iter_diff_graph(self, comparison_result: Dict, context_graphs: List[Dict] = None,
+                        hops: int = 0, max_nodes: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stream the diff visualization graph as ('node', ...) / ('edge', ...) pairs
+        
+        All nodes are yielded before any edge. Endpoints are resolved through id
+        lookup tables, so the cost is linear in the size of the diff.
+        
+        Args:
+            comparison_result: Result of compare_graphs
+            context_graphs: Graphs to take unchanged neighbors from (new graph first)
+            hops: Include unchanged nodes up to this many hops from changed elements
+            max_nodes: Cap on the number of nodes yielded (closest to changes first)
+        """
+        added_ids = {node['id'] for node in comparison_result['nodes']['added']}
+        removed_ids = {node['id'] for node in comparison_result['nodes']['removed']}
+        bounded = hops > 0 or max_nodes is not None
+        emitted = set()
+        
+        def room() -> bool:
+            return max_nodes is None or len(emitted) < max_nodes
         
         # Add nodes with change indicators
         for node in comparison_result['nodes']['added']:
-            nodes.append({
-                **node,
-                'change_type': 'added',
-                'id': f"added_{node['id']}"
-            })
+            if not room():
+                break
+            emitted.add(f"added_{node['id']}")
+            yield 'node', {**node, 'change_type': 'added', 'id': f"added_{node['id']}"}
         
         for node in comparison_result['nodes']['removed']:
-            nodes.append({
-                **node,
-                'change_type': 'removed',
-                'id': f"removed_{node['id']}"
-            })
+            if not room():
+                break
+            emitted.add(f"removed_{node['id']}")
+            yield 'node', {**node, 'change_type': 'removed', 'id': f"removed_{node['id']}"}
         
         for change in comparison_result['nodes']['changed']:
-            nodes.append({
-                **change['new'],
-                'change_type': 'changed',
-                'id': change['id']
-            })
+            if not room():
+                break
+            emitted.add(change['id'])
+            yield 'node', {**change['new'], 'change_type': 'changed', 'id': change['id']}
+        
+        # Unchanged context around the changes, breadth-first. Bounded output
+        # drops edges with an endpoint that was not emitted, so the unchanged
+        # endpoints of changed edges (distance 0) are always emitted then.
+        context_edges = []
+        if bounded:
+            context_nodes, context_edges = self._collect_context(
+                comparison_result, context_graphs or [], hops, emitted, max_nodes
+            )
+            for node in context_nodes:
+                yield 'node', node
         
         # Add edges with change indicators
-        for edge in comparison_result['edges']['added']:
-            source = edge.get('source') or edge.get('source_id', '')
-            target = edge.get('target') or edge.get('target_id', '')
-            links.append({
-                **edge,
-                'source': f"added_{source}" if any(n['id'] == source and n.get('change_type') == 'added' for n in nodes) else source,
-                'target': f"added_{target}" if any(n['id'] == target and n.get('change_type') == 'added' for n in nodes) else target,
-                'change_type': 'added'
-            })
-        
-        for edge in comparison_result['edges']['removed']:
-            source = edge.get('source') or edge.get('source_id', '')
-            target = edge.get('target') or edge.get('target_id', '')
-            links.append({
-                **edge,
-                'source': f"removed_{source}" if any(n['id'] == source and n.get('change_type') == 'removed' for n in nodes) else source,
-                'target': f"removed_{target}" if any(n['id'] == target and n.get('change_type') == 'removed' for n in nodes) else target,
-                'change_type': 'removed'
-            })
+        for change_type, prefix_ids in (('added', added_ids), ('removed', removed_ids)):
+            for edge in comparison_result['edges'][change_type]:
+                source = edge.get('source') or edge.get('source_id', '')
+                target = edge.get('target') or edge.get('target_id', '')
+                source = f"{change_type}_{source}" if source in prefix_ids else source
+                target = f"{change_type}_{target}" if target in prefix_ids else target
+                if bounded and (source not in emitted or target not in emitted):
+                    continue
+                yield 'edge', {
+                    **edge,
+                    'source': source,
+                    'target': target,
+                    'change_type': change_type
+                }
         
-        return {
-            'nodes': nodes,
-            'edges': links
-        }
-
+        for edge in context_edges:
+            yield 'edge', edge
+    
+    def _collect_context(self, comparison_result: Dict, context_graphs: List[Dict], hops: int,
+                         emitted: Set[str], max_nodes: Optional[int]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        BFS out from the changed elements over the context graphs' adjacency.
+        Unchanged endpoints of changed edges are distance 0; nodes up to `hops`
+        further away are included until max_nodes is reached. Endpoints missing
+        from the context graphs are emitted as bare {'id'} nodes.
+        """
+        node_lookup = {}
+        for graph in reversed(context_graphs):
+            for node in graph.get('nodes', []):
+                node_lookup[node['id']] = node
+        
+        adjacency = defaultdict(list)
+        seen_keys = set()
+        for graph in context_graphs:
+            for edge in graph.get('edges', []):
+                key = edge_key(edge)
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                source = edge.get('source') or edge.get('source_id', '')
+                target = edge.get('target') or edge.get('target_id', '')
+                adjacency[source].append((target, key, edge))
+                adjacency[target].append((source, key, edge))
+        
+        diff_ids = {node['id'] for node in comparison_result['nodes']['added']}
+        diff_ids.update(node['id'] for node in comparison_result['nodes']['removed'])
+        diff_ids.update(change['id'] for change in comparison_result['nodes']['changed'])
+        changed_edge_keys = {change['id'] for change in comparison_result['edges']['changed']}
+        diff_edge_keys = set()
+        endpoints = []
+        for change_type in ('added', 'removed'):
+            for edge in comparison_result['edges'][change_type]:
+                diff_edge_keys.add(edge_key(edge))
+                endpoints.append(edge)
+        endpoints.extend(change['new'] for change in comparison_result['edges']['changed'])
+        
+        visited = set(diff_ids)
+        level = list(diff_ids)
+        context_nodes = []
+        
+        def take(candidates: List[str], endpoints: bool = False) -> bool:
+            """Append unchanged candidates in order; False once the cap is hit"""
+            for node_id in candidates:
+                if node_id not in node_lookup and not endpoints:
+                    continue
+                if max_nodes is not None and len(emitted) >= max_nodes:
+                    return False
+                emitted.add(node_id)
+                node = node_lookup.get(node_id, {'id': node_id})
+                context_nodes.append({**node, 'change_type': 'unchanged'})
+            return True
+        
+        seeds = []
+        for edge in endpoints:
+            for node_id in (edge.get('source') or edge.get('source_id', ''),
+                            edge.get('target') or edge.get('target_id', '')):
+                if node_id not in visited:
+                    visited.add(node_id)
+                    seeds.append(node_id)
+        level.extend(seeds)
+        has_room = take(seeds, endpoints=True)
+        
+        for _ in range(hops):
+            if not has_room or not level:
+                break
+            next_level = []
+            for node_id in level:
+                for neighbor, _, _ in adjacency.get(node_id, ()):
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_level.append(neighbor)
+            has_room = take(next_level)
+            level = next_level
+        
+        # Unchanged edges between nodes that made it into the diff graph
+        context_edges = []
+        edge_keys_taken = set(diff_edge_keys)
+        for node in context_nodes:
+            for neighbor, key, edge in adjacency.get(node['id'], ()):
+                if key in edge_keys_taken or neighbor not in emitted:
+                    continue
+                edge_keys_taken.add(key)
+                change_type = 'changed' if key in changed_edge_keys else 'unchanged'
+                context_edges.append({**edge, 'change_type': change_type})
+        
+        return context_nodes, context_edges
@@ -2,22 +2,347 @@
 Graph Engine - Handles graph operations and storage
 Supports both Neo4j and in-memory graph storage
 """
+import hashlib
 import os
+import sys
+import threading
 import networkx as nx
 from typing import List, Dict, Any, Optional
 import json
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
+from rwlock import ReadWriteLock
+from graph_memory import networkx_memory_usage
+from graph_persistence import apply_change
+
+EGO_DIRECTIONS = ('out', 'in', 'both')
+DEFAULT_NEO4J_BATCH_SIZE = 1000
+# Longer strings (descriptions, hashes, ...) are rarely repeated, so they are not interned
+MAX_INTERNED_LENGTH = 128
+# Every node also carries this label, so id lookups without a known type are indexed too
+ENTITY_LABEL = 'Entity'
+MAX_LABEL_LENGTH = 255
+
+# Cypher cannot take labels, relationship types or hop bounds as parameters.
+# Queries are built only from these templates; {label}, {rel_type}, {name} and
+# {depth} are filled with validated, quoted values, {*_where} with predicates
+# from query_builder.compile_cypher_filters, and the text is cached, so every
+# (template, label) pair yields one stable query text for the plan cache.
+CYPHER_TEMPLATES = {
+    'merge_nodes': (
+        "UNWIND $rows AS row MERGE (n:{entity} {{id: row.id}}) SET n:{label}, n += row.props"
+    ),
+    'create_edges': (
+        "UNWIND $rows AS row "
+        "MATCH (a:{entity} {{id: row.source}}) MATCH (b:{entity} {{id: row.target}}) "
+        "CREATE (a)-[r:{rel_type}]->(b) SET r += row.props"
+    ),
+    'nodes': "MATCH (n:{label}) RETURN n",
+    'edges': "MATCH (a)-[r]->(b) RETURN a.id as source, b.id as target, r",
+    'edges_of_type': "MATCH (a)-[r:{rel_type}]->(b) RETURN a.id as source, b.id as target, r",
+    # Two index-friendly matches instead of one OR over both ends
+    'incident_edges': (
+        "MATCH (a:{entity})-[r]->(b) WHERE a.id IN $ids "
+        "RETURN a.id as source, b.id as target, r "
+        "UNION ALL "
+        "MATCH (a)-[r]->(b:{entity}) WHERE b.id IN $ids AND NOT a.id IN $ids "
+        "RETURN a.id as source, b.id as target, r"
+    ),
+    'ego_center': "MATCH (c:{entity} {{id: $id}}) RETURN c",
+    'ego_edges': (
+        "MATCH (a:{entity})-[r]->(b:{entity}) WHERE a.id IN $ids AND b.id IN $ids "
+        "AND ($types IS NULL OR type(r) IN $types) "
+        "RETURN a.id as source, b.id as target, r"
+    ),
+    'nodes_after': (
+        "MATCH (n:{label}) WHERE $after IS NULL OR n.id > $after "
+        "RETURN n ORDER BY n.id LIMIT $limit"
+    ),
+    'shortest_path': (
+        "MATCH (a:{entity} {{id: $source}}) MATCH (b:{entity} {{id: $target}}) "
+        "MATCH path = shortestPath((a)-[*1..{depth}]->(b)) "
+        "RETURN [node in nodes(path) | node.id] as path"
+    ),
+    'label_constraint': "CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE",
+    'label_index': "CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.id)",
+    'label_entities': (
+        "MATCH (n) WHERE n.id IS NOT NULL AND NOT n:{entity} "
+        "WITH n LIMIT 10000 SET n:{entity} RETURN count(n) AS labelled"
+    ),
+    'query_nodes': "MATCH (n:{entity}) WHERE {node_where} RETURN properties(n) AS n",
+    'query_edges': (
+        "MATCH (a:{entity})-[r]->(b:{entity}) "
+        "WHERE {source_where} AND {target_where} AND {edge_where} "
+        "RETURN a.id AS source, b.id AS target, properties(r) AS props"
+    ),
+    'query_node_types': "MATCH (n:{entity}) WHERE {node_where} RETURN n.type AS type, count(*) AS count",
+    'query_edge_types': (
+        "MATCH (a:{entity})-[r]->(b:{entity}) "
+        "WHERE {source_where} AND {target_where} AND {edge_where} "
+        "RETURN type(r) AS type, count(*) AS count"
+    ),
+    'count_nodes': "MATCH (n:{entity}) RETURN count(n) AS count",
+    'count_edges': "MATCH ()-[r]->() RETURN count(r) AS count",
+    'node_type_counts': "MATCH (n:{entity}) RETURN n.type AS type, count(*) AS count",
+    'edge_type_counts': "MATCH ()-[r]->() RETURN type(r) AS type, count(*) AS count",
+    'top_degree': (
+        "MATCH (n:{entity}) WITH n, size([(n)--() | 1]) AS degree "
+        "ORDER BY degree DESC LIMIT $limit RETURN n.id AS id, degree"
+    ),
+    'clear': "MATCH (n) DETACH DELETE n"
+}
+_EGO_PATTERNS = {'out': ('-', '->'), 'in': ('<-', '-'), 'both': ('-', '-')}
+for _direction, (_left, _right) in _EGO_PATTERNS.items():
+    # One BFS level: unseen neighbours of the frontier, best-connected first
+    CYPHER_TEMPLATES[f'ego_level_{_direction}'] = (
+        "MATCH (a:{entity})" + _left + "[r]" + _right + "(n:{entity}) "
+        "WHERE a.id IN $frontier AND NOT n.id IN $seen AND ($types IS NULL OR type(r) IN $types) "
+        "WITH DISTINCT n "
+        "RETURN n, size([(n)--() | 1]) AS degree ORDER BY degree DESC LIMIT $limit"
+    )
+# LIMIT of an uncapped BFS level (Cypher has no "no limit" value)
+_UNLIMITED = 2 ** 63 - 1
+
+
+def cypher_label(name: str) -> str:
+    """
+    Validate a node label or relationship type and quote it for Cypher
+    
+    Args:
+        name: Label or relationship type (any text; backticks are escaped)
+    
+    Returns:
+        The backtick-quoted name
+    """
+    if (not isinstance(name, str) or not name.strip() or len(name) > MAX_LABEL_LENGTH
+            or '\x00' in name):
+        raise ValueError(f"Invalid label or relationship type {name!r}")
+    return '`' + name.replace('`', '``') + '`'
+
+
+class CypherPredicate(str):
+    """WHERE body built from fixed terms and cypher_label() names, substituted as-is by cypher()"""
+
+
+def schema_name(label: str, suffix: str) -> str:
+    """
+    Name of the constraint or index for a label
+    
+    The label is kept as-is, since labels differing only in case are
+    different labels; a label too long for the name is shortened and a hash
+    of it keeps the name unique.
+    """
+    name = f"{label}_{suffix}"
+    if len(name) > MAX_LABEL_LENGTH:
+        digest = hashlib.sha1(label.encode('utf-8')).hexdigest()[:16]
+        name = f"{label[:MAX_LABEL_LENGTH - len(suffix) - len(digest) - 2]}_{digest}_{suffix}"
+    return name
+
+
+@lru_cache(maxsize=1024, typed=True)
+def cypher(template: str, **parts) -> str:
+    """
+    Query text for a template in CYPHER_TEMPLATES (cached per template and parts)
+    
+    Args:
+        template: Template name
+        **parts: Labels/relationship types/names (quoted), hop bounds
+            (non-negative integers) and CypherPredicate values to substitute
+    
+    Returns:
+        The Cypher query text
+    """
+    values = {'entity': ENTITY_LABEL}
+    for key, value in parts.items():
+        if isinstance(value, int) and not isinstance(value, bool):
+            if value < 0:
+                raise ValueError(f"{key} must be non-negative")
+            values[key] = str(value)
+        elif isinstance(value, CypherPredicate):
+            values[key] = str(value)
+        else:
+            values[key] = cypher_label(value)
+    return CYPHER_TEMPLATES[template].format(**values)
+
+def _intern_value(value: Any) -> Any:
+    if type(value) is str:
+        return sys.intern(value) if len(value) <= MAX_INTERNED_LENGTH else value
+    if type(value) is list:
+        return [_intern_value(item) for item in value]
+    return value
+
+def _intern_properties(properties: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Copy of properties with interned keys and short string values, so the
+    names, domains and types plugins repeat for every node are stored once
+    (the caller's dict is never modified or kept)
+    """
+    if not properties:
+        return {}
+    return {
+        sys.intern(key) if type(key) is str else key: _intern_value(value)
+        for key, value in properties.items()
+    }
+
+def _write_rows(tx, query: str, rows: List[Dict]):
+    """Transaction function for execute_write (may be retried by the driver)"""
+    tx.run(query, rows=rows).consume()
+
+def _incident_edges(graph: nx.MultiDiGraph, node_ids: List[str]) -> List[Dict]:
+    """
+    Edges touching any of node_ids, read from the adjacency of those nodes
+    (each edge once, even if both ends are in node_ids)
+    """
+    wanted = set(node_ids)
+    edges = []
+    for node_id in node_ids:
+        if node_id not in graph:
+            continue
+        for source, target, key, data in graph.out_edges(node_id, keys=True, data=True):
+            edges.append({'source': source, 'target': target, 'type': key, **data})
+        for source, target, key, data in graph.in_edges(node_id, keys=True, data=True):
+            # Edges between two wanted nodes were already added as out-edges
+            if source not in wanted:
+                edges.append({'source': source, 'target': target, 'type': key, **data})
+    return edges
+
+def _ego_network(graph: nx.MultiDiGraph, node_id: str, depth: int, direction: str,
+                 edge_types: Optional[set], max_nodes: Optional[int]) -> Dict[str, Any]:
+    """
+    Bounded BFS from node_id, returning the induced subgraph. When a level
+    would exceed max_nodes, its highest-degree nodes are kept.
+    """
+    def allowed(key) -> bool:
+        return edge_types is None or key in edge_types
+    
+    hops = {node_id: 0}
+    frontier = [node_id]
+    truncated = False
+    for hop in range(1, depth + 1):
+        if not frontier:
+            break
+        candidates = {}
+        for current in frontier:
+            if direction in ('out', 'both'):
+                for _, neighbor, key in graph.out_edges(current, keys=True):
+                    if neighbor not in hops and allowed(key):
+                        candidates[neighbor] = None
+            if direction in ('in', 'both'):
+                for neighbor, _, key in graph.in_edges(current, keys=True):
+                    if neighbor not in hops and allowed(key):
+                        candidates[neighbor] = None
+        next_level = list(candidates)
+        if max_nodes is not None and len(hops) + len(next_level) > max_nodes:
+            next_level.sort(key=graph.degree, reverse=True)
+            next_level = next_level[:max(max_nodes - len(hops), 0)]
+            truncated = True
+        for neighbor in next_level:
+            hops[neighbor] = hop
+        frontier = next_level
+        if truncated:
+            break
+    
+    edges = []
+    for current in hops:
+        for source, target, key, data in graph.out_edges(current, keys=True, data=True):
+            if target in hops and allowed(key):
+                edges.append({'source': source, 'target': target, 'type': key, **data})
+    return {
+        'nodes': [{'id': n, 'hop': hop, **graph.nodes[n]} for n, hop in hops.items()],
+        'edges': edges,
+        'truncated': truncated
+    }
+
+class GraphSnapshot:
+    """
+    Read-only, versioned view of the in-memory graph.
+    
+    Holds the graph as it was at `version`, so long-running analytics,
+    reports and exports can work on it without holding any lock while imports
+    continue. Snapshots of the same version are shared and released once
+    nothing references them.
+    
+    A shared snapshot is a frozen view of the engine's own graph rather than
+    a copy (copy-on-write): while it is alive, the engine copies the graph
+    before its next write section instead.
+    """
+    def __init__(self, graph: nx.MultiDiGraph, version: int, shared: bool = False):
+        # The engine's graph this snapshot views (None if it owns a private copy)
+        self.source = graph if shared else None
+        self.graph = graph.copy(as_view=True) if shared else nx.freeze(graph)
+        self.version = version
+        self.use_neo4j = False
+        self._undirected = None
+    
+    def undirected(self) -> nx.MultiGraph:
+        """Undirected copy of the snapshot, built once and reused"""
+        if self._undirected is None:
+            self._undirected = nx.freeze(self.graph.to_undirected())
+        return self._undirected
+    
+    def get_nodes(self, node_type: Optional[str] = None) -> List[Dict]:
+        return [
+            {'id': node_id, **data}
+            for node_id, data in self.graph.nodes(data=True)
+            if node_type is None or data.get('type') == node_type
+        ]
+    
+    def get_edges(self, edge_type: Optional[str] = None) -> List[Dict]:
+        return [
+            {'source': source, 'target': target, 'type': key, **data}
+            for source, target, key, data in self.graph.edges(keys=True, data=True)
+            if edge_type is None or data.get('type') == edge_type
+        ]
+    
+    def get_full_graph(self) -> Dict:
+        return {
+            'nodes': self.get_nodes(),
+            'edges': self.get_edges(),
+            'version': self.version
+        }
+    
+    def get_incident_edges(self, node_ids: List[str]) -> List[Dict]:
+        return _incident_edges(self.graph, node_ids)
 
 class GraphEngine:
-    def __init__(self, use_neo4j: bool = False):
+    def __init__(self, use_neo4j: bool = False, columnar: bool = False):
         """
         Initialize graph engine
         
         Args:
             use_neo4j: If True, use Neo4j database. Otherwise use in-memory NetworkX
+            columnar: Keep the in-memory graph in a compact ColumnarGraph
+                instead of NetworkX (snapshots are still NetworkX graphs)
         """
         self.use_neo4j = use_neo4j
+        self.columnar = columnar and not use_neo4j
+        # Reads run in parallel, writes are serialized; version counts writes
+        self._lock = ReadWriteLock()
+        self.version = 0
+        self._snapshot_ref = None
+        self.store = None
+        # Position in the shared store this worker has caught up to
+        self._store_version = None
+        self._store_generation = None
+        self._store_offset = 0
+        # Changes of the current outermost write section, to publish to the store
+        self._store_changes = None
+        # True while replaying changes another worker published (and notified)
+        self._replaying = False
+        self._listeners = []
+        # Neo4j: per-thread session reuse and writes buffered until the write section ends
+        self._local = threading.local()
+        self._pending_nodes = {}
+        self._pending_edges = {}
+        self._pending_count = 0
+        self._indexed_labels = set()
         if use_neo4j:
             self._init_neo4j()
+        elif self.columnar:
+            # NumPy-backed; only imported when this backend is used
+            from columnar_graph import ColumnarGraph
+            self.graph = ColumnarGraph()
         else:
             self.graph = nx.MultiDiGraph()  # Directed multigraph for relationships
     
@@ -28,127 +353,532 @@ class GraphEngine:
             uri = os.getenv('NEO4J_URI', 'bolt://localhost:7687')
             user = os.getenv('NEO4J_USER', 'neo4j')
             password = os.getenv('NEO4J_PASSWORD', 'password')
-            self.driver = GraphDatabase.driver(uri, auth=(user, password))
+            self.database = os.getenv('NEO4J_DATABASE') or None
+            self.batch_size = int(os.getenv('NEO4J_BATCH_SIZE', DEFAULT_NEO4J_BATCH_SIZE))
+            self.driver = GraphDatabase.driver(
+                uri,
+                auth=(user, password),
+                max_connection_pool_size=int(os.getenv('NEO4J_MAX_POOL_SIZE', 50)),
+                connection_acquisition_timeout=float(os.getenv('NEO4J_ACQUISITION_TIMEOUT', 60)),
+                max_connection_lifetime=float(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME', 3600)),
+                # How long execute_write keeps retrying transient errors
+                max_transaction_retry_time=float(os.getenv('NEO4J_MAX_RETRY_TIME', 15))
+            )
+            # Fail over to in-memory now rather than on the first query
+            self.driver.verify_connectivity()
         except Exception as e:
             print(f"Neo4j not available, using in-memory: {e}")
             self.use_neo4j = False
             self.graph = nx.MultiDiGraph()
+            return
+        
+        try:
+            self._ensure_neo4j_schema()
+        except Exception as e:
+            print(f"Could not set up Neo4j indexes: {e}")
     
     def add_node(self, node_id: str, node_type: str, properties: Dict[str, Any] = None):
-        """Add a node to the graph"""
-        if properties is None:
-            properties = {}
-        
+        """Add a node to the graph (properties are copied, not stored by reference)"""
+        node_id = sys.intern(node_id) if type(node_id) is str else node_id
+        properties = _intern_properties(properties)
         properties['id'] = node_id
-        properties['type'] = node_type
+        properties['type'] = _intern_value(node_type)
         
-        if self.use_neo4j:
-            self._add_node_neo4j(node_id, node_type, properties)
-        else:
-            self.graph.add_node(node_id, **properties)
+        with self.write_locked():
+            if self.use_neo4j:
+                change = 'added'
+                self._add_node_neo4j(node_id, node_type, properties)
+            else:
+                change = 'updated' if node_id in self.graph else 'added'
+                self.graph.add_node(node_id, **properties)
+            self.version += 1
+            if self._listeners or self._store_changes is not None:
+                self.notify_change('node', change, {'id': node_id, **properties})
     
     def add_edge(self, source: str, target: str, edge_type: str, properties: Dict[str, Any] = None):
-        """Add an edge to the graph"""
-        if properties is None:
-            properties = {}
-        
+        """Add an edge to the graph (properties are copied, not stored by reference)"""
+        source = sys.intern(source) if type(source) is str else source
+        target = sys.intern(target) if type(target) is str else target
+        edge_type = _intern_value(edge_type)
+        properties = _intern_properties(properties)
         properties['type'] = edge_type
         
-        if self.use_neo4j:
-            self._add_edge_neo4j(source, target, edge_type, properties)
-        else:
-            self.graph.add_edge(source, target, key=edge_type, **properties)
+        with self.write_locked():
+            if self.use_neo4j:
+                change = 'added'
+                self._add_edge_neo4j(source, target, edge_type, properties)
+            else:
+                change = 'updated' if self.graph.has_edge(source, target, edge_type) else 'added'
+                self.graph.add_edge(source, target, key=edge_type, **properties)
+            self.version += 1
+            if self._listeners or self._store_changes is not None:
+                self.notify_change('edge', change, {'source': source, 'target': target, **properties})
     
     def get_nodes(self, node_type: Optional[str] = None) -> List[Dict]:
         """Get all nodes, optionally filtered by type"""
-        if self.use_neo4j:
-            return self._get_nodes_neo4j(node_type)
-        else:
-            nodes = []
-            for node_id, data in self.graph.nodes(data=True):
-                if node_type is None or data.get('type') == node_type:
-                    nodes.append({
-                        'id': node_id,
-                        **data
-                    })
-            return nodes
+        with self.read_locked():
+            if self.use_neo4j:
+                return self._get_nodes_neo4j(node_type)
+            else:
+                nodes = []
+                for node_id, data in self.graph.nodes(data=True):
+                    if node_type is None or data.get('type') == node_type:
+                        nodes.append({
+                            'id': node_id,
+                            **data
+                        })
+                return nodes
     
     def get_edges(self, edge_type: Optional[str] = None) -> List[Dict]:
         """Get all edges, optionally filtered by type"""
-        if self.use_neo4j:
-            return self._get_edges_neo4j(edge_type)
-        else:
-            edges = []
-            for source, target, key, data in self.graph.edges(keys=True, data=True):
-                if edge_type is None or data.get('type') == edge_type:
-                    edges.append({
-                        'source': source,
-                        'target': target,
-                        'type': key,
-                        **data
-                    })
-            return edges
+        with self.read_locked():
+            if self.use_neo4j:
+                return self._get_edges_neo4j(edge_type)
+            else:
+                edges = []
+                for source, target, key, data in self.graph.edges(keys=True, data=True):
+                    if edge_type is None or data.get('type') == edge_type:
+                        edges.append({
+                            'source': source,
+                            'target': target,
+                            'type': key,
+                            **data
+                        })
+                return edges
     
     def get_full_graph(self) -> Dict:
         """Get complete graph data"""
-        return {
-            'nodes': self.get_nodes(),
-            'edges': self.get_edges()
-        }
+        with self.read_locked():
+            return {
+                'nodes': self.get_nodes(),
+                'edges': self.get_edges(),
+                'version': self.version
+            }
+    
+    def get_incident_edges(self, node_ids: List[str]) -> List[Dict]:
+        """Get edges touching any of the given nodes (without scanning all edges)"""
+        with self.read_locked():
+            if self.use_neo4j:
+                return self._get_incident_edges_neo4j(node_ids)
+            return _incident_edges(self.graph, node_ids)
+    
+    def get_ego_network(self, node_id: str, depth: int = 1, direction: str = 'both',
+                        edge_types: Optional[List[str]] = None,
+                        max_nodes: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the k-hop neighbourhood of a node as an induced subgraph
+        
+        Args:
+            node_id: Center node
+            depth: Maximum number of hops
+            direction: 'out', 'in' or 'both'
+            edge_types: Only traverse (and return) edges of these types
+            max_nodes: Node cap; the highest-degree nodes of the last level are kept
+        
+        Returns:
+            Nodes (with their hop distance), edges among them and whether the
+            result was truncated, or None if the node does not exist
+        """
+        if depth < 0:
+            raise ValueError("depth must be non-negative")
+        if direction not in EGO_DIRECTIONS:
+            raise ValueError(f"direction must be one of {', '.join(EGO_DIRECTIONS)}")
+        if max_nodes is not None and max_nodes < 1:
+            raise ValueError("max_nodes must be positive")
+        
+        with self.read_locked():
+            if self.use_neo4j:
+                result = self._get_ego_network_neo4j(node_id, depth, direction, edge_types, max_nodes)
+            elif node_id not in self.graph:
+                return None
+            else:
+                result = _ego_network(self.graph, node_id, depth, direction,
+                                      set(edge_types) if edge_types else None, max_nodes)
+        if result is None:
+            return None
+        return {'center': node_id, 'depth': depth, 'direction': direction, **result}
+    
+    def get_nodes_after(self, after_id: Optional[str], limit: int,
+                        node_type: Optional[str] = None) -> List[Dict]:
+        """
+        Get up to `limit` nodes ordered by id, starting after `after_id`
+        (keyset pagination; used in Neo4j mode where there is no snapshot)
+        """
+        with self.read_locked():
+            if self.use_neo4j:
+                return self._get_nodes_after_neo4j(after_id, limit, node_type)
+            node_ids = sorted(
+                node_id for node_id, data in self.graph.nodes(data=True)
+                if (node_type is None or data.get('type') == node_type) and
+                (after_id is None or str(node_id) > after_id)
+            )[:limit]
+            return [{'id': node_id, **self.graph.nodes[node_id]} for node_id in node_ids]
     
     def find_paths(self, source: str, target: str, max_depth: int = 5) -> List[List[str]]:
         """Find all paths between source and target"""
-        if self.use_neo4j:
-            return self._find_paths_neo4j(source, target, max_depth)
-        else:
-            try:
-                paths = list(nx.all_simple_paths(self.graph, source, target, cutoff=max_depth))
-                return [list(path) for path in paths]
-            except nx.NetworkXNoPath:
-                return []
+        with self.read_locked():
+            if self.use_neo4j:
+                return self._find_paths_neo4j(source, target, max_depth)
+            else:
+                try:
+                    if self.columnar:
+                        paths = list(self.graph.all_simple_paths(source, target, cutoff=max_depth))
+                    else:
+                        paths = list(nx.all_simple_paths(self.graph, source, target, cutoff=max_depth))
+                    return [list(path) for path in paths]
+                except nx.NetworkXNoPath:
+                    return []
     
     def clear(self):
         """Clear all graph data"""
+        with self.write_locked():
+            if self.use_neo4j:
+                self._discard_pending_neo4j()
+                self._clear_neo4j()
+            else:
+                self.graph.clear()
+            self.version += 1
+            self.notify_change('graph', 'cleared', {})
+    
+    def read_locked(self):
+        """
+        Hold the read lock across several calls (or direct access to self.graph)
+        so they all see the same state. Reads from other threads still run.
+        """
+        self._sync_from_store()
+        if self._pending_count and self._lock.is_write_held():
+            # Reads inside a write section see its buffered Neo4j writes
+            self._flush_neo4j()
+        return self._lock.read_locked()
+    
+    @contextmanager
+    def write_locked(self):
+        """
+        Hold the write lock across several mutations so readers never observe
+        a half-applied operation. Nested engine calls on this thread are allowed.
+        
+        In Neo4j mode, writes buffered in the section are flushed when the
+        outermost section ends without an error and dropped if it raises
+        (batches that already reached NEO4J_BATCH_SIZE stay written).
+        
+        With a shared store attached, the outermost write section also holds
+        the store's cross-process lock, starts from the latest published graph
+        and publishes the changes it made.
+        """
+        if self.store is None or self._lock.is_write_held():
+            outermost = not self._lock.is_write_held()
+            with self._lock.write_locked():
+                if outermost:
+                    self._detach_snapshot()
+                try:
+                    yield
+                except BaseException:
+                    if outermost:
+                        self._discard_pending_neo4j()
+                    raise
+                if outermost and self._pending_count:
+                    self._flush_neo4j()
+            return
+        
+        with self.store.write_locked():
+            self._sync_from_store()
+            with self._lock.write_locked():
+                self._detach_snapshot()
+                start_version = self.version
+                self._store_changes = []
+                try:
+                    yield
+                finally:
+                    changes, self._store_changes = self._store_changes, None
+                    if self.version != start_version:
+                        self._publish_to_store(changes)
+    
+    def attach_store(self, store):
+        """
+        Share the in-memory graph with other processes through a SharedGraphStore
+        
+        Every worker attached to the same store serves reads from its own copy,
+        replaying the changes other workers publish before its next read.
+        """
         if self.use_neo4j:
-            self._clear_neo4j()
+            return
+        self.store = store
+        with store.write_locked():
+            if not store.has_checkpoint():
+                store.checkpoint(self.version, self.graph)
+                self._store_version, self._store_generation, self._store_offset = store.head()
+        self._sync_from_store()
+    
+    def _publish_to_store(self, changes: List):
+        """Publish a write section's changes, or the whole graph when a checkpoint is due"""
+        if changes and not self.store.needs_checkpoint():
+            self.store.append(self.version, changes)
         else:
-            self.graph.clear()
+            # Also covers direct mutations that reported no change events
+            self.store.checkpoint(self.version, self.graph)
+        self._store_version, self._store_generation, self._store_offset = self.store.head()
+    
+    def _sync_from_store(self):
+        """Catch up with versions published by other processes (replaying their changes)"""
+        if self.store is None or self._lock.is_held():
+            return
+        version, generation, log_end = self.store.head()
+        if version == self._store_version:
+            return
+        
+        with self._lock.write_locked():
+            # Another thread may have caught up while this one waited for the lock
+            version, generation, log_end = self.store.head()
+            if version == self._store_version:
+                return
+            self._replaying = True
+            try:
+                self._replay_from_store(generation, log_end)
+            finally:
+                self._replaying = False
+    
+    def _replay_from_store(self, generation: int, log_end: int):
+        """Apply the store's records up to log_end (caller holds the write lock)"""
+        records = None
+        if generation == self._store_generation:
+            records = self.store.read_changes(generation, self._store_offset, log_end)
+        if records is None:
+            # New worker, or behind a checkpoint: start from the checkpoint
+            loaded = self.store.load_checkpoint(self.columnar)
+            if loaded is None:
+                return
+            self.graph = loaded[2]
+            self.version, self._store_generation, self._store_offset = loaded[0], loaded[1], 0
+            self._store_version = self.version
+            self.notify_change('graph', 'reloaded', {})
+            version, generation, log_end = self.store.head()
+            if generation != self._store_generation:
+                # Another checkpoint landed meanwhile; the next read catches up
+                return
+            records = self.store.read_changes(generation, 0, log_end) or []
+        
+        self._detach_snapshot()
+        for record_version, changes in records:
+            for kind, change, item in changes:
+                apply_change(self, kind, change, item)
+            self.version = record_version
+        self._store_offset = log_end
+        self._store_version = self.version
+    
+    def _detach_snapshot(self):
+        """Copy-on-write: copy the graph before writing if a live snapshot still views it"""
+        snapshot = self._snapshot_ref() if self._snapshot_ref else None
+        if snapshot is not None and snapshot.source is self.graph:
+            self.graph = self.graph.copy()
+    
+    def snapshot(self):
+        """
+        Get a read-only snapshot of the current graph version
+        
+        Taking a snapshot does not copy the NetworkX graph: the snapshot views
+        it, and the next write section copies it only if the snapshot is still
+        in use by then. Columnar graphs are materialized once per version.
+        Snapshots are reused by every caller asking for the same version while
+        any of them still holds it. In Neo4j mode the database handles
+        isolation and the engine itself is returned.
+        """
+        if self.use_neo4j:
+            return self
+        
+        self._sync_from_store()
+        snapshot = self._snapshot_ref() if self._snapshot_ref else None
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        
+        with self.read_locked():
+            snapshot = self._snapshot_ref() if self._snapshot_ref else None
+            if snapshot is None or snapshot.version != self.version:
+                if self.columnar:
+                    # Analytics run NetworkX algorithms, so columnar graphs are materialized
+                    snapshot = GraphSnapshot(self.graph.to_networkx(), self.version)
+                else:
+                    snapshot = GraphSnapshot(self.graph, self.version, shared=True)
+                self._snapshot_ref = weakref.ref(snapshot)
+            return snapshot
+    
+    def add_listener(self, callback):
+        """
+        Register callback(kind, change, item) for graph changes
+        
+        kind is 'node', 'edge' or 'graph'; change is 'added', 'updated',
+        'removed', 'cleared' or 'reloaded'. Callbacks run under the write
+        lock, so they must be quick (e.g. append to a buffer).
+        """
+        # Copy-on-write so notify_change never iterates a list being modified
+        self._listeners = self._listeners + [callback]
+
+    def remove_listener(self, callback):
+        """Unregister a callback added with add_listener"""
+        self._listeners = [listener for listener in self._listeners if listener != callback]
+    
+    def notify_change(self, kind: str, change: str, item: Dict):
+        """Report a change to listeners (also for callers mutating self.graph directly)"""
+        if self._store_changes is not None and change != 'reloaded':
+            self._store_changes.append((kind, change, item))
+        if self._replaying:
+            # The publishing worker already notified its listeners; with
+            # SOCKETIO_MESSAGE_QUEUE its deltas reach every worker's clients
+            return
+        for listener in self._listeners:
+            try:
+                listener(kind, change, item)
+            except Exception as e:
+                print(f"Graph change listener failed: {e}")
+    
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """
+        Estimate the in-memory graph's memory use per node and edge type
+        
+        Returns:
+            Backend name, {type: {count, bytes}} for node_types and
+            edge_types, and the total in bytes
+        """
+        if self.use_neo4j:
+            raise RuntimeError("Memory usage is only reported for the in-memory graph")
+        with self.read_locked():
+            if self.columnar:
+                usage = self.graph.memory_usage()
+            else:
+                usage = networkx_memory_usage(self.graph)
+        total = sum(
+            entry['bytes'] for group in usage.values() for entry in group.values()
+        )
+        return {
+            'backend': 'columnar' if self.columnar else 'networkx',
+            **usage,
+            'total_bytes': total,
+            'version': self.version
+        }
+    
+    def mark_modified(self):
+        """Bump the version after mutating self.graph directly (caller holds the write lock)"""
+        self.version += 1
+    
+    def run_read(self, query: str, **params) -> List[Dict[str, Any]]:
+        """
+        Run a read-only Cypher query (Neo4j mode) and return its records as dicts
+        
+        Args:
+            query: Parameterized Cypher
+            **params: Query parameters
+        """
+        if not self.use_neo4j:
+            raise RuntimeError("Cypher queries require the Neo4j backend")
+        with self.read_locked():
+            with self._session() as session:
+                return [record.data() for record in session.run(query, **params)]
+    
+    @contextmanager
+    def session_scope(self):
+        """
+        Reuse one Neo4j session for every engine call on this thread inside the
+        block (e.g. one HTTP request or import). No-op for the in-memory graph.
+        """
+        if not self.use_neo4j or getattr(self._local, 'session', None) is not None:
+            yield
+            return
+        self._local.session = self.driver.session(database=self.database)
+        try:
+            yield
+        finally:
+            session, self._local.session = self._local.session, None
+            session.close()
     
     # Neo4j methods
+    @contextmanager
+    def _session(self):
+        """The thread's scoped session if there is one, else a short-lived session"""
+        session = getattr(self._local, 'session', None)
+        if session is not None:
+            yield session
+            return
+        with self.driver.session(database=self.database) as session:
+            yield session
+    
+    def _ensure_label_constraint(self, session, label: str):
+        """Unique, indexed id for one node label (idempotent)"""
+        if label in self._indexed_labels:
+            return
+        try:
+            session.run(cypher('label_constraint', name=schema_name(label, 'id_unique'), label=label)).consume()
+        except Exception as e:
+            # e.g. existing duplicate ids; a plain index still speeds up lookups
+            print(f"Could not create unique id constraint for :{label}, using an index: {e}")
+            session.run(cypher('label_index', name=schema_name(label, 'id'), label=label)).consume()
+        self._indexed_labels.add(label)
+    
+    def _ensure_neo4j_schema(self):
+        """
+        Create id constraints for the generic label and every existing label,
+        labelling nodes written by older versions so they are found by id lookups
+        """
+        with self._session() as session:
+            self._ensure_label_constraint(session, ENTITY_LABEL)
+            while True:
+                labelled = session.execute_write(
+                    lambda tx: tx.run(cypher('label_entities')).single()['labelled']
+                )
+                if not labelled:
+                    break
+            for record in session.run("CALL db.labels() YIELD label RETURN label"):
+                self._ensure_label_constraint(session, record['label'])
+    
     def _add_node_neo4j(self, node_id: str, node_type: str, properties: Dict):
-        with self.driver.session() as session:
-            session.run(
-                f"MERGE (n:{node_type} {{id: $id}}) SET n += $props",
-                id=node_id,
-                props=properties
-            )
+        cypher_label(node_type)  # Reject bad labels now, not when the batch is flushed
+        self._pending_nodes.setdefault(node_type, []).append({'id': node_id, 'props': properties})
+        self._pending_count += 1
+        if self._pending_count >= self.batch_size:
+            self._flush_neo4j()
     
     def _add_edge_neo4j(self, source: str, target: str, edge_type: str, properties: Dict):
-        with self.driver.session() as session:
-            session.run(
-                f"MATCH (a), (b) WHERE a.id = $source AND b.id = $target "
-                f"CREATE (a)-[r:{edge_type}]->(b) SET r += $props",
-                source=source,
-                target=target,
-                props=properties
-            )
+        cypher_label(edge_type)
+        self._pending_edges.setdefault(edge_type, []).append(
+            {'source': source, 'target': target, 'props': properties}
+        )
+        self._pending_count += 1
+        if self._pending_count >= self.batch_size:
+            self._flush_neo4j()
+    
+    def _discard_pending_neo4j(self):
+        self._pending_nodes = {}
+        self._pending_edges = {}
+        self._pending_count = 0
+    
+    def _flush_neo4j(self):
+        """
+        Write buffered nodes, then edges, with one UNWIND query per label or
+        relationship type and batch, each in a managed (retried) transaction
+        """
+        nodes, edges = self._pending_nodes, self._pending_edges
+        self._discard_pending_neo4j()
+        with self._session() as session:
+            for node_type, rows in nodes.items():
+                # Schema changes cannot share a transaction with the writes
+                self._ensure_label_constraint(session, node_type)
+                query = cypher('merge_nodes', label=node_type)
+                for start in range(0, len(rows), self.batch_size):
+                    session.execute_write(_write_rows, query, rows[start:start + self.batch_size])
+            for edge_type, rows in edges.items():
+                query = cypher('create_edges', rel_type=edge_type)
+                for start in range(0, len(rows), self.batch_size):
+                    session.execute_write(_write_rows, query, rows[start:start + self.batch_size])
     
     def _get_nodes_neo4j(self, node_type: Optional[str]) -> List[Dict]:
-        with self.driver.session() as session:
-            if node_type:
-                result = session.run(f"MATCH (n:{node_type}) RETURN n")
-            else:
-                result = session.run("MATCH (n) RETURN n")
+        with self._session() as session:
+            result = session.run(cypher('nodes', label=node_type or ENTITY_LABEL))
             return [dict(record['n']) for record in result]
     
     def _get_edges_neo4j(self, edge_type: Optional[str]) -> List[Dict]:
-        with self.driver.session() as session:
+        with self._session() as session:
             if edge_type:
-                result = session.run(
-                    f"MATCH (a)-[r:{edge_type}]->(b) RETURN a.id as source, b.id as target, r"
-                )
+                result = session.run(cypher('edges_of_type', rel_type=edge_type))
             else:
-                result = session.run("MATCH (a)-[r]->(b) RETURN a.id as source, b.id as target, r")
+                result = session.run(cypher('edges'))
             return [
                 {
                     'source': record['source'],
@@ -158,18 +888,76 @@ class GraphEngine:
                 for record in result
             ]
     
+    def _get_incident_edges_neo4j(self, node_ids: List[str]) -> List[Dict]:
+        with self._session() as session:
+            result = session.run(cypher('incident_edges'), ids=list(node_ids))
+            return [
+                {
+                    'source': record['source'],
+                    'target': record['target'],
+                    **dict(record['r'])
+                }
+                for record in result
+            ]
+    
+    def _get_ego_network_neo4j(self, node_id: str, depth: int, direction: str,
+                               edge_types: Optional[List[str]],
+                               max_nodes: Optional[int]) -> Optional[Dict[str, Any]]:
+        # Breadth-first, one query per level: the database never enumerates
+        # paths, and each level stops at the nodes still allowed by max_nodes
+        types = list(edge_types) if edge_types else None
+        with self._session() as session:
+            center = session.run(cypher('ego_center'), id=node_id).single()
+            if center is None:
+                return None
+            
+            nodes = [{**dict(center['c']), 'id': node_id, 'hop': 0}]
+            ids = [node_id]
+            frontier = [node_id]
+            truncated = False
+            for hop in range(1, depth + 1):
+                if not frontier:
+                    break
+                remaining = max_nodes - len(nodes) if max_nodes is not None else None
+                # One extra row tells whether the level had to be cut
+                records = list(session.run(
+                    cypher(f'ego_level_{direction}'), frontier=frontier, seen=ids, types=types,
+                    limit=remaining + 1 if remaining is not None else _UNLIMITED
+                ))
+                if remaining is not None and len(records) > remaining:
+                    records = records[:remaining]
+                    truncated = True
+                frontier = [record['n']['id'] for record in records]
+                nodes.extend({**dict(record['n']), 'hop': hop} for record in records)
+                ids.extend(frontier)
+                if truncated:
+                    break
+            
+            edge_records = session.run(cypher('ego_edges'), ids=ids, types=types)
+            edges = [
+                {'source': record['source'], 'target': record['target'], **dict(record['r'])}
+                for record in edge_records
+            ]
+        return {'nodes': nodes, 'edges': edges, 'truncated': truncated}
+    
+    def _get_nodes_after_neo4j(self, after_id: Optional[str], limit: int,
+                               node_type: Optional[str]) -> List[Dict]:
+        with self._session() as session:
+            result = session.run(
+                cypher('nodes_after', label=node_type or ENTITY_LABEL),
+                after=after_id,
+                limit=limit
+            )
+            return [dict(record['n']) for record in result]
+    
     def _find_paths_neo4j(self, source: str, target: str, max_depth: int) -> List[List[str]]:
-        with self.driver.session() as session:
+        with self._session() as session:
             result = session.run(
-                f"MATCH path = shortestPath((a)-[*1..{max_depth}]->(b)) "
-                "WHERE a.id = $source AND b.id = $target "
-                "RETURN [node in nodes(path) | node.id] as path",
-                source=source,
-                target=target
+                cypher('shortest_path', depth=int(max_depth)), source=source, target=target
             )
             return [record['path'] for record in result]
     
     def _clear_neo4j(self):
-        with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
+        with self._session() as session:
+            session.execute_write(lambda tx: tx.run(cypher('clear')).consume())
 
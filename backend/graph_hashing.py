@@ -0,0 +1,90 @@
+"""
+Graph Hashing - Content hashes and bucketed summaries for fast graph comparison
+"""
+import hashlib
+import json
+from typing import Dict, List, Any
+
+HASH_ALGORITHM = 'blake2b-128'
+DEFAULT_BUCKETS = 256
+
+
+def edge_key(edge: Dict) -> str:
+    """Identity of an edge, keyed by (source, target, type)"""
+    source = edge.get('source') or edge.get('source_id', '')
+    target = edge.get('target') or edge.get('target_id', '')
+    edge_type = edge.get('type', 'RELATED_TO')
+    return f"{source}::{target}::{edge_type}"
+
+
+def content_hash(item: Dict) -> str:
+    """Stable hash of a node or edge's full content"""
+    payload = json.dumps(item, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def bucket_of(item_id: str, num_buckets: int) -> int:
+    """Bucket an item id deterministically (independent of PYTHONHASHSEED)"""
+    digest = hashlib.blake2b(str(item_id).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % num_buckets
+
+
+def _bucket_digest(bucket: Dict[str, str]) -> str:
+    """Summarize a bucket from its sorted (id, hash) pairs"""
+    h = hashlib.blake2b(digest_size=16)
+    for item_id in sorted(bucket):
+        h.update(item_id.encode('utf-8'))
+        h.update(b'\x00')
+        h.update(bucket[item_id].encode('ascii'))
+        h.update(b'\x01')
+    return h.hexdigest()
+
+
+def _build_buckets(items: Dict[str, Dict], num_buckets: int) -> Dict[str, Any]:
+    buckets: List[Dict[str, str]] = [{} for _ in range(num_buckets)]
+    for item_id, item in items.items():
+        buckets[bucket_of(item_id, num_buckets)][item_id] = content_hash(item)
+    return {
+        'buckets': buckets,
+        'digests': [_bucket_digest(bucket) for bucket in buckets]
+    }
+
+
+def compute_graph_hashes(graph_data: Dict, num_buckets: int = DEFAULT_BUCKETS) -> Dict[str, Any]:
+    """
+    Compute per-item content hashes and per-bucket digests for a graph
+    
+    Args:
+        graph_data: Graph data (nodes and edges)
+        num_buckets: Number of buckets items are spread over
+    
+    Returns:
+        Hash index, suitable for storing alongside the graph
+    """
+    nodes = {node['id']: node for node in graph_data.get('nodes', [])}
+    edges = {edge_key(edge): edge for edge in graph_data.get('edges', [])}
+    
+    return {
+        'algorithm': HASH_ALGORITHM,
+        'num_buckets': num_buckets,
+        'node_count': len(nodes),
+        'edge_count': len(edges),
+        'nodes': _build_buckets(nodes, num_buckets),
+        'edges': _build_buckets(edges, num_buckets)
+    }
+
+
+def is_valid_index(index: Any, graph_data: Dict) -> bool:
+    """Check that a stored hash index is usable for the given graph"""
+    if not isinstance(index, dict) or index.get('algorithm') != HASH_ALGORITHM:
+        return False
+    num_buckets = index.get('num_buckets')
+    for kind in ('nodes', 'edges'):
+        section = index.get(kind)
+        if not isinstance(section, dict):
+            return False
+        if len(section.get('buckets', [])) != num_buckets or len(section.get('digests', [])) != num_buckets:
+            return False
+    # Cheap sanity check that the index was built from this graph
+    return (index.get('node_count') == len({n['id'] for n in graph_data.get('nodes', [])}) and
+            index.get('edge_count') == len({edge_key(e) for e in graph_data.get('edges', [])}))
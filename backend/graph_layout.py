@@ -0,0 +1,235 @@
+"""
+Graph Layout - Server-side force-directed layout with per-version caching
+and incremental placement of new nodes
+"""
+import threading
+from typing import Dict, Any, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Layout service is disabled without NumPy
+    np = None
+
+# Up to this many nodes repulsion is computed exactly (all pairs); above it,
+# nodes are repelled by the centers of mass of a coarse grid instead.
+EXACT_REPULSION_MAX = 2000
+CHUNK_SIZE = 512
+EDGE_LENGTH = 30.0
+
+
+def _edge_arrays(snapshot, index: Dict[str, int]):
+    """Edge endpoints as parallel (sources, targets) index arrays, self-loops dropped"""
+    sources = []
+    targets = []
+    for source, target in snapshot.graph.edges():
+        if source != target:
+            sources.append(index[source])
+            targets.append(index[target])
+    return np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64)
+
+
+def _neighbors(graph, node_id: str):
+    """Successors and predecessors of a node in a directed graph"""
+    yield from graph.successors(node_id)
+    yield from graph.predecessors(node_id)
+
+
+def _repulse(x, y, px, py, weights, k2: float, soft: float):
+    """Sum of k^2 * w / d repulsion on points (x, y) from weighted points (px, py), chunked"""
+    disp = np.zeros((len(x), 2))
+    for start in range(0, len(x), CHUNK_SIZE):
+        dx = x[start:start + CHUNK_SIZE, None] - px[None, :]
+        dy = y[start:start + CHUNK_SIZE, None] - py[None, :]
+        w = k2 * weights / np.maximum(dx * dx + dy * dy + soft, 1e-4)
+        disp[start:start + CHUNK_SIZE, 0] = (dx * w).sum(axis=1)
+        disp[start:start + CHUNK_SIZE, 1] = (dy * w).sum(axis=1)
+    return disp
+
+
+def _repulsion_exact(pos, k2: float):
+    x, y = pos[:, 0], pos[:, 1]
+    return _repulse(x, y, x, y, np.ones(len(pos)), k2, 0.0)
+
+
+def _repulsion_grid(pos, k2: float, grid: int):
+    """Repel each node from the center of mass of every grid cell"""
+    lo = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - lo, 1e-9)
+    cell = np.minimum(((pos - lo) / span * grid).astype(np.int64), grid - 1)
+    cell_id = cell[:, 0] * grid + cell[:, 1]
+    mass = np.bincount(cell_id, minlength=grid * grid).astype(np.float64)
+    occupied = mass > 0
+    com = np.stack([
+        np.bincount(cell_id, weights=pos[:, 0], minlength=grid * grid),
+        np.bincount(cell_id, weights=pos[:, 1], minlength=grid * grid)
+    ], axis=1)[occupied] / mass[occupied, None]
+    mass = mass[occupied]
+    # Soften by the cell size so a node's own cell does not explode
+    soft = float((span / grid).max() ** 2) / 4
+    
+    return _repulse(pos[:, 0], pos[:, 1], com[:, 0], com[:, 1], mass, k2, soft)
+
+
+def force_directed(pos, sources, targets, iterations: int = 50,
+                   temperature: Optional[float] = None, k: float = EDGE_LENGTH, mobility=None):
+    """
+    Fruchterman-Reingold layout, vectorized with NumPy
+    
+    Args:
+        pos: (n, 2) initial positions (updated in place)
+        sources: Edge source indices
+        targets: Edge target indices
+        iterations: Number of iterations
+        temperature: Initial maximum displacement per iteration
+            (defaults to a tenth of the layout's extent)
+        k: Ideal edge length
+        mobility: Optional per-node factor (0..1) scaling how far each node may move
+    
+    Returns:
+        The positions
+    """
+    n = len(pos)
+    if n < 2 or iterations < 1:
+        return pos
+    k2 = k * k
+    if temperature is None:
+        temperature = k * np.sqrt(n) / 10
+    grid = int(min(32, max(8, np.sqrt(n) / 4)))
+    gravity = 0.02 * k / np.sqrt(n)
+    
+    for i in range(iterations):
+        if n <= EXACT_REPULSION_MAX:
+            disp = _repulsion_exact(pos, k2)
+        else:
+            disp = _repulsion_grid(pos, k2, grid)
+        
+        if len(sources):
+            delta = pos[sources] - pos[targets]
+            dist = np.sqrt(np.einsum('ij,ij->i', delta, delta)) + 1e-9
+            pull = delta * (dist / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] -= np.bincount(sources, weights=pull[:, axis], minlength=n)
+                disp[:, axis] += np.bincount(targets, weights=pull[:, axis], minlength=n)
+        
+        # Keep disconnected components from drifting apart
+        disp -= gravity * (pos - pos.mean(axis=0)) * k
+        
+        length = np.sqrt(np.einsum('ij,ij->i', disp, disp)) + 1e-9
+        step = temperature * (1 - i / iterations)
+        scale = np.minimum(length, step) / length
+        if mobility is not None:
+            scale *= mobility
+        pos += disp * scale[:, None]
+    return pos
+
+
+class GraphLayout:
+    """
+    Computes node coordinates for the current graph version.
+    
+    Positions are cached per version. When the graph changes, the previous
+    layout is reused: existing nodes keep their coordinates, new nodes are
+    placed at the centroid of their already-placed neighbors, and a short,
+    low-temperature refinement settles them. A full layout is only run when
+    most of the graph is new.
+    """
+    def __init__(self, graph_engine, iterations: int = 50, refine_iterations: int = 15,
+                 full_relayout_ratio: float = 0.5):
+        """
+        Initialize layout service
+        
+        Args:
+            graph_engine: GraphEngine instance
+            iterations: Iterations of a full layout
+            refine_iterations: Iterations after incremental placement
+            full_relayout_ratio: Share of new nodes above which a full layout is run
+        """
+        self.graph_engine = graph_engine
+        self.iterations = iterations
+        self.refine_iterations = refine_iterations
+        self.full_relayout_ratio = full_relayout_ratio
+        self._cache: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+    
+    def get_layout(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Get positions for the current graph version
+        
+        Args:
+            full: Recompute from scratch instead of updating the previous layout
+        
+        Returns:
+            version, positions ({node_id: [x, y]}) and whether the result was
+            cached, incremental or a full layout
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for server-side layout")
+        if self.graph_engine.use_neo4j:
+            raise RuntimeError("Server-side layout is only available for the in-memory graph")
+        
+        snapshot = self.graph_engine.snapshot()
+        with self._lock:
+            cached = self._cache
+            if cached is not None and cached['version'] == snapshot.version and not full:
+                return {**cached, 'mode': 'cached'}
+            
+            node_ids: List[str] = list(snapshot.graph.nodes)
+            index = {node_id: i for i, node_id in enumerate(node_ids)}
+            sources, targets = _edge_arrays(snapshot, index)
+            previous = cached['positions'] if cached is not None and not full else {}
+            
+            known = [node_id in previous for node_id in node_ids]
+            new_count = len(node_ids) - sum(known)
+            if not previous or new_count > self.full_relayout_ratio * len(node_ids):
+                pos = self._initial_positions(len(node_ids))
+                force_directed(pos, sources, targets, self.iterations)
+                mode = 'full'
+            else:
+                pos = self._place_new(node_ids, previous, known, snapshot.graph)
+                if new_count:
+                    # New nodes settle in; the existing layout barely moves
+                    mobility = np.where(known, 0.1, 1.0)
+                    force_directed(pos, sources, targets, self.refine_iterations,
+                                   temperature=EDGE_LENGTH, mobility=mobility)
+                mode = 'incremental'
+            
+            positions = {
+                node_id: [round(float(x), 2), round(float(y), 2)]
+                for node_id, (x, y) in zip(node_ids, pos)
+            }
+            self._cache = {'version': snapshot.version, 'positions': positions}
+            return {**self._cache, 'mode': mode}
+    
+    @staticmethod
+    def _initial_positions(n: int):
+        # Seeded, so the same graph always gets the same layout
+        rng = np.random.default_rng(0)
+        return rng.uniform(-1, 1, size=(n, 2)) * EDGE_LENGTH * np.sqrt(max(n, 1))
+    
+    @staticmethod
+    def _place_new(node_ids: List[str], previous: Dict[str, List[float]], known: List[bool], graph):
+        """Keep known positions; put new nodes next to their placed neighbors"""
+        rng = np.random.default_rng(len(node_ids))
+        pos = np.zeros((len(node_ids), 2))
+        placed = {}
+        for i, node_id in enumerate(node_ids):
+            if known[i]:
+                pos[i] = previous[node_id]
+                placed[node_id] = pos[i]
+        center = pos[np.asarray(known)].mean(axis=0) if placed else np.zeros(2)
+        
+        # Nodes whose neighbors are all new are placed after them (a few passes)
+        pending = [i for i, is_known in enumerate(known) if not is_known]
+        for _ in range(3):
+            remaining = []
+            for i in pending:
+                neighbors = [placed[n] for n in _neighbors(graph, node_ids[i]) if n in placed]
+                if neighbors:
+                    pos[i] = np.mean(neighbors, axis=0) + rng.normal(0, EDGE_LENGTH / 3, 2)
+                    placed[node_ids[i]] = pos[i]
+                else:
+                    remaining.append(i)
+            pending = remaining
+        for i in pending:
+            pos[i] = center + rng.normal(0, EDGE_LENGTH * 3, 2)
+        return pos
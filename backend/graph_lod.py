@@ -0,0 +1,252 @@
+"""
+Graph Level of Detail - Aggregates nodes into super-nodes so clients only
+receive a bounded number of elements, and expands super-nodes on demand
+"""
+import ipaddress
+import threading
+from collections import OrderedDict, Counter, defaultdict
+from typing import Dict, Any, List, Optional
+
+GROUP_BY = ('type', 'domain', 'community', 'subnet')
+SUPER_NODE_TYPE = 'SuperNode'
+OTHER_GROUP = '(other)'
+UNKNOWN_GROUP = '(unknown)'
+
+
+def super_node_id(group_by: str, key: str) -> str:
+    """Id of the super-node for a group (namespaced so it never clashes with real ids)"""
+    return f"group:{group_by}:{key}"
+
+
+def _subnet_of(node_id: str, data: Dict, prefix: int) -> str:
+    address = data.get('ip') or node_id
+    try:
+        ip = ipaddress.ip_address(str(address))
+    except ValueError:
+        return UNKNOWN_GROUP
+    # Prefixes are given for IPv4; IPv6 gets the usual /64 unless asked for more
+    bits = prefix if ip.version == 4 else max(prefix, 64)
+    return str(ipaddress.ip_network(f"{ip}/{bits}", strict=False))
+
+
+def _communities(snapshot) -> Dict[str, str]:
+    """Louvain communities of the snapshot (seeded, so stable per version)"""
+    import networkx.algorithms.community as nx_comm
+    
+    if len(snapshot.graph) == 0:
+        return {}
+    communities = nx_comm.louvain_communities(snapshot.undirected(), seed=0)
+    # Largest community first, so keys are meaningful across calls
+    communities = sorted(communities, key=len, reverse=True)
+    return {node_id: str(i) for i, community in enumerate(communities) for node_id in community}
+
+
+class GraphLOD:
+    """
+    Level-of-detail views of a graph snapshot.
+    
+    Nodes are grouped by type, domain, Louvain community or IP subnet. The
+    overview returns one super-node per group with member counts and
+    aggregated edges (one per group pair and edge type, with a count), capped
+    at `max_groups` by folding the smallest groups into one. Expanding a
+    super-node returns its members (up to a limit), the edges among them,
+    and their edges to other groups aggregated per group, pointing at the
+    same super-nodes as the overview.
+    
+    Only the in-memory graph is supported; in Neo4j mode both views raise
+    RuntimeError.
+    """
+    def __init__(self, graph_engine, max_cached: int = 8):
+        """
+        Initialize level-of-detail service
+        
+        Args:
+            graph_engine: GraphEngine instance
+            max_cached: Number of (version, grouping) assignments to keep
+        """
+        self.graph_engine = graph_engine
+        self.max_cached = max_cached
+        self._groupings = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _grouping(self, snapshot, group_by: str, prefix: int) -> Dict[str, str]:
+        """node id -> group key for one snapshot, computed once per version"""
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Unknown group_by '{group_by}' (expected one of {', '.join(GROUP_BY)})")
+        
+        cache_key = (snapshot.version, group_by, prefix if group_by == 'subnet' else None)
+        with self._lock:
+            if cache_key in self._groupings:
+                self._groupings.move_to_end(cache_key)
+                return self._groupings[cache_key]
+        
+        if group_by == 'community':
+            groups = _communities(snapshot)
+        else:
+            groups = {}
+            for node_id, data in snapshot.graph.nodes(data=True):
+                if group_by == 'subnet':
+                    groups[node_id] = _subnet_of(node_id, data, prefix)
+                else:
+                    groups[node_id] = str(data.get(group_by) or UNKNOWN_GROUP)
+        
+        with self._lock:
+            self._groupings[cache_key] = groups
+            while len(self._groupings) > self.max_cached:
+                self._groupings.popitem(last=False)
+        return groups
+    
+    @staticmethod
+    def _folded(graph, groups: Dict[str, str], max_groups: int) -> set:
+        """Groups folded into OTHER_GROUP: all but the largest max_groups - 1 (if over max_groups)"""
+        sizes = Counter(groups[node_id] for node_id in graph.nodes)
+        if len(sizes) <= max_groups:
+            return set()
+        ranked = sorted(sizes, key=lambda key: sizes[key], reverse=True)
+        return set(ranked[max_groups - 1:])
+    
+    def _require_memory_graph(self):
+        if self.graph_engine.use_neo4j:
+            raise RuntimeError("Level-of-detail views are only available for the in-memory graph")
+    
+    @staticmethod
+    def _aggregate_edges(edge_counts: Counter) -> List[Dict[str, Any]]:
+        return [
+            {'source': source, 'target': target, 'type': edge_type, 'count': count, 'aggregated': True}
+            for (source, target, edge_type), count in edge_counts.items()
+        ]
+    
+    def get_overview(self, group_by: str = 'type', max_groups: int = 200,
+                     prefix: int = 24) -> Dict[str, Any]:
+        """
+        Aggregate the whole graph into super-nodes
+        
+        Args:
+            group_by: 'type', 'domain', 'community' or 'subnet'
+            max_groups: Maximum number of super-nodes returned
+            prefix: IPv4 prefix length for subnet grouping
+        
+        Returns:
+            Super-nodes, aggregated edges and the graph version
+        """
+        if max_groups < 2:
+            raise ValueError("max_groups must be at least 2")
+        self._require_memory_graph()
+        
+        snapshot = self.graph_engine.snapshot()
+        groups = self._grouping(snapshot, group_by, prefix)
+        graph = snapshot.graph
+        
+        members = defaultdict(Counter)
+        for node_id, data in graph.nodes(data=True):
+            members[groups[node_id]][data.get('type', UNKNOWN_GROUP)] += 1
+        
+        # Keep the largest groups; fold the rest into a single "other" group
+        folded = self._folded(graph, groups, max_groups)
+        
+        def visible(key: str) -> str:
+            return OTHER_GROUP if key in folded else key
+        
+        nodes = {}
+        for key, type_counts in members.items():
+            shown = visible(key)
+            node = nodes.setdefault(shown, {
+                'id': super_node_id(group_by, shown),
+                'type': SUPER_NODE_TYPE,
+                'label': shown,
+                'group_by': group_by,
+                'group': shown,
+                'count': 0,
+                'member_types': Counter()
+            })
+            node['count'] += sum(type_counts.values())
+            node['member_types'].update(type_counts)
+            if shown == OTHER_GROUP:
+                node['groups'] = node.get('groups', 0) + 1
+        
+        edge_counts = Counter()
+        for source, target, edge_type in graph.edges(keys=True):
+            edge_counts[(
+                super_node_id(group_by, visible(groups[source])),
+                super_node_id(group_by, visible(groups[target])),
+                edge_type
+            )] += 1
+        
+        for node in nodes.values():
+            node['member_types'] = dict(node['member_types'])
+        
+        return {
+            'nodes': sorted(nodes.values(), key=lambda n: n['count'], reverse=True),
+            'edges': self._aggregate_edges(edge_counts),
+            'group_by': group_by,
+            'total_nodes': graph.number_of_nodes(),
+            'total_edges': graph.number_of_edges(),
+            'version': snapshot.version
+        }
+    
+    def expand(self, group_by: str, group: str, limit: int = 500,
+               prefix: int = 24, max_groups: int = 200) -> Optional[Dict[str, Any]]:
+        """
+        Expand one super-node into its member nodes
+        
+        Args:
+            group_by: Grouping used for the overview
+            group: Group key (the super-node's 'group' field)
+            limit: Maximum number of member nodes returned
+            prefix: IPv4 prefix length for subnet grouping
+            max_groups: max_groups of the overview, so edges to groups it
+                folded point at its "(other)" super-node
+        
+        Returns:
+            Member nodes, edges among them, their edges to other groups
+            aggregated per group, and truncation info; None if the group is empty
+        """
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        if max_groups < 2:
+            raise ValueError("max_groups must be at least 2")
+        self._require_memory_graph()
+        
+        snapshot = self.graph_engine.snapshot()
+        groups = self._grouping(snapshot, group_by, prefix)
+        graph = snapshot.graph
+        
+        if group == OTHER_GROUP:
+            raise ValueError(f"'{OTHER_GROUP}' is a folded group; request a larger max_groups instead")
+        member_ids = [node_id for node_id in graph.nodes if groups[node_id] == group]
+        if not member_ids:
+            return None
+        
+        shown = member_ids[:limit]
+        shown_set = set(shown)
+        folded = self._folded(graph, groups, max_groups)
+        
+        def endpoint(node_id: str) -> str:
+            # Hidden members of this group stay behind the (partial) super-node
+            if node_id in shown_set:
+                return node_id
+            key = groups[node_id]
+            return super_node_id(group_by, OTHER_GROUP if key in folded else key)
+        
+        edges = []
+        edge_counts: Counter = Counter()
+        for node_id in shown:
+            for source, target, edge_type, data in graph.out_edges(node_id, keys=True, data=True):
+                if target in shown_set:
+                    edges.append({'source': source, 'target': target, 'type': edge_type, **data})
+                else:
+                    edge_counts[(source, endpoint(target), edge_type)] += 1
+            for source, target, edge_type in graph.in_edges(node_id, keys=True):
+                if source not in shown_set:
+                    edge_counts[(endpoint(source), target, edge_type)] += 1
+        
+        return {
+            'nodes': [{'id': node_id, **graph.nodes[node_id]} for node_id in shown],
+            'edges': edges + self._aggregate_edges(edge_counts),
+            'group_by': group_by,
+            'group': group,
+            'super_node': super_node_id(group_by, group),
+            'total': len(member_ids),
+            'truncated': len(member_ids) > limit,
+            'version': snapshot.version
+        }
@@ -0,0 +1,54 @@
+"""
+Graph Memory - Estimates of how much memory the in-memory graph uses per
+node type and edge type
+"""
+import sys
+from typing import Any, Dict
+
+import networkx as nx
+
+
+def deep_size(value: Any, seen: set) -> int:
+    """
+    Size in bytes of value and the objects it contains, skipping objects in
+    `seen` (and adding the rest), so shared objects such as interned strings
+    are only counted once across calls
+    """
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    return size
+
+
+def add_usage(usage: Dict[str, Dict[str, int]], group: Any, size: float):
+    """Count one element of `size` bytes towards its group"""
+    entry = usage.setdefault(str(group), {'count': 0, 'bytes': 0})
+    entry['count'] += 1
+    entry['bytes'] += int(size)
+
+
+def networkx_memory_usage(graph: nx.MultiDiGraph) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """
+    Estimated memory per node type and edge type of a NetworkX graph: each
+    element's attribute dict and adjacency dicts, plus the objects it
+    references that no element before it referenced
+    """
+    seen = set()
+    usage = {'node_types': {}, 'edge_types': {}}
+    for node_id, data in graph.nodes(data=True):
+        size = deep_size(node_id, seen) + deep_size(data, seen)
+        size += sys.getsizeof(graph._succ[node_id]) + sys.getsizeof(graph._pred[node_id])
+        add_usage(usage['node_types'], data.get('type'), size)
+    for neighbors in graph._succ.values():
+        for keydict in neighbors.values():
+            # Parallel edges share one key dict (also referenced from _pred)
+            size = sys.getsizeof(keydict)
+            for key, data in keydict.items():
+                add_usage(usage['edge_types'], key, size + deep_size(key, seen) + deep_size(data, seen))
+                size = 0
+    return usage
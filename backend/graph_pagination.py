@@ -0,0 +1,151 @@
+"""
+Graph Pagination - Stable, cursor-based paging over a version-pinned node order
+"""
+import base64
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Opaque, URL-safe cursor for a pagination state"""
+    payload = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor from encode_cursor (raises ValueError if it is malformed)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    if not isinstance(state, dict):
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return state
+
+
+class GraphPaginator:
+    """
+    Pages through the nodes of one graph version, with the edges of each page.
+    
+    The first page pins the current graph snapshot and the order of its nodes;
+    every cursor refers to that version, so pages neither shift nor repeat
+    while imports add nodes mid-scan. Edges are gathered from the adjacency of
+    each page's nodes instead of scanning the whole edge list. In Neo4j mode
+    (no snapshots) pages use keyset pagination ordered by node id.
+    """
+    def __init__(self, graph_engine, max_scans: int = 4):
+        """
+        Initialize paginator
+        
+        Args:
+            graph_engine: GraphEngine instance
+            max_scans: Number of pinned (version, type) orderings to keep;
+                each pins a graph snapshot in memory
+        """
+        self.graph_engine = graph_engine
+        self.max_scans = max_scans
+        self._scans = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _get_scan(self, version: Optional[int], node_type: Optional[str]) -> Optional[Dict]:
+        """Pinned node order for (version, type); version None means the current one"""
+        with self._lock:
+            if version is not None and (version, node_type) in self._scans:
+                self._scans.move_to_end((version, node_type))
+                return self._scans[(version, node_type)]
+        
+        snapshot = self.graph_engine.snapshot()
+        if version is not None and snapshot.version != version:
+            # That version was evicted and the graph has moved on
+            return None
+        
+        key = (snapshot.version, node_type)
+        with self._lock:
+            scan = self._scans.get(key)
+            if scan is None:
+                scan = {
+                    'snapshot': snapshot,
+                    'order': [
+                        node_id for node_id, data in snapshot.graph.nodes(data=True)
+                        if node_type is None or data.get('type') == node_type
+                    ]
+                }
+                self._scans[key] = scan
+                while len(self._scans) > self.max_scans:
+                    self._scans.popitem(last=False)
+            self._scans.move_to_end(key)
+            return scan
+    
+    def get_page(self, cursor: Optional[str] = None, limit: int = 100,
+                 node_type: Optional[str] = None, offset: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Get one page of nodes and the edges touching them
+        
+        Args:
+            cursor: Cursor from a previous page (None to start a new scan)
+            limit: Maximum number of nodes per page
+            node_type: Only page through nodes of this type (new scans only)
+            offset: Start position of a new scan (ignored with a cursor)
+        
+        Returns:
+            Nodes, edges and pagination info (next_cursor is None on the last
+            page), or None if the cursor's graph version is no longer available
+        """
+        if limit < 1 or offset < 0:
+            raise ValueError("Limit must be positive and offset non-negative")
+        
+        state = decode_cursor(cursor) if cursor else {'t': node_type, 'o': offset}
+        if self.graph_engine.use_neo4j:
+            return self._get_keyset_page(state, limit)
+        
+        try:
+            version = int(state['v']) if 'v' in state else None
+            start = int(state.get('o', 0))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid cursor '{cursor}'")
+        if start < 0:
+            raise ValueError(f"Invalid cursor '{cursor}'")
+        
+        scan = self._get_scan(version, state.get('t'))
+        if scan is None:
+            return None
+        
+        snapshot = scan['snapshot']
+        page_ids = scan['order'][start:start + limit]
+        end = start + len(page_ids)
+        next_cursor = None
+        if end < len(scan['order']):
+            next_cursor = encode_cursor({'v': snapshot.version, 't': state.get('t'), 'o': end})
+        
+        return {
+            'nodes': [{'id': node_id, **snapshot.graph.nodes[node_id]} for node_id in page_ids],
+            'edges': snapshot.get_incident_edges(page_ids),
+            'pagination': {
+                'version': snapshot.version,
+                'per_page': limit,
+                'offset': start,
+                'total': len(scan['order']),
+                'next_cursor': next_cursor
+            }
+        }
+    
+    def _get_keyset_page(self, state: Dict[str, Any], limit: int) -> Dict[str, Any]:
+        """Neo4j: nodes ordered by id after the cursor's last id"""
+        if state.get('o'):
+            raise ValueError("Page offsets are not supported with Neo4j; follow next_cursor instead")
+        nodes = self.graph_engine.get_nodes_after(state.get('k'), limit, state.get('t'))
+        next_cursor = None
+        if len(nodes) == limit:
+            next_cursor = encode_cursor({'t': state.get('t'), 'k': nodes[-1]['id']})
+        return {
+            'nodes': nodes,
+            'edges': self.graph_engine.get_incident_edges([node['id'] for node in nodes]),
+            'pagination': {
+                'version': self.graph_engine.version,
+                'per_page': limit,
+                'next_cursor': next_cursor
+            }
+        }
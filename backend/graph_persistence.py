@@ -0,0 +1,489 @@
+"""
+Graph Persistence - Keeps the in-memory graph on local disk as a snapshot
+plus a write-ahead log of the changes made since, for fast warm starts and
+crash recovery
+
+The snapshot and the log hold JSON data only: loading them rebuilds nodes,
+edges and properties and never runs code from the files.
+"""
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+import networkx as nx
+
+from serialization import dumps_bytes, loads
+
+try:
+    import fcntl
+except ImportError:  # Windows: no protection against a second process
+    fcntl = None
+
+SNAPSHOT_FILE = 'graph.snapshot'
+LOCK_FILE = 'persistence.lock'
+_SEGMENT = re.compile(r'^changes\.(\d{8})\.log$')
+# Every log record is framed as (payload length, CRC32 of payload) + payload
+_RECORD_HEADER = struct.Struct('<II')
+# Nodes or edges per line of a graph dump
+DUMP_BATCH = 10000
+
+
+def _segment_name(segment: int) -> str:
+    return f"changes.{segment:08d}.log"
+
+
+def encode_record(record: Any) -> bytes:
+    """Frame one log record (CRC-checked on reading)"""
+    payload = dumps_bytes(record)
+    return _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_records(data: bytes) -> List[Any]:
+    """
+    Decode consecutive complete records framed by encode_record
+    
+    Raises:
+        ValueError: If a record is torn or fails its checksum
+    """
+    records = []
+    position = 0
+    while position < len(data):
+        if len(data) - position < _RECORD_HEADER.size:
+            raise ValueError(f"Torn record header at byte {position}")
+        length, checksum = _RECORD_HEADER.unpack_from(data, position)
+        start = position + _RECORD_HEADER.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            raise ValueError(f"Damaged record at byte {position}")
+        records.append(loads(payload))
+        position = start + length
+    return records
+
+
+def apply_change(graph_engine, kind: str, change: str, item: Dict[str, Any]):
+    """Re-apply one change reported by GraphEngine.notify_change (caller holds the write lock)"""
+    graph = graph_engine.graph
+    if kind == 'node':
+        if change == 'removed':
+            if item['id'] in graph:
+                graph.remove_node(item['id'])
+                graph_engine.mark_modified()
+        else:
+            graph_engine.add_node(item['id'], item.get('type'), item)
+    elif kind == 'edge':
+        source, target, edge_type = item['source'], item['target'], item.get('type')
+        if change == 'removed':
+            if graph.has_edge(source, target, edge_type):
+                graph.remove_edge(source, target, edge_type)
+                graph_engine.mark_modified()
+        else:
+            properties = {k: v for k, v in item.items() if k not in ('source', 'target')}
+            graph_engine.add_edge(source, target, edge_type, properties)
+    elif kind == 'graph' and change == 'cleared':
+        graph_engine.clear()
+
+
+def _fsync_directory(path: Path):
+    """Make file creations and renames in a directory durable (POSIX)"""
+    if os.name != 'posix':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_batches(f: BinaryIO, elements: Iterator):
+    elements = iter(elements)
+    while True:
+        batch = list(islice(elements, DUMP_BATCH))
+        if not batch:
+            return
+        f.write(dumps_bytes(batch) + b'\n')
+
+
+def _read_batches(f: BinaryIO, count: int) -> Iterator:
+    while count > 0:
+        batch = loads(f.readline())
+        if not batch:
+            raise ValueError("Empty batch in graph dump")
+        count -= len(batch)
+        yield from batch
+
+
+def dump_graph(f: BinaryIO, header: Dict[str, Any], graph: Any):
+    """
+    Write a whole graph as JSON lines: the header with the node and edge
+    counts, then the columns of a ColumnarGraph, or batches of
+    [id, properties] nodes and [source, target, key, properties] edges
+    
+    Args:
+        f: File opened for binary writing
+        header: Metadata to store with the graph (version, ...)
+        graph: NetworkX or columnar graph
+    """
+    counts = {'nodes': graph.number_of_nodes(), 'edges': graph.number_of_edges()}
+    if hasattr(graph, 'to_dict'):
+        f.write(dumps_bytes({**header, **counts, 'layout': 'columnar'}) + b'\n')
+        f.write(dumps_bytes(graph.to_dict()) + b'\n')
+        return
+    f.write(dumps_bytes({**header, **counts, 'layout': 'elements'}) + b'\n')
+    _write_batches(f, ([node_id, data] for node_id, data in graph.nodes(data=True)))
+    _write_batches(f, ([source, target, key, data]
+                       for source, target, key, data in graph.edges(keys=True, data=True)))
+
+
+def load_graph(f: BinaryIO, columnar: bool) -> Tuple[Dict[str, Any], Any]:
+    """
+    Read a graph written by dump_graph (converting it if it was written by
+    the other in-memory backend)
+    
+    Args:
+        f: File opened for binary reading
+        columnar: Build a ColumnarGraph instead of a NetworkX graph
+    
+    Returns:
+        (header, graph)
+    
+    Raises:
+        ValueError: If the file is truncated or not a graph dump
+    """
+    header = loads(f.readline())
+    if header.get('layout') == 'columnar':
+        from columnar_graph import ColumnarGraph
+        graph = ColumnarGraph.from_dict(loads(f.readline()))
+        return header, graph if columnar else graph.to_networkx()
+    
+    nodes = _read_batches(f, header['nodes'])
+    edges = _read_batches(f, header['edges'])
+    if columnar:
+        from columnar_graph import ColumnarGraph
+        graph = ColumnarGraph()
+        for node_id, data in nodes:
+            graph.add_node(node_id, **data)
+        for source, target, key, data in edges:
+            graph.add_edge(source, target, key=key, **data)
+    else:
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from((node_id, data) for node_id, data in nodes)
+        graph.add_edges_from((source, target, key, data) for source, target, key, data in edges)
+    return header, graph
+
+
+class GraphPersistence:
+    """
+    Durable copy of a GraphEngine's in-memory graph.
+    
+    Every change the engine reports to its listeners becomes a CRC-framed
+    record in the write-ahead log (`changes.NNNNNNNN.log` segments). Records
+    are only buffered under the engine's lock; a commit thread appends them
+    and fsyncs in groups, waiting up to `sync_interval` after the first
+    pending record so one fsync covers every change made meanwhile. sync()
+    blocks until everything logged so far (or up to a given sequence number,
+    see appended()) is on disk.
+    
+    After `checkpoint_every` changes a background checkpoint starts a new
+    segment, writes the whole graph as `graph.snapshot` and deletes the
+    segments the snapshot covers. Opening loads the snapshot and replays the
+    newer segments, cutting off a torn or corrupt tail left by a crash.
+    
+    Both are plain JSON data, but whoever can write the data directory
+    decides what graph is loaded, so it should only be writable by the
+    server's user.
+    """
+    def __init__(self, data_dir: str, checkpoint_every: int = 1000000,
+                 sync_interval: float = 0.005):
+        """
+        Initialize graph persistence
+        
+        Args:
+            data_dir: Directory for the snapshot and log segments
+            checkpoint_every: Number of logged changes after which a new
+                snapshot is written
+            sync_interval: Latency budget (seconds) for batching log records
+                into one fsync; 0 commits as soon as a record arrives
+        """
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_file = self.data_dir / SNAPSHOT_FILE
+        self.checkpoint_every = checkpoint_every
+        self.sync_interval = sync_interval
+        self.graph_engine = None
+        self._segment = 0
+        self._file = None
+        self._since_checkpoint = 0
+        # _lock guards the record buffer and counters; _io_lock the segment file
+        self._lock = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._buffer: List[bytes] = []
+        self._appended = 0
+        self._durable = 0
+        # Records up to this sequence number were in a commit that failed
+        self._failed = 0
+        # Sequence number of the last record each thread logged
+        self._local = threading.local()
+        self._commit_thread = None
+        self._checkpoint_lock = threading.Lock()
+        self._checkpointing = False
+        self._stop = threading.Event()
+        self._lock_fd = None
+    
+    def _segments(self) -> List[int]:
+        segments = []
+        for path in self.data_dir.iterdir():
+            match = _SEGMENT.match(path.name)
+            if match:
+                segments.append(int(match.group(1)))
+        return sorted(segments)
+    
+    def _open_segment(self, segment: int):
+        f = open(self.data_dir / _segment_name(segment), 'ab')
+        _fsync_directory(self.data_dir)
+        return f
+    
+    def _acquire_directory(self):
+        """Only one process may own a data directory (segments would clash)"""
+        if fcntl is None:
+            return
+        self._lock_fd = open(self.data_dir / LOCK_FILE, 'a+')
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_fd.close()
+            self._lock_fd = None
+            raise RuntimeError(f"Graph data directory {self.data_dir} is used by another process")
+    
+    def open(self, graph_engine) -> Dict[str, Any]:
+        """
+        Load the persisted graph into an engine and start logging its changes
+        
+        Args:
+            graph_engine: In-memory GraphEngine (not Neo4j, no shared store)
+        
+        Returns:
+            Load statistics (snapshot version, replayed changes, seconds)
+        """
+        if graph_engine.use_neo4j or graph_engine.store is not None:
+            raise ValueError("Persistence is only available for a single-process in-memory graph")
+        self._acquire_directory()
+        started = time.perf_counter()
+        
+        snapshot_version = 0
+        first_segment = 0
+        with graph_engine.write_locked():
+            if self.snapshot_file.exists():
+                with open(self.snapshot_file, 'rb') as f:
+                    header, graph_engine.graph = load_graph(f, graph_engine.columnar)
+                snapshot_version = header['version']
+                first_segment = header['segment']
+            graph_engine.version = snapshot_version
+            
+            replayed = 0
+            segments = [s for s in self._segments() if s >= first_segment]
+            for segment in segments:
+                replayed += self._replay(graph_engine, self.data_dir / _segment_name(segment))
+        
+        # New changes always go to a fresh segment (the last one may end in a torn record)
+        self._segment = (segments[-1] + 1) if segments else first_segment
+        self._file = self._open_segment(self._segment)
+        self._since_checkpoint = replayed
+        self.graph_engine = graph_engine
+        graph_engine.add_listener(self._on_change)
+        self._commit_thread = threading.Thread(target=self._commit_loop, name='graph-wal', daemon=True)
+        self._commit_thread.start()
+        if replayed >= self.checkpoint_every:
+            self._start_checkpoint()
+        
+        return {
+            'snapshot_version': snapshot_version,
+            'replayed_changes': replayed,
+            'nodes': graph_engine.graph.number_of_nodes(),
+            'edges': graph_engine.graph.number_of_edges(),
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+    
+    def _replay(self, graph_engine, path: Path) -> int:
+        """Apply the records of one log segment, truncating it at a torn or corrupt record"""
+        replayed = 0
+        good_end = 0
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if not header:
+                    break
+                damage = None
+                if len(header) < _RECORD_HEADER.size:
+                    damage = 'torn record header'
+                else:
+                    length, checksum = _RECORD_HEADER.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) < length:
+                        damage = 'torn record'
+                    elif zlib.crc32(payload) != checksum:
+                        damage = 'checksum mismatch'
+                if damage:
+                    print(f"Recovered {path.name} up to byte {good_end} ({damage}); dropping the rest")
+                    break
+                kind, change, item = loads(payload)
+                apply_change(graph_engine, kind, change, item)
+                replayed += 1
+                good_end = f.tell()
+        if good_end < path.stat().st_size:
+            os.truncate(path, good_end)
+        return replayed
+    
+    def _on_change(self, kind: str, change: str, item: Dict[str, Any]):
+        """Engine listener (runs under the engine's write lock): append one record"""
+        if kind == 'graph' and change == 'reloaded':
+            return
+        record = encode_record((kind, change, item))
+        with self._lock:
+            self._buffer.append(record)
+            self._appended += 1
+            self._local.appended = self._appended
+            self._since_checkpoint += 1
+            if len(self._buffer) == 1:
+                self._lock.notify_all()
+        if self._since_checkpoint >= self.checkpoint_every:
+            self._start_checkpoint()
+    
+    def _commit_loop(self):
+        """Group commit: gather records for up to sync_interval, then write and fsync once"""
+        while not self._stop.is_set():
+            with self._lock:
+                while not self._buffer and not self._stop.is_set():
+                    self._lock.wait()
+            if self.sync_interval:
+                self._stop.wait(self.sync_interval)
+            try:
+                self.commit()
+            except Exception as e:
+                print(f"Write-ahead log commit failed: {e}")
+                self._stop.wait(1)
+    
+    def _commit_locked(self):
+        """Append and fsync the buffered records (caller holds _io_lock)"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            target = self._appended
+        if batch and self._file is not None:
+            try:
+                self._file.write(b''.join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError:
+                # Keep the records for the next attempt, but fail the sync() calls waiting for them
+                with self._lock:
+                    self._buffer[:0] = batch
+                    self._failed = max(self._failed, target)
+                    self._lock.notify_all()
+                raise
+        with self._lock:
+            self._durable = max(self._durable, target)
+            self._lock.notify_all()
+    
+    def commit(self):
+        """Write and fsync every record logged so far"""
+        with self._io_lock:
+            self._commit_locked()
+    
+    def appended(self) -> int:
+        """Sequence number of the last change logged by the calling thread (0 if none)"""
+        return getattr(self._local, 'appended', 0)
+    
+    def sync(self, timeout: float = None, sequence: int = None) -> bool:
+        """
+        Wait until logged changes are durable (joining the next group commit
+        instead of forcing an fsync of its own)
+        
+        Args:
+            timeout: Maximum seconds to wait
+            sequence: Wait only for the changes up to this sequence number
+                (from appended()); by default for everything logged so far
+        
+        Returns:
+            True if the changes are on disk, False on timeout or if the
+            commit failed
+        """
+        with self._lock:
+            target = self._appended if sequence is None else sequence
+            self._lock.wait_for(
+                lambda: self._durable >= target or self._failed >= target, timeout
+            )
+            return self._durable >= target
+    
+    def _start_checkpoint(self):
+        with self._lock:
+            if self._checkpointing:
+                return
+            self._checkpointing = True
+        threading.Thread(target=self.checkpoint, name='graph-checkpoint', daemon=True).start()
+    
+    def checkpoint(self):
+        """
+        Write a new snapshot and drop the log segments it covers
+        
+        Writers are paused only while the log switches to a new segment and
+        a snapshot of the graph is taken (a copy-on-write view of a NetworkX
+        graph, an array copy of a columnar one); the snapshot is serialized
+        after the engine lock is released.
+        """
+        with self._checkpoint_lock:
+            try:
+                with self.graph_engine.write_locked():
+                    with self._io_lock:
+                        # Everything logged so far belongs to the old segment
+                        self._commit_locked()
+                        self._file.close()
+                        self._segment += 1
+                        self._file = self._open_segment(self._segment)
+                    with self._lock:
+                        self._since_checkpoint = 0
+                    header = {'version': self.graph_engine.version, 'segment': self._segment}
+                    if self.graph_engine.columnar:
+                        graph = self.graph_engine.graph.copy()
+                    else:
+                        # Held until the dump is written, so writers copy the graph instead
+                        snapshot = self.graph_engine.snapshot()
+                        graph = snapshot.graph
+                
+                tmp_file = self.snapshot_file.with_suffix('.tmp')
+                with open(tmp_file, 'wb') as f:
+                    dump_graph(f, header, graph)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.snapshot_file)
+                _fsync_directory(self.data_dir)
+                for segment in self._segments():
+                    if segment < self._segment:
+                        (self.data_dir / _segment_name(segment)).unlink()
+            except Exception as e:
+                print(f"Graph checkpoint failed: {e}")
+            finally:
+                with self._lock:
+                    self._checkpointing = False
+    
+    def close(self):
+        """Stop logging and commit the remaining records (the next open replays them)"""
+        if self.graph_engine is not None:
+            self.graph_engine.remove_listener(self._on_change)
+        with self._lock:
+            self._stop.set()
+            self._lock.notify_all()
+        if self._commit_thread is not None:
+            self._commit_thread.join()
+        with self._io_lock:
+            self._commit_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self._lock_fd is not None:
+            self._lock_fd.close()
+            self._lock_fd = None
@@ -3,6 +3,7 @@ Graph Templates - Predefined graph structures and patterns
 """
 from typing import Dict, List, Any
 import json
+import threading
 from pathlib import Path
 
 class GraphTemplates:
@@ -16,18 +17,55 @@ class GraphTemplates:
         self.templates_dir = Path(templates_dir)
         self.templates_dir.mkdir(parents=True, exist_ok=True)
         self.templates = {}
+        self._template_files: Dict[Path, str] = {}
+        self._reload_lock = threading.Lock()
+        self._watcher = None
         self._load_templates()
     
     def _load_templates(self):
         """Load all templates from directory"""
         for template_file in self.templates_dir.glob("*.json"):
-            try:
-                with open(template_file, 'r') as f:
-                    template_data = json.load(f)
-                    template_id = template_data.get('id', template_file.stem)
-                    self.templates[template_id] = template_data
-            except Exception as e:
-                print(f"Failed to load template {template_file}: {e}")
+            self._reload_template_file(template_file)
+    
+    def _reload_template_file(self, template_file: Path):
+        """
+        (Re)load one template file, or drop its template if the file is gone.
+        The templates table is swapped in one assignment so readers never see
+        a half-updated set; an unparsable file keeps its previous version.
+        """
+        with self._reload_lock:
+            template_data = None
+            if template_file.exists():
+                try:
+                    with open(template_file, 'r') as f:
+                        template_data = json.load(f)
+                except Exception as e:
+                    print(f"Failed to load template {template_file}: {e}")
+                    return
+            
+            templates = dict(self.templates)
+            previous_id = self._template_files.pop(template_file, None)
+            if previous_id is not None:
+                templates.pop(previous_id, None)
+            if template_data is not None:
+                template_id = template_data.get('id', template_file.stem)
+                templates[template_id] = template_data
+                self._template_files[template_file] = template_id
+            self.templates = templates
+    
+    def watch(self, interval: float = 2.0):
+        """Pick up added, edited and deleted template files without restarting the server"""
+        if self._watcher is None:
+            from file_watcher import FileWatcher
+            self._watcher = FileWatcher(
+                str(self.templates_dir), self._on_files_changed, ('*.json',), interval
+            )
+            self._watcher.start()
+    
+    def _on_files_changed(self, changed, removed):
+        for template_file in changed | removed:
+            if template_file.parent == self.templates_dir:
+                self._reload_template_file(template_file)
     
     def list_templates(self) -> List[Dict[str, Any]]:
         """List all available templates"""
@@ -121,8 +159,8 @@ class GraphTemplates:
         with open(template_file, 'w') as f:
             json.dump(template_data, f, indent=2)
         
-        # Reload templates
-        self._load_templates()
+        # Reload the saved template
+        self._reload_template_file(template_file)
         
         return {
             'template_id': template_id,
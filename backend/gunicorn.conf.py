@@ -0,0 +1,20 @@
+"""
+Gunicorn configuration - production serving mode for WolfTrace
+
+Run from the backend directory:
+    gunicorn -c gunicorn.conf.py app:app
+
+Workers share one graph through a SharedGraphStore on local disk: one
+worker writes at a time and the others replay its logged changes before
+their next read, so read throughput scales with the number of workers.
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault('GRAPH_STORE_DIR', os.path.join('data', 'graph_store'))
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 300))
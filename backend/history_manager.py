@@ -3,6 +3,7 @@ History Manager - Undo/Redo functionality for graph operations
 """
 from typing import List, Dict, Any, Optional
 from collections import deque
+import threading
 
 class HistoryManager:
     def __init__(self, max_history: int = 50):
@@ -16,6 +17,7 @@ class HistoryManager:
         self.undo_stack: deque = deque(maxlen=max_history)
         self.redo_stack: deque = deque(maxlen=max_history)
         self.current_state: Optional[Dict] = None
+        self._lock = threading.RLock()
     
     def save_state(self, graph_data: Dict[str, Any], operation: str = 'unknown'):
         """
@@ -25,23 +27,24 @@ class HistoryManager:
             graph_data: Current graph data (nodes and edges)
             operation: Description of the operation that led to this state
         """
-        # Serialize graph data
-        state = {
-            'graph': {
-                'nodes': graph_data.get('nodes', []),
-                'edges': graph_data.get('edges', [])
-            },
-            'operation': operation,
-            'timestamp': None  # Can add timestamp if needed
-        }
+        with self._lock:
+            # Serialize graph data
+            state = {
+                'graph': {
+                    'nodes': graph_data.get('nodes', []),
+                    'edges': graph_data.get('edges', [])
+                },
+                'operation': operation,
+                'timestamp': None  # Can add timestamp if needed
+            }
         
-        # If we have a current state, add it to undo stack
-        if self.current_state is not None:
-            self.undo_stack.append(self.current_state)
-            # Clear redo stack when new action is performed
-            self.redo_stack.clear()
+            # If we have a current state, add it to undo stack
+            if self.current_state is not None:
+                self.undo_stack.append(self.current_state)
+                # Clear redo stack when new action is performed
+                self.redo_stack.clear()
         
-        self.current_state = state
+            self.current_state = state
     
     def undo(self) -> Optional[Dict[str, Any]]:
         """
@@ -50,16 +53,17 @@ class HistoryManager:
         Returns:
             Previous graph state or None if nothing to undo
         """
-        if not self.undo_stack:
-            return None
+        with self._lock:
+            if not self.undo_stack:
+                return None
         
-        # Move current state to redo stack
-        if self.current_state:
-            self.redo_stack.append(self.current_state)
+            # Move current state to redo stack
+            if self.current_state:
+                self.redo_stack.append(self.current_state)
         
-        # Get previous state
-        self.current_state = self.undo_stack.pop()
-        return self.current_state.get('graph')
+            # Get previous state
+            self.current_state = self.undo_stack.pop()
+            return self.current_state.get('graph')
     
     def redo(self) -> Optional[Dict[str, Any]]:
         """
@@ -68,16 +72,17 @@ class HistoryManager:
         Returns:
             Next graph state or None if nothing to redo
         """
-        if not self.redo_stack:
-            return None
+        with self._lock:
+            if not self.redo_stack:
+                return None
         
-        # Move current state to undo stack
-        if self.current_state:
-            self.undo_stack.append(self.current_state)
+            # Move current state to undo stack
+            if self.current_state:
+                self.undo_stack.append(self.current_state)
         
-        # Get next state
-        self.current_state = self.redo_stack.pop()
-        return self.current_state.get('graph')
+            # Get next state
+            self.current_state = self.redo_stack.pop()
+            return self.current_state.get('graph')
     
     def can_undo(self) -> bool:
         """Check if undo is possible"""
@@ -89,17 +94,19 @@ class HistoryManager:
     
     def get_history_info(self) -> Dict[str, Any]:
         """Get information about history state"""
-        return {
-            'undo_count': len(self.undo_stack),
-            'redo_count': len(self.redo_stack),
-            'can_undo': self.can_undo(),
-            'can_redo': self.can_redo(),
-            'current_operation': self.current_state.get('operation') if self.current_state else None
-        }
+        with self._lock:
+            return {
+                'undo_count': len(self.undo_stack),
+                'redo_count': len(self.redo_stack),
+                'can_undo': self.can_undo(),
+                'can_redo': self.can_redo(),
+                'current_operation': self.current_state.get('operation') if self.current_state else None
+            }
     
     def clear(self):
         """Clear all history"""
-        self.undo_stack.clear()
-        self.redo_stack.clear()
-        self.current_state = None
+        with self._lock:
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+            self.current_state = None
 
@@ -0,0 +1,116 @@
+"""
+Startup Time - Measures how long a fresh backend process takes to import the
+app, to answer /api/health and to become ready, and prints the results as JSON
+
+Run from the backend directory (e.g. in CI, to track startup over time):
+    python measure_startup.py --runs 5 --max-import-seconds 1.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Runs in a fresh interpreter per measurement. Warm-up is off so the import is
+# measured alone and the readiness probe starts loading the graph.
+CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+heavy = [name for name in %(heavy)r if name in sys.modules]
+client = app.app.test_client()
+live = client.get('/api/health').status_code == 200
+live_at = time.perf_counter()
+deadline = live_at + %(timeout)r
+status = client.get('/api/ready')
+while status.status_code != 200 and time.perf_counter() < deadline:
+    time.sleep(0.005)
+    status = client.get('/api/ready')
+ready_at = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - started,
+    'live_seconds': live_at - started if live else None,
+    'ready_seconds': ready_at - started if status.status_code == 200 else None,
+    'heavy_modules_after_import': heavy,
+    'services': status.get_json()['services']
+}))
+'''
+
+# Modules that should only be loaded once the app is warming up or in use
+HEAVY_MODULES = ('networkx', 'numpy', 'neo4j', 'graph_engine', 'graph_analytics', 'graph_layout')
+
+
+def measure_once(timeout: float) -> dict:
+    """Start one backend process and return its timings"""
+    env = dict(os.environ, WARM_UP='false', HOT_RELOAD='false')
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD % {'heavy': HEAVY_MODULES, 'timeout': timeout}],
+        cwd=Path(__file__).resolve().parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout + 60
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Backend failed to start:\n{result.stderr}")
+    # The app prints while loading; the measurement is the last line
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    run['process_seconds'] = wall
+    return run
+
+
+def summarize(runs: list, key: str) -> dict:
+    values = [run[key] for run in runs if run[key] is not None]
+    if not values:
+        return {'median': None, 'min': None, 'max': None}
+    return {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure backend startup time')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh processes to time')
+    parser.add_argument('--timeout', type=float, default=120, help='Seconds to wait for readiness')
+    parser.add_argument('--max-import-seconds', type=float, default=None,
+                        help='Fail if the median import time exceeds this')
+    parser.add_argument('--max-ready-seconds', type=float, default=None,
+                        help='Fail if the median time to readiness exceeds this')
+    parser.add_argument('--output', help='Also write the results to this file')
+    args = parser.parse_args()
+    
+    runs = [measure_once(args.timeout) for _ in range(args.runs)]
+    results = {
+        'python': sys.version.split()[0],
+        'runs': len(runs),
+        'import_seconds': summarize(runs, 'import_seconds'),
+        'live_seconds': summarize(runs, 'live_seconds'),
+        'ready_seconds': summarize(runs, 'ready_seconds'),
+        'process_seconds': summarize(runs, 'process_seconds'),
+        'heavy_modules_after_import': sorted({name for run in runs for name in run['heavy_modules_after_import']}),
+        'per_run': runs
+    }
+    
+    failures = []
+    if any(run['ready_seconds'] is None for run in runs):
+        failures.append(f"not ready within {args.timeout}s")
+    if args.max_import_seconds is not None and results['import_seconds']['median'] > args.max_import_seconds:
+        failures.append(f"median import {results['import_seconds']['median']:.3f}s > {args.max_import_seconds}s")
+    if (args.max_ready_seconds is not None and results['ready_seconds']['median'] is not None
+            and results['ready_seconds']['median'] > args.max_ready_seconds):
+        failures.append(f"median readiness {results['ready_seconds']['median']:.3f}s > {args.max_ready_seconds}s")
+    results['failures'] = failures
+    
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
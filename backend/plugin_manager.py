@@ -5,23 +5,36 @@ import os
 import importlib
 import importlib.util
 import json
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
 class PluginManager:
-    def __init__(self, plugins_dir: str = 'plugins'):
+    def __init__(self, plugins_dir: str = 'plugins', isolate: bool = False,
+                 timeout: Optional[float] = None, memory_limit_mb: Optional[int] = None):
         """
         Initialize plugin manager
         
+        Only plugin metadata is read here; plugin code is imported on first use.
+        
         Args:
             plugins_dir: Directory containing plugin modules
+            isolate: Run plugins in a separate worker process by default
+            timeout: Default time limit (seconds) for isolated plugins
+            memory_limit_mb: Default memory limit for isolated plugins
         """
         self.plugins_dir = plugins_dir
+        self.isolate = isolate
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
         self.plugins = {}
+        self._import_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
         self._load_plugins()
     
     def _load_plugins(self):
-        """Load all plugins from the plugins directory"""
+        """Discover all plugins in the plugins directory (metadata only)"""
         plugins_path = Path(self.plugins_dir)
         if not plugins_path.exists():
             print(f"Plugins directory {plugins_path} does not exist")
@@ -33,12 +46,12 @@ class PluginManager:
                     plugin = self._load_plugin(plugin_dir)
                     if plugin:
                         self.plugins[plugin['name']] = plugin
-                        print(f"Loaded plugin: {plugin['name']}")
+                        print(f"Found plugin: {plugin['name']}")
                 except Exception as e:
                     print(f"Failed to load plugin {plugin_dir.name}: {e}")
     
     def _load_plugin(self, plugin_dir: Path) -> Dict[str, Any]:
-        """Load a single plugin"""
+        """Read a single plugin's metadata without importing its code"""
         plugin_file = plugin_dir / 'plugin.py'
         if not plugin_file.exists():
             return None
@@ -50,24 +63,95 @@ class PluginManager:
             with open(metadata_file, 'r') as f:
                 metadata = json.load(f)
         
-        # Import plugin module
-        spec = importlib.util.spec_from_file_location(
-            plugin_dir.name,
-            plugin_file
-        )
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        
         return {
             'name': metadata.get('name', plugin_dir.name),
             'version': metadata.get('version', '1.0.0'),
             'description': metadata.get('description', ''),
             'supported_formats': metadata.get('supported_formats', []),
-            'module': module,
+            'isolated': metadata.get('isolated'),
+            'timeout': metadata.get('timeout'),
+            'memory_limit_mb': metadata.get('memory_limit_mb'),
+            'module': None,
+            'file': plugin_file,
             'directory': plugin_dir
         }
     
-    def process_data(self, collector_name: str, data: Any, graph_engine) -> Dict[str, Any]:
+    def _get_module(self, plugin: Dict[str, Any]):
+        """Import a plugin's module on first use"""
+        if plugin['module'] is not None:
+            return plugin['module']
+        
+        with self._import_lock:
+            if plugin['module'] is None:
+                plugin['module'] = self._import_module(plugin)
+                print(f"Loaded plugin: {plugin['name']}")
+        return plugin['module']
+    
+    def _import_module(self, plugin: Dict[str, Any]):
+        """Execute a plugin's code into a fresh module object"""
+        spec = importlib.util.spec_from_file_location(
+            plugin['directory'].name,
+            plugin['file']
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    
+    def watch(self, interval: float = 2.0):
+        """Reload plugins whose files change on disk, without restarting the server"""
+        if self._watcher is None:
+            from file_watcher import FileWatcher
+            self._watcher = FileWatcher(
+                self.plugins_dir, self._on_files_changed, ('*.py', '*.json'), interval
+            )
+            self._watcher.start()
+    
+    def _on_files_changed(self, changed, removed):
+        plugins_path = Path(self.plugins_dir)
+        plugin_dirs = set()
+        for path in changed | removed:
+            parts = path.relative_to(plugins_path).parts
+            if len(parts) > 1 and not parts[0].startswith('_'):
+                plugin_dirs.add(plugins_path / parts[0])
+        
+        for plugin_dir in plugin_dirs:
+            self.reload_plugin(plugin_dir)
+    
+    def reload_plugin(self, plugin_dir: Path):
+        """
+        Reload a single plugin directory
+        
+        The plugin table is swapped in one assignment, so in-flight imports
+        keep running against the module they already hold. If the new code
+        fails to import, the previous version stays active.
+        """
+        plugin_dir = Path(plugin_dir)
+        with self._reload_lock:
+            previous = [p for p in self.plugins.values() if p['directory'] == plugin_dir]
+            try:
+                plugin = self._load_plugin(plugin_dir) if plugin_dir.is_dir() else None
+                if plugin and any(p['module'] is not None for p in previous):
+                    # Plugin was in use - import now so a broken edit is caught here
+                    plugin['module'] = self._import_module(plugin)
+                    if not hasattr(plugin['module'], 'process'):
+                        raise ValueError("missing 'process' function")
+            except Exception as e:
+                print(f"Failed to reload plugin {plugin_dir.name}, keeping previous version: {e}")
+                return
+            
+            plugins = {
+                name: p for name, p in self.plugins.items()
+                if p['directory'] != plugin_dir
+            }
+            if plugin:
+                plugins[plugin['name']] = plugin
+                print(f"Reloaded plugin: {plugin['name']}")
+            else:
+                print(f"Removed plugin: {plugin_dir.name}")
+            self.plugins = plugins
+    
+    def process_data(self, collector_name: str, data: Any, graph_engine,
+                     isolated: Optional[bool] = None) -> Dict[str, Any]:
         """
         Process data using a specific collector plugin
         
@@ -75,21 +159,36 @@ class PluginManager:
             collector_name: Name of the collector plugin
             data: Data to process (can be dict, list, string, etc.)
             graph_engine: GraphEngine instance to add nodes/edges to
+            isolated: Run in a worker process (None uses plugin metadata, then the manager default)
         
         Returns:
             Processing result with stats
         """
-        if collector_name not in self.plugins:
+        plugin = self.plugins.get(collector_name)
+        if plugin is None:
             raise ValueError(f"Plugin '{collector_name}' not found")
         
-        plugin = self.plugins[collector_name]
-        module = plugin['module']
-        
-        if not hasattr(module, 'process'):
-            raise ValueError(f"Plugin '{collector_name}' missing 'process' function")
+        if isolated is None:
+            isolated = plugin['isolated'] if plugin['isolated'] is not None else self.isolate
         
-        # Call plugin's process function
-        result = module.process(data, graph_engine)
+        if isolated:
+            from plugin_worker import run_isolated
+            result = run_isolated(
+                collector_name,
+                str(plugin['file']),
+                data,
+                graph_engine,
+                timeout=plugin['timeout'] or self.timeout,
+                memory_limit_mb=plugin['memory_limit_mb'] or self.memory_limit_mb
+            )
+        else:
+            module = self._get_module(plugin)
+            
+            if not hasattr(module, 'process'):
+                raise ValueError(f"Plugin '{collector_name}' missing 'process' function")
+            
+            # Call plugin's process function
+            result = module.process(data, graph_engine)
         
         return {
             'plugin': collector_name,
@@ -0,0 +1,189 @@
+"""
+Plugin Worker - Records a plugin's graph changes for later application, and
+runs a plugin's process() in a separate, resource-limited process
+"""
+import importlib.util
+import multiprocessing
+import queue
+import time
+import traceback
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class StagedGraph:
+    """
+    Stand-in for GraphEngine that records add_node/add_edge calls without
+    touching the graph, so a plugin or template can build its changes while
+    readers and writers carry on. apply() replays them, in order, onto the
+    real graph (under its write lock).
+    
+    Change listeners are notified as calls are recorded, like GraphEngine's.
+    """
+    def __init__(self):
+        self.operations: List[Tuple] = []
+        self._listeners: List[Callable] = []
+    
+    def add_listener(self, listener: Callable):
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, kind: str, item: Dict[str, Any]):
+        for listener in self._listeners:
+            listener(kind, 'added', item)
+    
+    def add_node(self, node_id: str, node_type: str, properties: Dict[str, Any] = None):
+        self.operations.append(('node', node_id, node_type, properties))
+        self._notify('node', {'id': node_id, 'type': node_type})
+    
+    def add_edge(self, source: str, target: str, edge_type: str, properties: Dict[str, Any] = None):
+        self.operations.append(('edge', source, target, edge_type, properties))
+        self._notify('edge', {'source': source, 'target': target, 'type': edge_type})
+    
+    def apply(self, graph_engine):
+        """Replay the recorded calls onto graph_engine (call while holding its write lock)"""
+        _apply_batch(self.operations, graph_engine)
+
+
+class BatchingGraphRecorder:
+    """
+    Stand-in for GraphEngine inside the worker. Records add_node/add_edge
+    calls and ships them to the parent process in batches.
+    """
+    def __init__(self, out_queue, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.out_queue = out_queue
+        self.batch_size = batch_size
+        self.batch: List[Tuple] = []
+    
+    def add_node(self, node_id: str, node_type: str, properties: Dict[str, Any] = None):
+        self.batch.append(('node', node_id, node_type, properties))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+    
+    def add_edge(self, source: str, target: str, edge_type: str, properties: Dict[str, Any] = None):
+        self.batch.append(('edge', source, target, edge_type, properties))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if self.batch:
+            self.out_queue.put(('batch', self.batch))
+            self.batch = []
+
+
+def _apply_memory_limit(memory_limit_mb: Optional[int]):
+    if not memory_limit_mb:
+        return
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        # Not supported on this platform (e.g. Windows); run unlimited
+        print(f"Plugin worker memory limit not applied: {e}")
+
+
+def _worker_main(plugin_name: str, plugin_file: str, data: Any, out_queue,
+                 memory_limit_mb: Optional[int], batch_size: int):
+    """Entry point of the worker process"""
+    try:
+        _apply_memory_limit(memory_limit_mb)
+        spec = importlib.util.spec_from_file_location(plugin_name, plugin_file)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if not hasattr(module, 'process'):
+            raise ValueError(f"Plugin '{plugin_name}' missing 'process' function")
+        
+        recorder = BatchingGraphRecorder(out_queue, batch_size)
+        result = module.process(data, recorder)
+        recorder.flush()
+        out_queue.put(('result', result))
+    except MemoryError:
+        out_queue.put(('error', f"Plugin '{plugin_name}' exceeded its memory limit of {memory_limit_mb} MB"))
+    except Exception as e:
+        out_queue.put(('error', f"{e}\n{traceback.format_exc()}"))
+
+
+def _apply_batch(batch: List[Tuple], graph_engine):
+    for op in batch:
+        if op[0] == 'node':
+            _, node_id, node_type, properties = op
+            graph_engine.add_node(node_id, node_type, properties)
+        else:
+            _, source, target, edge_type, properties = op
+            graph_engine.add_edge(source, target, edge_type, properties)
+
+
+def run_isolated(plugin_name: str, plugin_file: str, data: Any, graph_engine,
+                 timeout: Optional[float] = None, memory_limit_mb: Optional[int] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> Any:
+    """
+    Run a plugin's process() in a child process and apply its node/edge batches
+    
+    Batches are buffered as they arrive and only applied once the worker
+    reports its result, so a timeout, memory limit or crash leaves the graph
+    (and the undo history) untouched.
+    
+    Args:
+        plugin_name: Plugin name (used as module name in the worker)
+        plugin_file: Path to the plugin's plugin.py
+        data: Data to process (must be picklable)
+        graph_engine: GraphEngine the batches are applied to
+        timeout: Wall-clock limit in seconds (None for no limit)
+        memory_limit_mb: Address-space limit for the worker (None for no limit)
+        batch_size: Number of add_node/add_edge calls per batch
+    
+    Returns:
+        The plugin's process() return value
+    
+    Raises:
+        TimeoutError: If the worker exceeds its time limit
+        RuntimeError: If the plugin fails or the worker dies
+    """
+    ctx = multiprocessing.get_context('spawn')
+    out_queue = ctx.Queue()
+    worker = ctx.Process(
+        target=_worker_main,
+        args=(plugin_name, plugin_file, data, out_queue, memory_limit_mb, batch_size),
+        daemon=True
+    )
+    worker.start()
+    deadline = time.monotonic() + timeout if timeout else None
+    batches: List[List[Tuple]] = []
+    
+    try:
+        while True:
+            wait = 0.5
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Plugin '{plugin_name}' exceeded its time limit of {timeout}s")
+                wait = min(wait, remaining)
+            try:
+                kind, payload = out_queue.get(timeout=wait)
+            except queue.Empty:
+                if not worker.is_alive() and out_queue.empty():
+                    raise RuntimeError(
+                        f"Plugin '{plugin_name}' worker exited unexpectedly (code {worker.exitcode})"
+                    )
+                continue
+            
+            if kind == 'batch':
+                batches.append(payload)
+            elif kind == 'result':
+                break
+            else:
+                raise RuntimeError(payload)
+    finally:
+        if worker.is_alive():
+            worker.terminate()
+        worker.join(timeout=5)
+        out_queue.close()
+
+    for batch in batches:
+        _apply_batch(batch, graph_engine)
+    return payload
@@ -1,9 +1,90 @@
 """
 Query Builder - Advanced filtering and querying for graph data
 """
-from typing import Dict, List, Any, Callable, Optional
+from typing import Dict, List, Any, Callable, Optional, Tuple
 from datetime import datetime
 
+def _as_list(value) -> List:
+    return [value] if isinstance(value, str) else list(value)
+
+
+def compile_cypher_filters(filters: Dict[str, Any]) -> Tuple[Callable[[str], str], Callable[[str], str], Dict]:
+    """
+    Compile QueryBuilder filters into parameterized Cypher predicates
+    
+    Type checks avoid valueType() (Neo4j 5.13+): `x STARTS WITH ''` is only
+    true for strings, so the predicates run on any server from Neo4j 4.4.
+    
+    Args:
+        filters: Filters in the build_query format
+    
+    Returns:
+        (node_where(alias), edge_where(alias), params); the functions return a
+        WHERE body ('true' when nothing filters) for the given variable name,
+        ready for the {*_where} parts of the graph_engine Cypher templates
+    """
+    from graph_engine import CypherPredicate, cypher_label
+    
+    params: Dict[str, Any] = {}
+    node_terms: List[str] = []
+    edge_terms: List[str] = []
+    
+    if 'node_type' in filters:
+        # Types are labels, so the planner can start from their label scans
+        labels = [
+            cypher_label(node_type).replace('{', '{{').replace('}', '}}')
+            for node_type in _as_list(filters['node_type'])
+        ]
+        node_terms.append('(' + ' OR '.join(f"{{a}}:{label}" for label in labels) + ')' if labels else 'false')
+    
+    for i, (key, value) in enumerate(filters.get('properties', {}).items()):
+        params[f'pk{i}'], params[f'pv{i}'] = key, value
+        # Equal, or contained in a list property (as in the in-memory filter);
+        # `[] + x` is x itself for a list and [x] for a single value
+        node_terms.append(f"({{a}}[$pk{i}] = $pv{i} OR $pv{i} IN ([] + {{a}}[$pk{i}]))")
+    
+    if 'text_search' in filters:
+        params['text'] = str(filters['text_search']).lower()
+        node_terms.append(
+            "(toLower(toString({a}.id)) CONTAINS $text OR any(k IN keys({a}) WHERE "
+            "CASE WHEN {a}[k] STARTS WITH '' THEN toLower({a}[k]) CONTAINS $text ELSE false END))"
+        )
+    
+    date_filter = filters.get('date_range') or {}
+    if date_filter.get('start') or date_filter.get('end'):
+        # ISO-8601 strings order chronologically, so compare them as strings
+        params['date_field'] = date_filter.get('field', 'created_at')
+        node_terms.append("{a}[$date_field] STARTS WITH ''")
+        if date_filter.get('start'):
+            params['date_start'] = date_filter['start']
+            node_terms.append("{a}[$date_field] >= $date_start")
+        if date_filter.get('end'):
+            params['date_end'] = date_filter['end']
+            node_terms.append("{a}[$date_field] <= $date_end")
+    
+    if 'min_degree' in filters:
+        params['min_degree'] = filters['min_degree']
+        node_terms.append("size([({a})--() | 1]) >= $min_degree")
+    if 'max_degree' in filters:
+        params['max_degree'] = filters['max_degree']
+        node_terms.append("size([({a})--() | 1]) <= $max_degree")
+    
+    if 'edge_type' in filters:
+        params['edge_types'] = _as_list(filters['edge_type'])
+        edge_terms.append("type({a}) IN $edge_types")
+    
+    for i, (key, value) in enumerate(filters.get('edge_properties', {}).items()):
+        params[f'ek{i}'], params[f'ev{i}'] = key, value
+        edge_terms.append(f"{{a}}[$ek{i}] = $ev{i}")
+    
+    def node_where(alias: str) -> str:
+        return CypherPredicate(' AND '.join(term.format(a=alias) for term in node_terms) or 'true')
+    
+    def edge_where(alias: str) -> str:
+        return CypherPredicate(' AND '.join(term.format(a=alias) for term in edge_terms) or 'true')
+    
+    return node_where, edge_where, params
+
 class QueryBuilder:
     def __init__(self, graph_engine):
         self.graph_engine = graph_engine
@@ -30,14 +111,19 @@ class QueryBuilder:
             "max_degree": 10
         }
         """
-        nodes = self.graph_engine.get_nodes()
-        edges = self.graph_engine.get_edges()
+        if self.graph_engine.use_neo4j:
+            return self._build_query_neo4j(filters)
+        
+        # Hold the read lock so nodes, edges and degrees all come from one state
+        with self.graph_engine.read_locked():
+            nodes = self.graph_engine.get_nodes()
+            edges = self.graph_engine.get_edges()
         
-        # Filter nodes
-        filtered_nodes = self._filter_nodes(nodes, filters)
+            # Filter nodes
+            filtered_nodes = self._filter_nodes(nodes, filters)
         
-        # Filter edges
-        filtered_edges = self._filter_edges(edges, filters, filtered_nodes)
+            # Filter edges
+            filtered_edges = self._filter_edges(edges, filters, filtered_nodes)
         
         # Get node IDs from filtered nodes
         node_ids = {node['id'] for node in filtered_nodes}
@@ -54,6 +140,31 @@ class QueryBuilder:
             'count': len(filtered_nodes)
         }
     
+    def _build_query_neo4j(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the filters as Cypher, so only matching rows cross the wire"""
+        from graph_engine import cypher
+        
+        node_where, edge_where, params = compile_cypher_filters(filters)
+        nodes = [
+            record['n'] for record in self.graph_engine.run_read(
+                cypher('query_nodes', node_where=node_where('n')), **params
+            )
+        ]
+        # Both endpoints must pass the node filters, as in the in-memory query
+        edges = [
+            {'source': record['source'], 'target': record['target'], **record['props']}
+            for record in self.graph_engine.run_read(
+                cypher('query_edges', source_where=node_where('a'), target_where=node_where('b'),
+                       edge_where=edge_where('r')),
+                **params
+            )
+        ]
+        return {
+            'nodes': nodes,
+            'edges': edges,
+            'count': len(nodes)
+        }
+    
     def _filter_nodes(self, nodes: List[Dict], filters: Dict) -> List[Dict]:
         """Apply filters to nodes"""
         result = nodes
@@ -154,6 +265,9 @@ class QueryBuilder:
     
     def get_statistics_for_query(self, filters: Dict) -> Dict:
         """Get statistics for a filtered query"""
+        if self.graph_engine.use_neo4j:
+            return self._get_statistics_neo4j(filters)
+        
         query_result = self.build_query(filters)
         
         nodes = query_result['nodes']
@@ -178,3 +292,26 @@ class QueryBuilder:
             'edge_types': edge_types
         }
 
+    def _get_statistics_neo4j(self, filters: Dict) -> Dict:
+        """Aggregate the filtered query in Cypher"""
+        from graph_engine import cypher
+        
+        node_where, edge_where, params = compile_cypher_filters(filters)
+        node_types = {
+            record['type'] or 'Unknown': record['count'] for record in self.graph_engine.run_read(
+                cypher('query_node_types', node_where=node_where('n')), **params
+            )
+        }
+        edge_types = {
+            record['type']: record['count'] for record in self.graph_engine.run_read(
+                cypher('query_edge_types', source_where=node_where('a'), target_where=node_where('b'),
+                       edge_where=edge_where('r')),
+                **params
+            )
+        }
+        return {
+            'node_count': sum(node_types.values()),
+            'edge_count': sum(edge_types.values()),
+            'node_types': node_types,
+            'edge_types': edge_types
+        }
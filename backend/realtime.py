@@ -0,0 +1,223 @@
+"""
+Realtime Updates - Pushes graph deltas and job progress to WebSocket clients
+"""
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from graph_hashing import edge_key
+
+DEFAULT_INTERVAL = 0.2
+DEFAULT_MAX_BATCH = 5000
+
+
+class DeltaBroadcaster:
+    """
+    Collects graph changes and emits them as coalesced 'graph_delta' events.
+    
+    Changes are buffered per node id / edge key and flushed every `interval`
+    seconds, so an import of thousands of items becomes a handful of messages
+    instead of one per add_node call. Clients merge each delta into their
+    current view; 'updated' items carry the properties to merge. If a burst
+    grows beyond `max_batch` items, clients are told to resync (re-fetch
+    /api/graph) instead of receiving a huge delta.
+    """
+    def __init__(self, graph_engine, socketio, interval: float = DEFAULT_INTERVAL,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        """
+        Initialize delta broadcaster
+        
+        Args:
+            graph_engine: GraphEngine instance to listen to
+            socketio: Flask-SocketIO instance used to emit events
+            interval: Seconds between flushes
+            max_batch: Pending items above which a resync is sent instead
+        """
+        self.graph_engine = graph_engine
+        self.socketio = socketio
+        self.interval = interval
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._reset()
+        self._task = None
+        graph_engine.add_listener(self._on_change)
+    
+    def _reset(self):
+        self._nodes: Dict[str, tuple] = {}
+        self._edges: Dict[str, tuple] = {}
+        self._cleared = False
+        self._resync = False
+    
+    def _on_change(self, kind: str, change: str, item: Dict):
+        """Graph listener: buffer the change (runs under the graph write lock)"""
+        with self._lock:
+            if kind == 'graph':
+                # Everything buffered so far is superseded
+                self._reset()
+                if change == 'cleared':
+                    self._cleared = True
+                else:
+                    self._resync = True
+                return
+            if self._resync:
+                return
+            
+            pending = self._nodes if kind == 'node' else self._edges
+            key = item['id'] if kind == 'node' else edge_key(item)
+            previous = pending.get(key)
+            if previous is not None:
+                change = self._coalesce(previous, change, item)
+                if change is None:
+                    del pending[key]
+                    return
+                if change == previous[0] and change != 'removed':
+                    item = {**previous[1], **item}
+            pending[key] = (change, item)
+            
+            if len(self._nodes) + len(self._edges) > self.max_batch:
+                self._nodes = {}
+                self._edges = {}
+                self._resync = True
+    
+    @staticmethod
+    def _coalesce(previous: tuple, change: str, item: Dict) -> Optional[str]:
+        """Combine two changes to the same item (None drops it entirely)"""
+        before = previous[0]
+        if before == 'added':
+            if change == 'removed':
+                return None
+            return 'added'
+        if before == 'removed' and change == 'added':
+            # Re-created within one interval: clients must replace it
+            return 'updated'
+        return change
+    
+    def _take_delta(self) -> Optional[Dict[str, Any]]:
+        """Swap out the buffered changes and build the message to emit"""
+        with self._lock:
+            if not (self._nodes or self._edges or self._cleared or self._resync):
+                return None
+            nodes, edges = self._nodes, self._edges
+            cleared, resync = self._cleared, self._resync
+            self._reset()
+        
+        delta = {'version': self.graph_engine.version}
+        if resync:
+            delta['resync'] = True
+            return delta
+        if cleared:
+            delta['cleared'] = True
+        for name, pending in (('nodes', nodes), ('edges', edges)):
+            section = {'added': [], 'updated': [], 'removed': []}
+            for change, item in pending.values():
+                section[change].append(item)
+            delta[name] = section
+        return delta
+    
+    def flush(self):
+        """Emit buffered changes now (if any)"""
+        delta = self._take_delta()
+        if delta is not None:
+            self.socketio.emit('graph_delta', delta)
+    
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error broadcasting graph delta: {e}")
+    
+    def start(self):
+        """Start the background flush task"""
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
+
+
+class JobProgress:
+    """
+    Reports the progress of a long-running job (e.g. an import) to clients.
+    
+    Emits 'job_started', throttled 'import_progress' events with running
+    node/edge counts, and finally 'job_complete' or 'job_failed'. The change
+    listener only counts (it may run under the graph write lock); progress
+    events are emitted by a background task.
+    """
+    def __init__(self, socketio, graph_engine, job_type: str, broadcaster: DeltaBroadcaster = None,
+                 min_interval: float = 0.5, source=None):
+        """
+        Initialize job progress reporter
+        
+        Args:
+            socketio: Flask-SocketIO instance used to emit events
+            graph_engine: GraphEngine the job writes to
+            job_type: Short job description (e.g. plugin name)
+            broadcaster: DeltaBroadcaster to flush before completion events
+            min_interval: Minimum seconds between progress events
+            source: Object whose change listeners count progress, e.g. the
+                StagedGraph the job builds (defaults to graph_engine)
+        """
+        self.socketio = socketio
+        self.graph_engine = graph_engine
+        self.job_type = job_type
+        self.broadcaster = broadcaster
+        self.min_interval = min_interval
+        self.source = source if source is not None else graph_engine
+        self.job_id = f"{job_type}-{time.time_ns()}"
+        self.nodes = 0
+        self.edges = 0
+        self._started = 0.0
+        self._done = threading.Event()
+    
+    def _on_change(self, kind: str, change: str, item: Dict):
+        if change not in ('added', 'updated'):
+            return
+        if kind == 'node':
+            self.nodes += 1
+        elif kind == 'edge':
+            self.edges += 1
+    
+    def _report(self):
+        """Background task: emit the counts every min_interval while they change"""
+        reported = (0, 0)
+        while True:
+            self.socketio.sleep(self.min_interval)
+            if self._done.is_set():
+                return
+            counts = (self.nodes, self.edges)
+            if counts != reported:
+                reported = counts
+                self.socketio.emit('import_progress', {
+                    'job_id': self.job_id,
+                    'type': self.job_type,
+                    'nodes': counts[0],
+                    'edges': counts[1],
+                    'elapsed': round(time.monotonic() - self._started, 3)
+                })
+    
+    def __enter__(self):
+        self._started = time.monotonic()
+        self.socketio.emit('job_started', {'job_id': self.job_id, 'type': self.job_type})
+        self.source.add_listener(self._on_change)
+        self.socketio.start_background_task(self._report)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._done.set()
+        self.source.remove_listener(self._on_change)
+        if self.broadcaster is not None:
+            self.broadcaster.flush()
+        payload = {
+            'job_id': self.job_id,
+            'type': self.job_type,
+            'nodes': self.nodes,
+            'edges': self.edges,
+            'elapsed': round(time.monotonic() - self._started, 3),
+            'version': self.graph_engine.version
+        }
+        if exc is None:
+            self.socketio.emit('job_complete', payload)
+        else:
+            payload['error'] = str(exc)
+            self.socketio.emit('job_failed', payload)
+        return False
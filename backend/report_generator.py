@@ -20,13 +20,16 @@ class ReportGenerator:
         Returns:
             Report data dictionary
         """
-        stats = self.analytics.get_statistics()
-        graph_data = self.graph_engine.get_full_graph() if include_graph else None
+        # Stats and graph come from the same snapshot, even if imports run meanwhile
+        snapshot = self.graph_engine.snapshot()
+        stats = self.analytics.get_statistics(snapshot)
+        graph_data = snapshot.get_full_graph() if include_graph else None
         
         report = {
             'metadata': {
                 'generated_at': datetime.now().isoformat(),
-                'version': '1.0'
+                'version': '1.0',
+                'graph_version': snapshot.version
             },
             'summary': {
                 'total_nodes': stats.get('basic', {}).get('nodes', 0),
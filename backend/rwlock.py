@@ -0,0 +1,97 @@
+"""
+Read/Write Lock - Many concurrent readers or one writer
+"""
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    Writer-preferring reader/writer lock.
+    
+    Reentrant per thread: a thread holding the write lock may take the read
+    or write lock again, and nested read acquisitions never block. Upgrading
+    a read lock to a write lock is not supported and raises RuntimeError.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+    
+    def _read_stack(self) -> list:
+        stack = getattr(self._local, 'reads', None)
+        if stack is None:
+            stack = self._local.reads = []
+        return stack
+    
+    def acquire_read(self):
+        stack = self._read_stack()
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or stack:
+                # Already inside a read or write section on this thread
+                stack.append(False)
+                return
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+            stack.append(True)
+    
+    def release_read(self):
+        counted = self._read_stack().pop()
+        if counted:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+    
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if self._read_stack():
+                raise RuntimeError("Cannot acquire write lock while holding a read lock")
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+    
+    def release_write(self):
+        with self._cond:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+    
+    def is_held(self) -> bool:
+        """True if the current thread holds the read or the write lock"""
+        return bool(self._read_stack()) or self.is_write_held()
+    
+    def is_write_held(self) -> bool:
+        """True if the current thread holds the write lock"""
+        return self._writer == threading.get_ident()
+    
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+    
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,128 @@
+"""
+Serialization - Fast JSON encoding and MessagePack content negotiation for API responses
+"""
+import json
+from typing import Any
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack responses are optional
+    msgpack = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Encode types JSON/MessagePack do not know (dates, UUIDs, sets, ...)"""
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    try:
+        return DefaultJSONProvider.default(obj)
+    except TypeError:
+        return str(obj)
+
+
+def dumps_bytes(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Encode obj as UTF-8 JSON, using orjson when it is installed
+    
+    Args:
+        obj: Object to encode
+        indent: Pretty-print with two-space indentation
+        sort_keys: Sort object keys
+    
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        option = _ORJSON_OPTIONS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles them
+            pass
+    return json.dumps(
+        obj, default=_default, indent=2 if indent else None, sort_keys=sort_keys,
+        separators=None if indent else (',', ':')
+    ).encode('utf-8')
+
+
+def dumps(obj: Any) -> str:
+    """Encode obj as a compact JSON string"""
+    return dumps_bytes(obj).decode('utf-8')
+
+
+def loads(data: Any) -> Any:
+    """Decode JSON (bytes or str), using orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # e.g. integers beyond 64 bits; the stdlib decoder handles them
+            pass
+    return json.loads(data)
+
+
+def wants_msgpack() -> bool:
+    """True if the current request prefers a MessagePack response over JSON"""
+    if msgpack is None:
+        return False
+    best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson (or the stdlib as fallback).
+    
+    Responses built with jsonify() are sent as MessagePack instead when the
+    client asks for it with `Accept: application/msgpack`.
+    """
+    sort_keys = False
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Caller-specific options (e.g. cls=...) only the stdlib supports
+            kwargs.setdefault('default', _default)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=self.sort_keys).decode('utf-8')
+    
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        
+        if wants_msgpack():
+            body = msgpack.packb(obj, default=_default, use_bin_type=True)
+            response = self._app.response_class(body, mimetype=MSGPACK_MIMETYPES[0])
+        else:
+            indent = (self.compact is None and self._app.debug) or self.compact is False
+            body = dumps_bytes(obj, indent=indent, sort_keys=self.sort_keys) + b'\n'
+            response = self._app.response_class(body, mimetype=self.mimetype)
+        response.vary.add('Accept')
+        return response
+
+
+def init_app(app):
+    """Install the fast JSON provider on a Flask app"""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
@@ -6,6 +6,7 @@ import os
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
+from graph_hashing import compute_graph_hashes
 
 class SessionManager:
     def __init__(self, sessions_dir: str = 'data/sessions'):
@@ -41,7 +42,9 @@ class SessionManager:
             'name': session_name,
             'created_at': datetime.now().isoformat(),
             'metadata': metadata or {},
-            'graph': graph_data
+            'graph': graph_data,
+            # Content hashes let comparisons skip unchanged regions
+            'hashes': compute_graph_hashes(graph_data)
         }
         
         with open(session_file, 'w') as f:
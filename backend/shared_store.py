@@ -0,0 +1,186 @@
+"""
+Shared Graph Store - Local-disk graph store shared by several server processes
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from graph_persistence import decode_records, dump_graph, encode_record, load_graph
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process deployments only
+    fcntl = None
+
+# Head of the store: sequence (odd while being updated), version, log generation, log end
+_HEAD = struct.Struct('<QqQQ')
+
+
+class SharedGraphStore:
+    """
+    Holds the latest published graph on local disk for all workers.
+    
+    One process writes at a time (guarded by an flock on `write.lock`). Each
+    write section appends one record with its changes to the current log
+    (`changes.<generation>.log`); other workers replay the records they have
+    not seen yet, so a write costs the size of its changes rather than of
+    the graph. Once the log grows past `checkpoint_bytes` the whole graph is
+    written to `graph.checkpoint` and a new log generation starts; a worker
+    only loads the checkpoint when it falls behind a generation.
+    
+    The head (version, generation and end of the log) is a small
+    memory-mapped file updated under a sequence counter, so checking for new
+    versions on every read costs a memory read, not a system call.
+    
+    The checkpoint and logs are JSON data (see graph_persistence); the store
+    directory should still only be writable by the server's user.
+    """
+    def __init__(self, store_dir: str, checkpoint_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize shared graph store
+        
+        Args:
+            store_dir: Directory for the checkpoint, change logs, head and lock
+            checkpoint_bytes: Log size after which the next write starts a new
+                checkpoint and log generation
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_file = self.store_dir / 'graph.checkpoint'
+        self.head_file = self.store_dir / 'head'
+        self.lock_file = self.store_dir / 'write.lock'
+        self.checkpoint_bytes = checkpoint_bytes
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_fd = None
+        
+        fd = os.open(self.head_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _HEAD.size:
+                # Zero-filled: version 0, generation 0, empty log
+                os.ftruncate(fd, _HEAD.size)
+            self._head = mmap.mmap(fd, _HEAD.size)
+        finally:
+            os.close(fd)
+        if fcntl is None:
+            print("fcntl not available; shared graph store is limited to one process")
+    
+    def _log_file(self, generation: int) -> Path:
+        return self.store_dir / f"changes.{generation:08d}.log"
+    
+    def head(self) -> Tuple[int, int, int]:
+        """Latest published (version, log generation, log end offset)"""
+        while True:
+            sequence = _HEAD.unpack_from(self._head)[0]
+            if sequence % 2 == 0:
+                _, version, generation, log_end = _HEAD.unpack_from(self._head)
+                if _HEAD.unpack_from(self._head)[0] == sequence:
+                    return version, generation, log_end
+            time.sleep(0)
+    
+    def _set_head(self, version: int, generation: int, log_end: int):
+        """Publish a new head (call while holding write_locked)"""
+        sequence = _HEAD.unpack_from(self._head)[0]
+        struct.pack_into('<Q', self._head, 0, sequence + 1)
+        _HEAD.pack_into(self._head, 0, sequence + 1, version, generation, log_end)
+        struct.pack_into('<Q', self._head, 0, sequence + 2)
+    
+    def current_version(self) -> int:
+        """Version of the latest published graph"""
+        return self.head()[0]
+    
+    def has_checkpoint(self) -> bool:
+        return self.checkpoint_file.exists()
+    
+    def load_checkpoint(self, columnar: bool = False) -> Optional[Tuple[int, int, Any]]:
+        """
+        Load the latest checkpoint
+        
+        Args:
+            columnar: Build a ColumnarGraph instead of a NetworkX graph
+        
+        Returns:
+            (version, generation, graph), or None if there is no checkpoint
+        """
+        try:
+            with open(self.checkpoint_file, 'rb') as f:
+                header, graph = load_graph(f, columnar)
+        except FileNotFoundError:
+            return None
+        return header['version'], header['generation'], graph
+    
+    def read_changes(self, generation: int, start: int, end: int) -> Optional[List[Tuple[int, List]]]:
+        """
+        Read the published change records of a log generation
+        
+        Args:
+            generation: Log generation
+            start: Offset after the last record already applied
+            end: Log end from head()
+        
+        Returns:
+            (version, changes) records, or None if that generation was
+            superseded and removed (load the checkpoint instead)
+        """
+        if end <= start:
+            return []
+        try:
+            with open(self._log_file(generation), 'rb') as f:
+                f.seek(start)
+                data = f.read(end - start)
+        except FileNotFoundError:
+            return None
+        return decode_records(data)
+    
+    def append(self, version: int, changes: List[Tuple[str, str, Any]]):
+        """Publish the changes of one write section (call while holding write_locked)"""
+        _, generation, log_end = self.head()
+        with open(self._log_file(generation), 'ab') as f:
+            f.seek(log_end)
+            f.truncate()  # Drop a record left unpublished by a crashed writer
+            f.write(encode_record((version, changes)))
+            log_end = f.tell()
+        self._set_head(version, generation, log_end)
+    
+    def needs_checkpoint(self) -> bool:
+        return self.head()[2] >= self.checkpoint_bytes
+    
+    def checkpoint(self, version: int, graph: Any):
+        """
+        Write the whole graph and start a new log generation (call while holding write_locked)
+        
+        The previous generation's log is kept until the next checkpoint, so
+        workers replaying it when this one lands can still finish.
+        """
+        _, generation, _ = self.head()
+        new_generation = generation + 1
+        tmp_file = self.checkpoint_file.with_suffix(f'.tmp{os.getpid()}')
+        with open(tmp_file, 'wb') as f:
+            dump_graph(f, {'version': version, 'generation': new_generation}, graph)
+        self._log_file(new_generation).touch()
+        os.replace(tmp_file, self.checkpoint_file)
+        self._set_head(version, new_generation, 0)
+        if generation > 0:
+            self._log_file(generation - 1).unlink(missing_ok=True)
+    
+    @contextmanager
+    def write_locked(self):
+        """Cross-process exclusive lock for a load-modify-publish cycle (reentrant per process)"""
+        with self._thread_lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                self._lock_fd = open(self.lock_file, 'a+')
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_fd is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+                    self._lock_fd.close()
+                    self._lock_fd = None
@@ -0,0 +1,162 @@
+"""
+Startup - Backend components built on first use, background warm-up and
+readiness reporting
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+_UNBUILT = object()
+
+
+class LazyService:
+    """
+    Stand-in for a component that is only built when first used.
+    
+    The first attribute access runs the factory (concurrent callers wait for
+    it); after that every attribute is read from and written to the built
+    component, so the service can be handed to other components in its place.
+    If the factory fails, the caller gets the error and the next access tries
+    again.
+    """
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        # Set through object.__setattr__: our own __setattr__ forwards to the component
+        object.__setattr__(self, '_lazy_name', name)
+        object.__setattr__(self, '_lazy_factory', factory)
+        object.__setattr__(self, '_lazy_instance', _UNBUILT)
+        object.__setattr__(self, '_lazy_lock', threading.Lock())
+        object.__setattr__(self, '_lazy_seconds', None)
+        object.__setattr__(self, '_lazy_built_at', None)
+        object.__setattr__(self, '_lazy_error', None)
+    
+    def _lazy_build(self) -> Any:
+        instance = self._lazy_instance
+        if instance is not _UNBUILT:
+            return instance
+        with self._lazy_lock:
+            if self._lazy_instance is _UNBUILT:
+                started = time.perf_counter()
+                try:
+                    instance = self._lazy_factory()
+                except Exception as e:
+                    object.__setattr__(self, '_lazy_error', str(e))
+                    raise
+                built_at = time.perf_counter()
+                object.__setattr__(self, '_lazy_seconds', built_at - started)
+                object.__setattr__(self, '_lazy_built_at', built_at)
+                object.__setattr__(self, '_lazy_error', None)
+                object.__setattr__(self, '_lazy_instance', instance)
+            return self._lazy_instance
+    
+    @property
+    def _lazy_built(self) -> bool:
+        return self._lazy_instance is not _UNBUILT
+    
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._lazy_build(), attr)
+    
+    def __setattr__(self, attr: str, value: Any):
+        setattr(self._lazy_build(), attr, value)
+    
+    def __repr__(self) -> str:
+        state = 'built' if self._lazy_built else 'not built'
+        return f"<LazyService {self._lazy_name} ({state})>"
+
+
+def resolve(service: Any) -> Any:
+    """The component behind a LazyService (built now if needed); anything else is returned as is"""
+    if isinstance(service, LazyService):
+        return service._lazy_build()
+    return service
+
+
+class ServiceRegistry:
+    """
+    The lazily built components of the app, and whether it is ready to serve.
+    
+    Liveness only needs the process to answer. Readiness means every service
+    registered as required (the graph with its persisted data, the plugin
+    registry) is built. warm_up() builds those in a background thread, so
+    neither the import of the app nor the first requests pay for them; the
+    other services (analytics, layout, ...) are built on their first use.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.import_seconds: Optional[float] = None
+        self._services: Dict[str, LazyService] = {}
+        self._required = []
+        self._warm_up_thread = None
+        self._lock = threading.Lock()
+    
+    def add(self, name: str, factory: Callable[[], Any], required: bool = False) -> LazyService:
+        """
+        Register a component
+        
+        Args:
+            name: Service name (reported by status())
+            factory: Builds the component
+            required: The app is only ready once this service is built
+        
+        Returns:
+            The LazyService standing in for the component
+        """
+        service = LazyService(name, factory)
+        self._services[name] = service
+        if required:
+            self._required.append(name)
+        return service
+    
+    def mark_imported(self):
+        """Record the time from registry creation to the end of the app's import"""
+        self.import_seconds = time.perf_counter() - self.started
+    
+    def is_built(self, name: str) -> bool:
+        return self._services[name]._lazy_built
+    
+    @property
+    def ready(self) -> bool:
+        return all(self.is_built(name) for name in self._required)
+    
+    def warm_up(self):
+        """Build the required services in a background thread (no-op if ready or already warming up)"""
+        with self._lock:
+            if self.ready or (self._warm_up_thread is not None and self._warm_up_thread.is_alive()):
+                return
+            self._warm_up_thread = threading.Thread(target=self._warm_up, name='warm-up', daemon=True)
+            self._warm_up_thread.start()
+    
+    def _warm_up(self):
+        for name in self._required:
+            try:
+                self._services[name]._lazy_build()
+            except Exception as e:
+                print(f"Could not start {name}: {e}")
+    
+    def status(self) -> Dict[str, Any]:
+        """
+        Readiness and startup timings
+        
+        Returns:
+            ready, import_seconds, ready_seconds (from the start of the import
+            until the last required service was built; None while not ready)
+            and per-service state, build time and last error
+        """
+        ready = self.ready
+        ready_seconds = None
+        if ready:
+            built_at = [self._services[name]._lazy_built_at for name in self._required]
+            ready_seconds = max(built_at, default=self.started) - self.started
+        return {
+            'ready': ready,
+            'import_seconds': self.import_seconds,
+            'ready_seconds': ready_seconds,
+            'services': {
+                name: {
+                    'required': name in self._required,
+                    'built': service._lazy_built,
+                    'seconds': service._lazy_seconds,
+                    'error': service._lazy_error
+                }
+                for name, service in self._services.items()
+            }
+        }
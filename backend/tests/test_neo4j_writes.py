@@ -0,0 +1,144 @@
+"""
+Neo4j write batching - GraphEngine against a stub driver that records
+sessions, transactions and queries (no database needed)
+"""
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from graph_engine import GraphEngine  # noqa: E402
+
+
+class StubResult:
+    def __init__(self, rows=None):
+        self.rows = rows or []
+    
+    def __iter__(self):
+        return iter(self.rows)
+    
+    def single(self):
+        return self.rows[0] if self.rows else {'labelled': 0}
+    
+    def consume(self):
+        return None
+
+
+class StubTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+    
+    def run(self, query, **params):
+        self.driver.queries.append((query, params))
+        return StubResult()
+
+
+class StubSession:
+    def __init__(self, driver):
+        self.driver = driver
+    
+    def run(self, query, **params):
+        self.driver.queries.append((query, params))
+        return StubResult()
+    
+    def execute_write(self, work, *args):
+        self.driver.transactions += 1
+        return work(StubTransaction(self.driver), *args)
+    
+    def close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StubDriver:
+    def __init__(self):
+        self.sessions = 0
+        self.transactions = 0
+        self.queries = []
+    
+    def session(self, database=None):
+        self.sessions += 1
+        return StubSession(self)
+    
+    def verify_connectivity(self):
+        pass
+    
+    def reset(self):
+        self.sessions = 0
+        self.transactions = 0
+        self.queries = []
+    
+    def rows_written(self, keyword):
+        return sum(len(params['rows']) for query, params in self.queries if keyword in query)
+
+
+class Neo4jWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.driver = StubDriver()
+        neo4j = types.ModuleType('neo4j')
+        neo4j.GraphDatabase = types.SimpleNamespace(driver=lambda *args, **kwargs: self.driver)
+        with mock.patch.dict(sys.modules, {'neo4j': neo4j}), \
+                mock.patch.dict('os.environ', {'NEO4J_BATCH_SIZE': '100'}):
+            self.engine = GraphEngine(use_neo4j=True)
+        self.assertTrue(self.engine.use_neo4j)
+        self.driver.reset()
+    
+    def _import(self, nodes: int):
+        for i in range(nodes):
+            self.engine.add_node(f"host{i}", 'Host', {'name': f"host{i}"})
+            if i:
+                self.engine.add_edge(f"host{i - 1}", f"host{i}", 'CONNECTS_TO', {})
+    
+    def test_import_uses_one_session_and_batched_transactions(self):
+        with self.engine.session_scope(), self.engine.write_locked():
+            self._import(601)
+        
+        self.assertEqual(self.driver.sessions, 1)
+        self.assertEqual(self.driver.rows_written('MERGE'), 601)
+        self.assertEqual(self.driver.rows_written('CREATE (a)'), 600)
+        # 1201 writes flushed every 100: 12 flushes with a node and an edge
+        # transaction each, and a last one with the final edge
+        self.assertEqual(self.driver.transactions, 25)
+    
+    def test_failed_write_section_drops_buffered_writes(self):
+        with self.assertRaises(ValueError):
+            with self.engine.session_scope(), self.engine.write_locked():
+                self._import(10)
+                raise ValueError("plugin failed")
+        
+        self.assertEqual(self.driver.transactions, 0)
+        self.assertEqual(self.engine._pending_count, 0)
+        
+        # The next write section starts clean
+        with self.engine.write_locked():
+            self.engine.add_node('other', 'Host', {})
+        self.assertEqual(self.driver.rows_written('MERGE'), 1)
+    
+    def test_constraint_names_keep_label_case(self):
+        with self.engine.write_locked():
+            self.engine.add_node('a', 'Host', {})
+            self.engine.add_node('b', 'HOST', {})
+            self.engine.add_node('c', 'L' * 250, {})
+        names = [query.split()[2] for query, _ in self.driver.queries if query.startswith('CREATE CONSTRAINT')]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(len(set(names)), 3)
+        self.assertIn('`Host_id_unique`', names)
+
+    def test_read_inside_write_section_sees_buffered_writes(self):
+        with self.engine.session_scope(), self.engine.write_locked():
+            self.engine.add_node('a', 'Host', {})
+            self.engine.get_nodes()
+            self.assertEqual(self.driver.rows_written('MERGE'), 1)
+            self.assertEqual(self.engine._pending_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Benchmark Comparison - Compares two results files from run.py and flags
+scenarios whose median time regressed
+
+    python benchmarks/compare.py results-1.0.json results-1.1.json --max-regression 0.25
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Differences below this many seconds are noise, whatever the ratio
+MIN_DELTA_SECONDS = 0.005
+
+
+def _key(record: Dict[str, Any]):
+    return record['dataset'], record['scale'], record['scenario']
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    max_regression: float = 0.25) -> List[Dict[str, Any]]:
+    """
+    Compare the medians of the scenarios present in both results
+    
+    Args:
+        baseline: Earlier results
+        current: New results
+        max_regression: Relative slowdown above which a scenario regressed
+    
+    Returns:
+        One row per scenario with both medians, their ratio and whether it regressed
+    """
+    previous = {_key(record): record for record in baseline.get('results', [])}
+    rows = []
+    for record in current.get('results', []):
+        old = previous.get(_key(record))
+        if old is None:
+            continue
+        ratio = record['median'] / old['median'] if old['median'] else None
+        rows.append({
+            'dataset': record['dataset'],
+            'scale': record['scale'],
+            'scenario': record['scenario'],
+            'baseline': old['median'],
+            'current': record['median'],
+            'ratio': ratio,
+            'regression': (ratio is not None and ratio > 1 + max_regression
+                           and record['median'] - old['median'] > MIN_DELTA_SECONDS)
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]):
+    print(f"{'dataset':<8} {'scale':>6} {'scenario':<24} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}" if row['ratio'] is not None else '-'
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['dataset']:<8} {row['scale']:>6} {row['scenario']:<24} "
+              f"{row['baseline'] * 1000:12.1f} {row['current'] * 1000:12.1f} {ratio:>7}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two benchmark results files')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Relative slowdown of a median that counts as a regression')
+    parser.add_argument('--json', action='store_true', help='Print the comparison as JSON')
+    args = parser.parse_args()
+    
+    rows = compare_results(
+        json.loads(Path(args.baseline).read_text()),
+        json.loads(Path(args.current).read_text()),
+        args.max_regression
+    )
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_comparison(rows)
+    sys.exit(1 if any(row['regression'] for row in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,484 @@
+"""
+Synthetic Datasets - Deterministic AD, IAM, cloud and nmap data in the input
+formats of the bundled plugins, at any scale
+
+Sizes are given in graph elements (nodes + edges the plugin creates). Large
+datasets are produced in batches, so they never have to be held in memory at
+once; ids are derived from indices, so later batches can refer to nodes of
+earlier ones. The same seed and size always give the same data.
+
+Write a dataset to a file for a manual import:
+    python benchmarks/generators.py ad 100k -o ad.json
+"""
+import argparse
+import json
+import random
+import sys
+from typing import Any, Dict, Iterator, List, Tuple
+from xml.sax.saxutils import quoteattr
+
+SCALE_SUFFIXES = {'k': 1000, 'm': 1000 * 1000}
+
+
+def parse_scale(value: str) -> int:
+    """Element count from '10k', '2.5M' or '50000'"""
+    text = value.strip().lower()
+    factor = SCALE_SUFFIXES.get(text[-1:], 1)
+    if factor != 1:
+        text = text[:-1]
+    try:
+        count = int(float(text) * factor)
+    except ValueError:
+        raise ValueError(f"Invalid scale '{value}' (expected e.g. 10k, 1M or 50000)")
+    if count < 100:
+        raise ValueError(f"Scale '{value}' is too small (at least 100 elements)")
+    return count
+
+
+def format_scale(count: int) -> str:
+    """'10k' / '1M' for round counts, the plain number otherwise"""
+    for suffix, factor in (('M', 1000 * 1000), ('k', 1000)):
+        if count >= factor and count % factor == 0:
+            return f"{count // factor}{suffix}"
+    return str(count)
+
+
+def _skewed(rng: random.Random, n: int, power: float = 3.0) -> int:
+    """Index in [0, n), heavily biased towards 0 (a few large groups, many small ones)"""
+    return min(int(n * rng.random() ** power), n - 1)
+
+
+class DatasetGenerator:
+    """
+    Base class of the dataset generators.
+    
+    Subclasses list their sections (in import order, so referenced nodes come
+    first), with the share of the element budget each gets, and build one item
+    at a time. While generating, they record node pairs to search paths
+    between (in AD a user and Domain Admins, which are not always connected),
+    and they provide search terms and query filters that fit the data.
+    """
+    name = ''
+    plugin = ''
+    # (section, share of the elements, average elements per item)
+    sections: Tuple[Tuple[str, float, float], ...] = ()
+    
+    def __init__(self, elements: int, seed: int = 0):
+        """
+        Initialize generator
+        
+        Args:
+            elements: Approximate number of nodes + edges to generate
+            seed: Random seed
+        """
+        self.elements = elements
+        self.seed = seed
+        self.counts = {
+            section: max(1, int(elements * share / per_item))
+            for section, share, per_item in self.sections
+        }
+        self.path_pairs: List[Tuple[str, str]] = []
+        self._max_path_pairs = 32
+    
+    def _record_path(self, index: int, count: int, source: str, target: str):
+        """Keep a few connected pairs, spread evenly over a section"""
+        stride = max(1, count // self._max_path_pairs)
+        if index % stride == 0 and len(self.path_pairs) < self._max_path_pairs:
+            self.path_pairs.append((source, target))
+    
+    def _item(self, rng: random.Random, section: str, index: int) -> Tuple[Any, int]:
+        """One item of a section and the number of elements it adds"""
+        raise NotImplementedError
+    
+    def _payload(self, items: Dict[str, List[Any]]) -> Any:
+        """Plugin input for one batch of items per section"""
+        return items
+    
+    def batches(self, batch_elements: int = 250000) -> Iterator[Tuple[Any, int]]:
+        """
+        Generate the dataset
+        
+        Args:
+            batch_elements: Approximate number of elements per batch
+        
+        Yields:
+            (plugin input, number of elements in it)
+        """
+        rng = random.Random(self.seed)
+        self.path_pairs = []
+        items: Dict[str, List[Any]] = {}
+        batch_size = 0
+        for section, _, _ in self.sections:
+            for index in range(self.counts[section]):
+                item, size = self._item(rng, section, index)
+                items.setdefault(section, []).append(item)
+                batch_size += size
+                if batch_size >= batch_elements:
+                    yield self._payload(items), batch_size
+                    items = {}
+                    batch_size = 0
+        if items:
+            yield self._payload(items), batch_size
+    
+    def search_terms(self) -> Dict[str, str]:
+        """Search queries: 'common' (many hits), 'rare' (one late hit) and 'missing' (full scan)"""
+        raise NotImplementedError
+    
+    def queries(self) -> Dict[str, Dict[str, Any]]:
+        """Named /api/query filter sets"""
+        raise NotImplementedError
+
+
+class ADGenerator(DatasetGenerator):
+    """
+    Active Directory: groups with power-law membership nested towards a few
+    privileged groups, users with group memberships, computers with user
+    sessions and groups with local admin rights on them.
+    """
+    name = 'ad'
+    plugin = 'ad'
+    sections = (
+        ('groups', 0.03, 1.5),
+        ('users', 0.65, 4.0),
+        ('computers', 0.25, 3.0),
+        ('relationships', 0.07, 1.0)
+    )
+    domain = 'corp.local'
+    privileged = ('Domain Admins', 'Enterprise Admins', 'Administrators', 'Domain Users')
+    departments = ('Engineering', 'Sales', 'Finance', 'HR', 'IT', 'Legal', 'Marketing', 'Support')
+    operating_systems = ('Windows 10 Enterprise', 'Windows 11 Enterprise',
+                         'Windows Server 2016', 'Windows Server 2019', 'Windows Server 2022')
+    
+    def _group(self, index: int) -> str:
+        return self.privileged[index] if index < len(self.privileged) else f"GRP-{index:07d}"
+    
+    def _user(self, index: int) -> str:
+        return f"user{index:08d}"
+    
+    def _computer(self, index: int) -> str:
+        prefix = 'SRV' if index % 10 == 0 else 'WS'
+        return f"{prefix}-{index:08d}"
+    
+    def _id(self, name: str) -> str:
+        return f"{self.domain}\\{name}"
+    
+    def _item(self, rng, section, index):
+        groups = self.counts['groups']
+        if section == 'groups':
+            group = {'name': self._group(index), 'domain': self.domain,
+                     'properties': {'admincount': index < 3}}
+            # Half of the groups are nested in an older (larger) group
+            if index > 0 and rng.random() < 0.5:
+                group['nested'] = [self._group(_skewed(rng, index))]
+            return group, 1 + len(group.get('nested', []))
+        
+        if section == 'users':
+            member_of = {self._group(_skewed(rng, groups)) for _ in range(rng.randint(1, 5))}
+            user = {
+                'name': self._user(index),
+                'domain': self.domain,
+                'enabled': rng.random() > 0.1,
+                'groups': sorted(member_of),
+                'properties': {
+                    'department': rng.choice(self.departments),
+                    'title': f"{rng.choice(self.departments)} {rng.choice(('Engineer', 'Manager', 'Analyst'))}",
+                    'lastlogon': 1700000000 + rng.randrange(30000000),
+                    'pwdneverexpires': rng.random() < 0.05
+                }
+            }
+            self._record_path(index, self.counts['users'], self._id(user['name']), self._id(self.privileged[0]))
+            return user, 1 + len(member_of)
+        
+        if section == 'computers':
+            users = self.counts['users']
+            sessions = {self._user(rng.randrange(users)) for _ in range(rng.randint(0, 4))}
+            return {
+                'name': self._computer(index),
+                'domain': self.domain,
+                'os': rng.choice(self.operating_systems),
+                'sessions': sorted(sessions),
+                'properties': {'unconstraineddelegation': rng.random() < 0.01}
+            }, 1 + len(sessions)
+        
+        # Local admin and RDP rights of groups on computers
+        return {
+            'source': self._id(self._group(_skewed(rng, groups))),
+            'target': self._id(self._computer(rng.randrange(self.counts['computers']))),
+            'type': 'ADMIN_TO' if rng.random() < 0.6 else 'CAN_RDP'
+        }, 1
+    
+    def search_terms(self):
+        return {
+            'common': 'engineering',
+            'rare': self._user(self.counts['users'] - 1),
+            'missing': 'no-such-principal'
+        }
+    
+    def queries(self):
+        return {
+            'type': {'node_type': ['Computer']},
+            'property': {'node_type': ['User'], 'properties': {'department': 'Finance'}},
+            'degree': {'node_type': ['Group'], 'min_degree': 20}
+        }
+
+
+class IAMGenerator(DatasetGenerator):
+    """
+    Identity and access management: roles with permission sets, resources,
+    users with roles and groups, and direct or role-based access grants.
+    """
+    name = 'iam'
+    plugin = 'iam'
+    sections = (
+        ('roles', 0.01, 1.0),
+        ('resources', 0.19, 1.0),
+        ('users', 0.40, 4.0),
+        ('access_grants', 0.40, 1.0)
+    )
+    resource_types = ('database', 'bucket', 'queue', 'api', 'secret', 'repository')
+    actions = ('read', 'write', 'delete', 'admin')
+    teams = ('engineering', 'data', 'security', 'finance', 'support', 'platform')
+    
+    def _resource_type(self, index: int) -> str:
+        return self.resource_types[index % len(self.resource_types)]
+    
+    def _resource(self, index: int) -> str:
+        return f"{self._resource_type(index)}-{index:08d}"
+    
+    def _item(self, rng, section, index):
+        if section == 'roles':
+            return {
+                'id': f"role-{index:06d}",
+                'description': f"Role {index}",
+                'permissions': sorted({f"{rng.choice(self.actions)}:{rng.choice(self.resource_types)}"
+                                       for _ in range(rng.randint(1, 6))})
+            }, 1
+        
+        if section == 'resources':
+            resource_type = self._resource_type(index)
+            return {
+                'id': self._resource(index),
+                'type': resource_type,
+                'name': f"{rng.choice(self.teams)}-{resource_type}-{index}",
+                'permissions_required': [f"{rng.choice(self.actions)}:{resource_type}"],
+                'properties': {'owner': rng.choice(self.teams), 'sensitive': rng.random() < 0.1}
+            }, 1
+        
+        if section == 'users':
+            roles = {f"role-{_skewed(rng, self.counts['roles']):06d}" for _ in range(rng.randint(1, 3))}
+            groups = {f"group-{rng.choice(self.teams)}" for _ in range(rng.randint(0, 2))}
+            return {
+                'id': f"iam-user-{index:08d}",
+                'name': f"User {index}",
+                'roles': sorted(roles),
+                'groups': sorted(groups),
+                'permissions': [f"read:{rng.choice(self.resource_types)}"],
+                'properties': {'team': rng.choice(self.teams), 'mfa': rng.random() > 0.2}
+            }, 1 + len(roles) + len(groups)
+        
+        grant = {
+            'user': f"iam-user-{rng.randrange(self.counts['users']):08d}",
+            'resource': self._resource(rng.randrange(self.counts['resources'])),
+            'permission': f"{rng.choice(self.actions)}:resource",
+            'granted_via': rng.choice(('direct', 'role', 'group'))
+        }
+        self._record_path(index, self.counts['access_grants'], grant['user'], grant['resource'])
+        return grant, 1
+    
+    def search_terms(self):
+        return {
+            'common': 'engineering',
+            'rare': f"iam-user-{self.counts['users'] - 1:08d}",
+            'missing': 'no-such-identity'
+        }
+    
+    def queries(self):
+        return {
+            'type': {'node_type': ['Role']},
+            'property': {'properties': {'sensitive': True}},
+            'edge_type': {'edge_type': ['CAN_ACCESS'], 'min_degree': 3}
+        }
+
+
+class CloudGenerator(DatasetGenerator):
+    """
+    AWS-style infrastructure: VPCs, subnets and security groups, IAM roles with
+    access to buckets, and instances and functions that assume those roles.
+    """
+    name = 'cloud'
+    plugin = 'cloud'
+    sections = (
+        ('vpc', 0.002, 1.0),
+        ('subnet', 0.02, 2.0),
+        ('security_group', 0.03, 2.0),
+        ('s3_bucket', 0.05, 1.0),
+        ('iam_role', 0.05, 4.0),
+        ('ec2', 0.70, 4.5),
+        ('lambda', 0.148, 3.0)
+    )
+    regions = ('us-east-1', 'us-west-2', 'eu-west-1', 'eu-central-1', 'ap-southeast-1')
+    instance_types = ('t3.micro', 't3.large', 'm5.xlarge', 'c5.2xlarge', 'r5.large')
+    
+    def __init__(self, elements: int, seed: int = 0):
+        super().__init__(elements, seed)
+        # First bucket of each role, to pick connected instance -> bucket pairs
+        self._role_buckets: List[str] = []
+    
+    def _ref(self, section: str, rng) -> str:
+        return f"{section}-{rng.randrange(self.counts[section]):08d}"
+    
+    def _item(self, rng, section, index):
+        resource_id = f"{section}-{index:08d}"
+        resource = {
+            'id': resource_id,
+            'type': section,
+            'name': f"{section.replace('_', '-')}-{index}",
+            'properties': {'region': rng.choice(self.regions), 'account': f"{100000000000 + index % 20}"},
+            'relationships': []
+        }
+        relationships = resource['relationships']
+        if section in ('subnet', 'security_group'):
+            relationships.append({'target': self._ref('vpc', rng), 'type': 'IN_VPC'})
+        elif section == 'iam_role':
+            for _ in range(3):
+                relationships.append({'target': self._ref('s3_bucket', rng), 'type': 'CAN_ACCESS'})
+            if index == 0:
+                self._role_buckets = []
+            self._role_buckets.append(relationships[0]['target'])
+        elif section == 's3_bucket':
+            resource['properties']['public'] = rng.random() < 0.03
+        elif section in ('ec2', 'lambda'):
+            role = rng.randrange(self.counts['iam_role'])
+            relationships.append({'target': self._ref('subnet', rng), 'type': 'IN_SUBNET'})
+            relationships.append({'target': f"iam_role-{role:08d}", 'type': 'ASSUMES_ROLE'})
+            if section == 'ec2':
+                resource['properties']['instance_type'] = rng.choice(self.instance_types)
+                resource['properties']['public_ip'] = rng.random() < 0.1
+                for _ in range(rng.randint(1, 2)):
+                    relationships.append({'target': self._ref('security_group', rng), 'type': 'HAS_SECURITY_GROUP'})
+                # Instance -> role -> bucket
+                self._record_path(index, self.counts['ec2'], resource_id, self._role_buckets[role])
+        return resource, 1 + len(relationships)
+    
+    def _payload(self, items):
+        return {
+            'provider': 'aws',
+            'resources': [resource for section, _, _ in self.sections for resource in items.get(section, [])]
+        }
+    
+    def search_terms(self):
+        return {
+            'common': 'us-east-1',
+            'rare': f"ec2-{self.counts['ec2'] - 1:08d}",
+            'missing': 'no-such-resource'
+        }
+    
+    def queries(self):
+        return {
+            'type': {'node_type': ['s3_bucket']},
+            'property': {'node_type': ['ec2'], 'properties': {'public_ip': True}},
+            'degree': {'node_type': ['security_group'], 'min_degree': 50}
+        }
+
+
+class NmapGenerator(DatasetGenerator):
+    """
+    Nmap XML scan of /16 networks: hosts (some with reverse DNS names and OS
+    matches), each with a few open ports and services and some closed ones.
+    """
+    name = 'nmap'
+    plugin = 'nmap'
+    sections = (('hosts', 1.0, 7.0),)
+    services = (
+        ('22', 'ssh', 'OpenSSH', '8.9p1'),
+        ('80', 'http', 'nginx', '1.24.0'),
+        ('443', 'https', 'nginx', '1.24.0'),
+        ('445', 'microsoft-ds', 'Samba smbd', '4.15'),
+        ('3306', 'mysql', 'MySQL', '8.0.35'),
+        ('3389', 'ms-wbt-server', 'Microsoft Terminal Services', ''),
+        ('5432', 'postgresql', 'PostgreSQL', '15.4'),
+        ('8080', 'http-proxy', 'Apache Tomcat', '9.0.80')
+    )
+    operating_systems = ('Linux 5.15', 'Linux 6.1', 'Microsoft Windows Server 2019', 'FreeBSD 13.2')
+    
+    @staticmethod
+    def _ip(index: int) -> str:
+        return f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+    
+    def _item(self, rng, section, index):
+        ip = self._ip(index)
+        hostname = f"host-{index:08d}.corp.local" if rng.random() < 0.6 else None
+        open_ports = rng.sample(self.services, rng.randint(1, 5))
+        closed_ports = rng.sample(self.services, rng.randint(0, 2))
+        parts = [f'<host><status state="up"/><address addr="{ip}" addrtype="ipv4"/>']
+        if hostname:
+            parts.append(f'<hostnames><hostname name="{hostname}" type="PTR"/></hostnames>')
+        parts.append('<ports>')
+        for port, service, product, version in open_ports:
+            parts.append(
+                f'<port protocol="tcp" portid="{port}"><state state="open"/>'
+                f'<service name="{service}" product={quoteattr(product)} version="{version}"/></port>'
+            )
+        for port, service, _, _ in closed_ports:
+            if all(port != open_port[0] for open_port in open_ports):
+                parts.append(f'<port protocol="tcp" portid="{port}"><state state="closed"/>'
+                             f'<service name="{service}"/></port>')
+        parts.append('</ports>')
+        if rng.random() < 0.7:
+            parts.append(f'<os><osmatch name="{rng.choice(self.operating_systems)}" accuracy="95"/></os>')
+        parts.append('</host>')
+        self._record_path(index, self.counts['hosts'], hostname or ip, f"{ip}:{open_ports[0][0]}")
+        return ''.join(parts), 1 + 2 * len(open_ports)
+    
+    def _payload(self, items):
+        return {'xml': '<nmaprun scanner="nmap">' + ''.join(items['hosts']) + '</nmaprun>'}
+    
+    def search_terms(self):
+        return {
+            'common': 'openssh',
+            'rare': self._ip(self.counts['hosts'] - 1),
+            'missing': 'no-such-host'
+        }
+    
+    def queries(self):
+        return {
+            'type': {'node_type': ['Host']},
+            'property': {'node_type': ['Port'], 'properties': {'service': 'mysql'}},
+            'text': {'node_type': ['Host'], 'text_search': 'windows'}
+        }
+
+
+GENERATORS = {
+    generator.name: generator
+    for generator in (ADGenerator, IAMGenerator, CloudGenerator, NmapGenerator)
+}
+
+
+def create_generator(dataset: str, elements: int, seed: int = 0) -> DatasetGenerator:
+    """Generator for a dataset name ('ad', 'iam', 'cloud' or 'nmap')"""
+    if dataset not in GENERATORS:
+        raise ValueError(f"Unknown dataset '{dataset}' (expected one of {', '.join(GENERATORS)})")
+    return GENERATORS[dataset](elements, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic dataset as plugin input')
+    parser.add_argument('dataset', choices=sorted(GENERATORS))
+    parser.add_argument('scale', help='Number of graph elements, e.g. 10k or 1M')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    args = parser.parse_args()
+    
+    generator = create_generator(args.dataset, parse_scale(args.scale), args.seed)
+    # One batch holding the whole dataset, ready for POST /api/import
+    payload, _ = next(generator.batches(batch_elements=sys.maxsize))
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        json.dump({'collector': generator.plugin, 'data': payload}, output)
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Benchmarks - Timed API scenarios on synthetic datasets, with machine-readable
+results for tracking performance across releases
+
+Run from the repository root:
+    python benchmarks/run.py --datasets ad,nmap --scales 10k,100k --output results.json
+    python benchmarks/run.py --baseline results-previous.json    # exit 1 on regressions
+
+The app runs in this process (Flask test client, no HTTP server) from a
+temporary working directory, so the sessions and templates the scenarios
+write are discarded afterwards. Backend settings (COLUMNAR_GRAPH,
+USE_NEO4J, ...) are read from the environment as usual and recorded with
+the results.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import quote
+
+from generators import GENERATORS, create_generator, format_scale, parse_scale
+from compare import compare_results, print_comparison
+
+try:
+    import resource
+except ImportError:  # Windows: no peak memory in the results
+    resource = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BACKEND_DIR = REPO_ROOT / 'backend'
+SCHEMA_VERSION = 1
+SCENARIOS = ('import', 'graph', 'search', 'query', 'paths', 'analytics', 'sessions', 'compare')
+# Environment that changes what is measured, recorded with the results
+BACKEND_SETTINGS = ('USE_NEO4J', 'COLUMNAR_GRAPH', 'GRAPH_DATA_DIR', 'GRAPH_STORE_DIR',
+                    'PLUGIN_ISOLATION', 'REALTIME', 'RESPONSE_CACHE_MB')
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        result = subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def load_app():
+    """Import the backend with file watchers and WebSocket pushes off, and build its components"""
+    os.environ.setdefault('HOT_RELOAD', 'false')
+    os.environ.setdefault('REALTIME', 'false')
+    os.environ.setdefault('WARM_UP', 'false')
+    sys.path.insert(0, str(BACKEND_DIR))
+    import app as backend
+    from startup import resolve
+    
+    resolve(backend.graph_engine)
+    resolve(backend.plugin_manager)
+    return backend
+
+
+class Runner:
+    """Runs the scenarios for one dataset at a time and collects result records"""
+    def __init__(self, backend, repeat: int, paths: int, path_depth: int, batch_elements: int):
+        self.backend = backend
+        self.client = backend.app.test_client()
+        self.repeat = repeat
+        self.paths = paths
+        self.path_depth = path_depth
+        self.batch_elements = batch_elements
+        self.results: List[Dict[str, Any]] = []
+        self._unique = 0
+    
+    def _request(self, method: str, url: str, body: Any = None):
+        """One API call; fails the benchmark on an error response"""
+        if body is None:
+            response = self.client.open(url, method=method)
+        else:
+            response = self.client.open(url, method=method, data=body, content_type='application/json')
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} failed with {response.status_code}: {response.get_data(as_text=True)[:500]}")
+        return response
+    
+    def _uncached(self, url: str) -> str:
+        """URL that misses the response cache (the cache is keyed by the full path)"""
+        self._unique += 1
+        return f"{url}{'&' if '?' in url else '?'}_bench={self._unique}"
+    
+    def _record(self, context: Dict[str, Any], scenario: str, samples: List[float], **extra):
+        record = {
+            **context,
+            'scenario': scenario,
+            'runs': len(samples),
+            'first': samples[0],
+            'min': min(samples),
+            'median': statistics.median(samples),
+            'mean': statistics.mean(samples),
+            'max': max(samples),
+            'samples': samples,
+            **extra
+        }
+        self.results.append(record)
+        print(f"  {scenario:<24} median {record['median'] * 1000:10.1f} ms  ({len(samples)} runs)", flush=True)
+    
+    def _time(self, call: Callable[[], Any], runs: Optional[int] = None) -> List[float]:
+        samples = []
+        for _ in range(runs or self.repeat):
+            started = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - started)
+        return samples
+    
+    def run_dataset(self, dataset: str, elements: int, seed: int, scenarios: List[str]):
+        generator = create_generator(dataset, elements, seed)
+        context = {'dataset': dataset, 'scale': format_scale(elements), 'plugin': generator.plugin}
+        print(f"{dataset} {context['scale']}", flush=True)
+        
+        self._request('POST', '/api/clear')
+        # The import always runs: every other scenario needs the data
+        imported, import_seconds = 0, []
+        for payload, size in generator.batches(self.batch_elements):
+            body = json.dumps({'collector': generator.plugin, 'data': payload})
+            started = time.perf_counter()
+            result = self._request('POST', '/api/import', body).get_json()
+            import_seconds.append(time.perf_counter() - started)
+            if result.get('error'):
+                raise RuntimeError(f"Import into {generator.plugin} failed: {result['error']}")
+            imported += size
+        graph = self._request('GET', '/api/graph').get_json()
+        context.update(elements=imported, nodes=len(graph['nodes']), edges=len(graph['edges']))
+        del graph
+        if 'import' in scenarios:
+            total = sum(import_seconds)
+            self._record(context, 'import', [total], batches=len(import_seconds),
+                         elements_per_second=round(imported / total) if total else None,
+                         peak_rss_mb=_peak_rss_mb())
+        
+        if 'graph' in scenarios:
+            self._record(context, 'graph', self._time(lambda: self._request('GET', self._uncached('/api/graph'))))
+            self._record(context, 'graph_cached', self._time(lambda: self._request('GET', '/api/graph')))
+        
+        if 'search' in scenarios:
+            for name, term in generator.search_terms().items():
+                self._record(context, f"search_{name}",
+                             self._time(lambda: self._request('GET', f"/api/search?q={quote(term)}&limit=50")))
+        
+        if 'query' in scenarios:
+            for name, filters in generator.queries().items():
+                body = json.dumps(filters)
+                self._record(context, f"query_{name}", self._time(lambda: self._request('POST', '/api/query', body)))
+        
+        if 'paths' in scenarios and generator.path_pairs:
+            pairs = generator.path_pairs[:self.paths]
+            bodies = [json.dumps({'source': source, 'target': target, 'max_depth': self.path_depth})
+                      for source, target in pairs]
+            found = sum(1 for body in bodies if self._request('POST', '/api/paths', body).get_json())
+            # One sample per pair, repeated
+            samples = []
+            for _ in range(self.repeat):
+                for body in bodies:
+                    samples.extend(self._time(lambda: self._request('POST', '/api/paths', body), runs=1))
+            self._record(context, 'paths', samples, pairs=len(pairs), pairs_connected=found,
+                         max_depth=self.path_depth)
+        
+        if 'analytics' in scenarios:
+            self._record(context, 'analytics',
+                         self._time(lambda: self._request('GET', self._uncached('/api/analytics/stats'))))
+        
+        if 'sessions' in scenarios or 'compare' in scenarios:
+            self._run_sessions(context, generator, scenarios)
+    
+    def _run_sessions(self, context: Dict[str, Any], generator, scenarios: List[str]):
+        saved = []
+        
+        def save():
+            body = json.dumps({'name': f"bench-{context['dataset']}-{len(saved)}"})
+            saved.append(self._request('POST', '/api/sessions', body).get_json()['id'])
+        
+        save_samples = self._time(save)
+        if 'sessions' in scenarios:
+            self._record(context, 'session_save', save_samples)
+            self._record(context, 'session_load',
+                         self._time(lambda: self._request('GET', f"/api/sessions/{saved[0]}")))
+            self._record(context, 'session_restore',
+                         self._time(lambda: self._request('POST', f"/api/sessions/{saved[0]}/restore")))
+        
+        if 'compare' in scenarios:
+            # Change ~1% of the nodes, save again and diff the two sessions
+            node_ids = [node['id'] for node in self._request('GET', '/api/nodes').get_json()]
+            changed = node_ids[::100]
+            self._request('POST', '/api/bulk/nodes/tag', json.dumps({'node_ids': changed, 'tags': ['bench']}))
+            save()
+            body = json.dumps({'session1': saved[0], 'session2': saved[-1], 'paginate': True})
+            self._record(context, 'compare', self._time(lambda: self._request('POST', '/api/compare', body)),
+                         changed_nodes=len(changed))
+
+
+def _parse_list(value: str, allowed=None) -> List[str]:
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    if allowed is not None:
+        unknown = [item for item in items if item not in allowed]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (expected {', '.join(allowed)})")
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the WolfTrace benchmark suite')
+    parser.add_argument('--datasets', default=','.join(GENERATORS),
+                        type=lambda v: _parse_list(v, GENERATORS), help='Comma-separated datasets')
+    parser.add_argument('--scales', default='10k', type=_parse_list,
+                        help='Comma-separated sizes in graph elements, e.g. 10k,100k,1M,10M')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        type=lambda v: _parse_list(v, SCENARIOS), help='Comma-separated scenarios')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per timed scenario')
+    parser.add_argument('--paths', type=int, default=10, help='Node pairs for the path scenario')
+    parser.add_argument('--path-depth', type=int, default=4, help='max_depth of path searches')
+    parser.add_argument('--batch-elements', type=int, default=250000,
+                        help='Elements per import request')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Results file to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Relative slowdown of a median that counts as a regression')
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error('--repeat must be positive')
+    scales = [parse_scale(scale) for scale in args.scales]
+    # Resolved before switching to the temporary working directory
+    output = Path(args.output).resolve() if args.output else None
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    
+    workdir = tempfile.TemporaryDirectory(prefix='wolftrace-bench-')
+    os.chdir(workdir.name)
+    backend = load_app()
+    runner = Runner(backend, args.repeat, args.paths, args.path_depth, args.batch_elements)
+    for elements in scales:
+        for dataset in args.datasets:
+            runner.run_dataset(dataset, elements, args.seed, args.scenarios)
+    
+    results = {
+        'schema': SCHEMA_VERSION,
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': _git('rev-parse', 'HEAD'),
+            'git_describe': _git('describe', '--tags', '--always', '--dirty'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'settings': {name: os.environ[name] for name in BACKEND_SETTINGS if name in os.environ},
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'batch_elements': args.batch_elements
+        },
+        'results': runner.results
+    }
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {output}")
+    
+    regressions = []
+    if baseline is not None:
+        comparison = compare_results(baseline, results, args.max_regression)
+        print_comparison(comparison)
+        regressions = [row for row in comparison if row['regression']]
+    
+    os.chdir(REPO_ROOT)
+    workdir.cleanup()
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,11 @@ Example: Using WolfTrace API programmatically
 import requests
 import json
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 API_BASE = "http://localhost:5000/api"
 
 # Example 1: Import network data
@@ -35,10 +40,19 @@ def find_paths(source, target):
     for i, path in enumerate(paths, 1):
         print(f"  Path {i}: {' -> '.join(path)}")
 
+def fetch_graph():
+    """Fetch the full graph, as MessagePack when available (smaller and faster to decode)"""
+    if msgpack is None:
+        return requests.get(f"{API_BASE}/graph").json()
+    response = requests.get(f"{API_BASE}/graph", headers={"Accept": "application/msgpack"})
+    if response.headers.get("Content-Type", "").startswith("application/msgpack"):
+        return msgpack.unpackb(response.content, raw=False)
+    # Server without msgpack support answers with JSON
+    return response.json()
+
 # Example 3: Get graph statistics
 def get_graph_stats():
-    response = requests.get(f"{API_BASE}/graph")
-    graph = response.json()
+    graph = fetch_graph()
     print(f"Graph contains {len(graph['nodes'])} nodes and {len(graph['edges'])} edges")
 
 # Example 4: List available plugins